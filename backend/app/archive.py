@@ -0,0 +1,157 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from sqlalchemy import func, insert, or_, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Assignment, Note, RequestStatus
+from .models.db_models import (
+    ArchivedAssignmentRollup as DBArchivedAssignmentRollup, ArchivedIssueRollup as DBArchivedIssueRollup,
+    ArchivedRequest as DBArchivedRequest, Request as DBRequest, RequestAssignment as DBRequestAssignment,
+    RequestNote as DBRequestNote
+)
+
+# Columns copied from requests to requests_archive; search_vector and
+# description_bands only serve live requests and are left behind
+ARCHIVED_COLUMNS = [
+    name for name in DBArchivedRequest.__table__.c.keys() if name in DBRequest.__table__.c
+]
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """The first day of the month `months` after (or before) `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def archive_cutoff(now: datetime, months: int) -> datetime:
+    """Requests created, and closed, before this time are archived: whole months older than `months`."""
+    return add_months(month_start(now), -months)
+
+
+def partition_name(month: datetime) -> str:
+    return f"requests_archive_{month:%Y_%m}"
+
+
+def archivable(cutoff: datetime):
+    """Conditions on CLOSED requests created and closed before `cutoff`."""
+    return (
+        DBRequest.status == RequestStatus.CLOSED,
+        DBRequest.created_at < cutoff,
+        or_(DBRequest.closed_at.is_(None), DBRequest.closed_at < cutoff)
+    )
+
+
+async def archivable_months(db: AsyncSession, cutoff: datetime) -> List[datetime]:
+    query = select(func.date_trunc("month", DBRequest.created_at)).where(*archivable(cutoff)).distinct()
+    result = await db.execute(query)
+    return sorted(result.scalars().all())
+
+
+async def ensure_partitions(db: AsyncSession, months: Iterable[datetime]) -> None:
+    """
+    Create the monthly partitions of requests_archive that are missing.
+    Creating a partition locks the whole archive, so callers commit this
+    on its own rather than alongside a batch of moves.
+    """
+    for month in sorted({month_start(month) for month in months}):
+        await db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF requests_archive "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+
+
+async def archive_closed(db: AsyncSession, cutoff: datetime, limit: int) -> int:
+    """
+    Move up to `limit` CLOSED requests created and closed before `cutoff`
+    to requests_archive, with their assignments and notes, and add them to
+    the archive rollups so the metrics still count them. The status and
+    daily rollups count archived requests already and are left as they are.
+    Rows other transactions hold are skipped. Returns the number moved.
+    """
+    columns = [DBRequest.__table__.c[name] for name in ARCHIVED_COLUMNS]
+    query = select(*columns).where(*archivable(cutoff)).order_by(
+        DBRequest.created_at
+    ).limit(limit).with_for_update(skip_locked=True)
+    result = await db.execute(query)
+    rows = result.all()
+    if not rows:
+        return 0
+    ids = [row.id for row in rows]
+
+    assignments = {request_id: [] for request_id in ids}
+    result = await db.execute(
+        select(DBRequestAssignment).where(DBRequestAssignment.request_id.in_(ids))
+        .order_by(DBRequestAssignment.assigned_at)
+    )
+    for assignment in result.scalars().all():
+        assignments[assignment.request_id].append(assignment)
+    notes = {request_id: [] for request_id in ids}
+    result = await db.execute(
+        select(DBRequestNote).where(DBRequestNote.request_id.in_(ids))
+        .order_by(DBRequestNote.created_at, DBRequestNote.id)
+    )
+    for note in result.scalars().all():
+        notes[note.request_id].append(note)
+
+    now = datetime.utcnow()
+    await db.execute(insert(DBArchivedRequest), [
+        {
+            **row._asdict(),
+            "assignments": [Assignment.model_validate(a).model_dump(mode="json") for a in assignments[row.id]],
+            "notes": [Note.model_validate(n).model_dump(mode="json") for n in notes[row.id]],
+            "archived_at": now
+        }
+        for row in rows
+    ])
+    await add_to_archive_rollups(db, rows, assignments)
+    # Assignments, notes and queued notifications go with the request
+    await db.execute(
+        DBRequest.__table__.delete().where(DBRequest.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    return len(rows)
+
+
+async def add_to_archive_rollups(db: AsyncSession, rows: list, assignments: Dict[str, list]) -> None:
+    """Add archived requests to the overview and staff performance rollups, as the live tables counted them."""
+    issues: Dict[object, Counter] = {}
+    for row in rows:
+        counts = issues.setdefault(row.issue_type, Counter())
+        counts["request_count"] += 1
+        if row.closed_at is not None:
+            hours = (row.closed_at - row.created_at).total_seconds() / 3600
+            counts["resolved_count"] += 1
+            counts["resolution_hours"] += hours
+            if row.target_sla_hours is not None and hours > row.target_sla_hours:
+                counts["sla_breach_count"] += 1
+    staff: Dict[str, Counter] = {}
+    for request_assignments in assignments.values():
+        for assignment in request_assignments:
+            counts = staff.setdefault(assignment.staff_id, Counter())
+            counts["assignment_count"] += 1
+            if assignment.completed_at is not None:
+                counts["completed_count"] += 1
+
+    # Sorted keys keep concurrent archivers locking rollup rows in the same order
+    for model, key, deltas in [
+        (DBArchivedIssueRollup, "issue_type", issues),
+        (DBArchivedAssignmentRollup, "staff_id", staff)
+    ]:
+        if not deltas:
+            continue
+        names = [name for name in model.__table__.c.keys() if name != key]
+        statement = pg_insert(model)
+        statement = statement.on_conflict_do_update(
+            index_elements=[key],
+            set_={name: getattr(model, name) + getattr(statement.excluded, name) for name in names}
+        )
+        await db.execute(statement, [
+            {key: value, **{name: counts[name] for name in names}}
+            for value, counts in sorted(deltas.items(), key=lambda item: str(item[0]))
+        ])
@@ -0,0 +1,206 @@
+import asyncio
+import functools
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .config import settings
+
+
+class MemoryCacheBackend:
+    """In-process TTL cache with least-recently-used eviction."""
+
+    # Versions are only bumped by writes this process handles
+    shared = False
+
+    def __init__(self, max_entries: int = 256):
+        self.instance = uuid.uuid4().hex
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.counters: Dict[str, int] = {}
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_counter(self, key: str) -> int:
+        return self.counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+
+class RedisCacheBackend:
+    """Redis-backed cache so several workers share entries and the data version."""
+
+    shared = True
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("metrics_cache_backend=redis requires the 'redis' package")
+        self.client = redis.from_url(url)
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self.client.set(key, json.dumps(value, default=str), px=int(ttl * 1000))
+
+    async def get_counter(self, key: str) -> int:
+        raw = await self.client.get(key)
+        return int(raw) if raw is not None else 0
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+
+class ResponseCache:
+    """
+    Cache computed responses under a data version. Writers bump the version,
+    which makes every older entry unreachable, and entries also expire after
+    `ttl` seconds. Concurrent misses for the same key share one computation.
+
+    Misses may be computed on a read replica that has not replayed the write
+    yet. For `replica_lag_seconds` after a write, entries are therefore only
+    kept that long, so data read before the replica caught up is not served
+    for the full `ttl`.
+    """
+
+    VERSION_KEY = "metrics:version"
+    RECENT_WRITE_KEY = "metrics:recent-write"
+
+    def __init__(self, backend, ttl: float, replica_lag_seconds: float = 0.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.replica_lag_seconds = replica_lag_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.in_flight: Dict[str, asyncio.Future] = {}
+
+    async def version(self) -> int:
+        return await self.backend.get_counter(self.VERSION_KEY)
+
+    async def data_tag(self) -> str:
+        """
+        Identify the data the cached responses reflect. A shared backend's
+        version is bumped by every writer. A per-process version only sees
+        this worker's writes, so the tag also names the process and rolls
+        over every `ttl` seconds, the same staleness bound as the entries.
+        """
+        version = await self.version()
+        if self.backend.shared:
+            return str(version)
+        return f"{self.backend.instance}:{version}:{int(time.time() // self.ttl)}"
+
+    async def get_or_compute(self, name: str, params: Dict[str, Any], compute: Callable[[], Awaitable[Any]]) -> Any:
+        version = await self.version()
+        key = f"metrics:{version}:{name}:{json.dumps(params, sort_keys=True, default=str)}"
+
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        pending = self.in_flight.get(key)
+        if pending is not None:
+            self.hits += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The leader was cancelled before it finished; compute it ourselves
+                return await self.get_or_compute(name, params, compute)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            ttl = self.ttl
+            if self.replica_lag_seconds and await self.backend.get(self.RECENT_WRITE_KEY) is not None:
+                ttl = min(ttl, self.replica_lag_seconds)
+            value = await compute()
+            await self.backend.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Followers re-raise it; mark it retrieved so an unawaited future does not warn
+            future.exception()
+            raise
+        finally:
+            # A cancelled leader never resolves the future; cancel it so followers stop waiting
+            if not future.done():
+                future.cancel()
+            del self.in_flight[key]
+
+    async def invalidate(self) -> None:
+        """Bump the data version after a write."""
+        await self.backend.incr(self.VERSION_KEY)
+        if self.replica_lag_seconds:
+            await self.backend.set(self.RECENT_WRITE_KEY, True, self.replica_lag_seconds)
+        self.invalidations += 1
+
+    async def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "version": await self.version(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0,
+            "invalidations": self.invalidations,
+            "evictions": self.backend.evictions,
+            "ttl_seconds": self.ttl
+        }
+
+
+def create_cache_backend():
+    if settings.metrics_cache_backend == "redis":
+        return RedisCacheBackend(settings.redis_url)
+    return MemoryCacheBackend(settings.metrics_cache_max_entries)
+
+
+# A replica is used while its lag, checked every replica_lag_check_interval, is within replica_max_lag_seconds
+metrics_cache = ResponseCache(
+    create_cache_backend(),
+    settings.metrics_cache_ttl_seconds,
+    settings.replica_max_lag_seconds + settings.replica_lag_check_interval if settings.replica_database_url else 0.0
+)
+
+
+def cached(name: str):
+    """
+    Serve a metrics handler from metrics_cache. The cache key is built from
+    the handler's query parameters; the `db` session is left out.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(**kwargs):
+            params = {k: v for k, v in kwargs.items() if k != "db"}
+            return await metrics_cache.get_or_compute(name, params, lambda: handler(**kwargs))
+        return wrapper
+    return decorator
@@ -14,6 +14,89 @@ class Settings(BaseSettings):
     pg_sslmode: str = "require"
     pg_port: int = 5432
     
+    # Optional read replica; credentials default to the primary's
+    pg_replica_host: Optional[str] = None
+    pg_replica_port: Optional[int] = None
+    pg_replica_database: Optional[str] = None
+    replica_max_lag_seconds: float = 5.0
+    replica_lag_check_interval: float = 5.0
+    
+    # Connection pool and engine settings
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100  # set to 0 behind PgBouncer in transaction mode
+    db_statement_timeout_ms: int = 30000  # 0 disables the per-statement timeout
+    db_echo: Optional[bool] = None  # defaults to on in development only
+    
+    # Metrics response cache ("memory" or "redis")
+    metrics_cache_backend: str = "memory"
+    metrics_cache_ttl_seconds: float = 30.0
+    metrics_cache_max_entries: int = 256
+    redis_url: str = "redis://localhost:6379/0"
+    
+    # Cache-Control for request, building, unit, tenant and staff reads;
+    # "no-cache" lets browsers keep copies but revalidate them by ETag
+    resource_cache_control: str = "private, no-cache"
+    
+    # Request change events for GET /requests/stream ("postgres" LISTEN/NOTIFY
+    # across workers, or "memory" for this process only)
+    request_events_backend: str = "postgres"
+    request_events_queue_size: int = 100  # per subscriber; events beyond it are dropped
+    request_events_keepalive_seconds: float = 15.0
+    request_events_reconnect_seconds: float = 1.0  # first retry of a lost LISTEN connection, doubling
+    request_events_reconnect_max_seconds: float = 60.0
+    
+    # Duplicate detection at intake: time budget of the lookup, similarity at
+    # which an open request is reported, and at which on_duplicate=link uses it
+    duplicate_check_timeout_ms: int = 50
+    duplicate_similarity_threshold: float = 0.4
+    duplicate_link_threshold: float = 0.6
+    
+    # Automatic dispatch: how long a worker trusts its staff load index, and
+    # the open assignments at which staff stop receiving non-emergency work
+    dispatch_index_ttl_seconds: float = 30.0
+    dispatch_max_open_assignments: Optional[int] = None
+    
+    # SLA escalation: how long before sla_due_at a request is escalated, how
+    # many upcoming deadlines each worker holds in memory, and how often it
+    # reloads them to see requests created by other workers
+    sla_scheduler_enabled: bool = True
+    sla_escalation_lead_minutes: int = 0
+    sla_scheduler_window: int = 1000
+    sla_scheduler_refresh_seconds: float = 60.0
+    
+    # Tenant and staff notifications, delivered by outbox_worker.py to the
+    # comma-separated sinks: "log", "webhook" (POSTs JSON) and "smtp"
+    notification_sinks: str = "log"
+    notification_webhook_url: Optional[str] = None
+    notification_timeout_seconds: float = 10.0
+    smtp_host: str = "localhost"
+    smtp_port: int = 25
+    smtp_sender: str = "maintenance@example.com"
+    
+    # Outbox worker: messages claimed per batch, how long a claimed batch is
+    # held before another worker may retry it, failed attempts back off
+    # exponentially from outbox_backoff_seconds up to the maximum, and
+    # delivered messages are purged after the retention period
+    outbox_batch_size: int = 100
+    outbox_poll_seconds: float = 5.0
+    outbox_lease_seconds: float = 60.0
+    outbox_max_attempts: int = 8
+    outbox_backoff_seconds: float = 10.0
+    outbox_backoff_max_seconds: float = 3600.0
+    outbox_retention_hours: float = 168.0
+    
+    # Archival (python archive_requests.py): CLOSED requests created and
+    # closed more than this many whole months ago move to requests_archive
+    archive_after_months: int = 12
+    archive_batch_size: int = 1000
+    
+    # Largest number of items accepted by one bulk request
+    bulk_max_items: int = 5000
+    
     secret_key: str = "your-secret-key-here"
     api_host: str = "0.0.0.0"
     api_port: int = 8000
@@ -24,10 +107,31 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = False
     
+    @property
+    def sql_echo(self) -> bool:
+        """Echo SQL when asked to, otherwise only in development."""
+        if self.db_echo is not None:
+            return self.db_echo
+        return self.environment.lower() == "development"
+    
+    @property
+    def metrics_cache_control(self) -> str:
+        """Browsers revalidate every time; shared caches such as the CDN edge keep a copy for the cache TTL."""
+        return f"public, max-age=0, s-maxage={int(self.metrics_cache_ttl_seconds)}"
+    
     @property
     def database_url(self) -> str:
         """Construct PostgreSQL connection URL"""
         return f"postgresql+asyncpg://{self.pg_user}:{self.pg_password}@{self.pg_host}:{self.pg_port}/{self.pg_database}?ssl=require"
+    
+    @property
+    def replica_database_url(self) -> Optional[str]:
+        """Construct the read replica URL, or None when no replica is configured"""
+        if not self.pg_replica_host:
+            return None
+        port = self.pg_replica_port or self.pg_port
+        database = self.pg_replica_database or self.pg_database
+        return f"postgresql+asyncpg://{self.pg_user}:{self.pg_password}@{self.pg_replica_host}:{port}/{database}?ssl=require"
 
 
 settings = Settings()
@@ -1,13 +1,105 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import Index, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from typing import AsyncGenerator, Awaitable, Callable, Dict, Any, Optional
+import logging
+import time
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait to check out a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current occupancy and cumulative wait figures."""
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0,
+            "max_wait_ms": round(self.max_wait * 1000, 3)
+        }
+
+
+def engine_options() -> Dict[str, Any]:
+    """Engine keyword arguments derived from Settings."""
+    server_settings = {}
+    if settings.db_statement_timeout_ms:
+        server_settings["statement_timeout"] = str(settings.db_statement_timeout_ms)
+
+    return {
+        "echo": settings.sql_echo,
+        "future": True,
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+            "server_settings": server_settings
+        }
+    }
+
+
 # Create async engine
-engine = create_async_engine(
+engine = create_async_engine(settings.database_url, **engine_options())
+
+# Long-lived LISTEN connections are opened on their own, so they neither
+# hold a slot of the request pool nor are recycled by it
+listen_engine = create_async_engine(
+    settings.database_url,
+    echo=settings.sql_echo,
+    poolclass=NullPool,
+    connect_args=engine_options()["connect_args"]
+)
+
+# Duplicate checks at intake run outside the request's transaction, in
+# autocommit under their own statement timeout: one round trip each, and a
+# check cut short cannot abort the write. Without pre-ping, as a check on a
+# stale connection just reports nothing.
+duplicate_check_engine = create_async_engine(
     settings.database_url,
-    echo=True,
-    future=True
+    **{
+        **engine_options(),
+        "isolation_level": "AUTOCOMMIT",
+        "pool_pre_ping": False,
+        "connect_args": {
+            **engine_options()["connect_args"],
+            "server_settings": {"statement_timeout": str(settings.duplicate_check_timeout_ms)}
+        }
+    }
 )
 
 # Create async session factory
@@ -19,15 +111,143 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False
 )
 
+# Replay lag in seconds; 0 on a primary or a caught-up standby, NULL when unknown
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+class ReadRouter:
+    """
+    Route read-only sessions to the replica while it is reachable and within
+    the allowed replay lag, and to the primary otherwise. The lag is checked
+    at most once per check interval.
+    """
+
+    def __init__(
+        self,
+        primary_sessions: async_sessionmaker,
+        replica_engine: Optional[AsyncEngine] = None,
+        max_lag_seconds: float = 5.0,
+        check_interval: float = 5.0
+    ):
+        self.primary_sessions = primary_sessions
+        self.replica_engine = replica_engine
+        self.replica_sessions = async_sessionmaker(
+            replica_engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False
+        ) if replica_engine else None
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.lag_seconds: Optional[float] = None
+        self.replica_usable = False
+        self.checked_at: Optional[float] = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    async def check_replica(self) -> bool:
+        """Measure replica lag and decide whether reads may go there."""
+        self.checked_at = time.monotonic()
+        try:
+            async with self.replica_engine.connect() as conn:
+                lag = (await conn.execute(REPLICA_LAG_QUERY)).scalar()
+            self.lag_seconds = float(lag) if lag is not None else None
+            self.replica_usable = self.lag_seconds is not None and self.lag_seconds <= self.max_lag_seconds
+        except Exception as e:
+            logger.warning("Read replica unavailable, reading from primary: %s", e)
+            self.lag_seconds = None
+            self.replica_usable = False
+        return self.replica_usable
+
+    async def session_factory(self) -> async_sessionmaker:
+        """Session factory for the next read-only unit of work."""
+        if self.replica_sessions is not None:
+            if self.checked_at is None or time.monotonic() - self.checked_at >= self.check_interval:
+                await self.check_replica()
+            if self.replica_usable:
+                self.replica_reads += 1
+                return self.replica_sessions
+        self.primary_reads += 1
+        return self.primary_sessions
+
+    def stats(self) -> Dict[str, Any]:
+        """Routing counters plus the replica pool, when there is one."""
+        return {
+            "configured": self.replica_engine is not None,
+            "routing_to": "replica" if self.replica_sessions is not None and self.replica_usable else "primary",
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "pool": self.replica_engine.pool.stats() if self.replica_engine is not None else None
+        }
+
+
+read_engine = create_async_engine(settings.replica_database_url, **engine_options()) if settings.replica_database_url else None
+read_router = ReadRouter(
+    AsyncSessionLocal,
+    read_engine,
+    max_lag_seconds=settings.replica_max_lag_seconds,
+    check_interval=settings.replica_lag_check_interval
+)
+
 # Base class for models
 Base = declarative_base()
 
 
+def model_index(name: str) -> Index:
+    """The index of that name declared on a model."""
+    for table in Base.metadata.tables.values():
+        for index in table.indexes:
+            if index.name == name:
+                return index
+    raise KeyError(f"No model declares index {name}")
+
+
+async def build_indexes(*names: str) -> None:
+    """
+    Build the named model-declared indexes that do not exist yet on tables
+    that already existed. Each is built with CREATE INDEX CONCURRENTLY, so
+    writes to the table go on during the build; that cannot run inside a
+    transaction, so the connection is in autocommit. An index left invalid
+    by an interrupted build is dropped and built again.
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        # A build over a large table can outlast db_statement_timeout_ms
+        await conn.execute(text("SET statement_timeout = 0"))
+        try:
+            for name in names:
+                index = model_index(name)
+                valid = await conn.scalar(text("""
+                    SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                    WHERE c.relname = :name
+                """), {"name": name})
+                if valid:
+                    continue
+                if valid is not None:
+                    await conn.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+                ddl = str(CreateIndex(index).compile(dialect=conn.dialect))
+                logger.info("Building %s...", name)
+                await conn.exec_driver_sql(ddl.replace("INDEX", "INDEX CONCURRENTLY", 1))
+        finally:
+            await conn.execute(text("RESET statement_timeout"))
+
+
 class Database:
     @classmethod
     async def connect_db(cls):
         """
-        Initialize database connection and create tables.
+        Initialize database connection and create missing tables. Indexes
+        on tables that already existed are built by migrate_indexes.py, not
+        here, so startup never holds locks on the request tables.
         """
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
@@ -39,9 +259,23 @@ class Database:
         Close database connection.
         """
         await engine.dispose()
+        await duplicate_check_engine.dispose()
+        if read_engine is not None:
+            await read_engine.dispose()
         print("Closed PostgreSQL connection")
 
 
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Run `callback` once get_db has committed the session's transaction."""
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+async def run_after_commit(session: AsyncSession) -> None:
+    """Run the callbacks registered on a session whose transaction has committed."""
+    for callback in session.info.pop("after_commit", []):
+        await callback()
+
+
 # Dependency to get DB session
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
@@ -53,3 +287,15 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+        
+        await run_after_commit(session)
+
+
+# Dependency to get a read-only DB session, served by the replica when healthy
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    session_factory = await read_router.session_factory()
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,156 @@
+import heapq
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import after_commit
+from .models import IssueType, Priority
+from .models.db_models import RequestAssignment as DBRequestAssignment, Staff as DBStaff
+
+# Heap of every active staff member, used for issue types nobody specializes in
+ANY = None
+
+
+def specialty_key(value: str) -> str:
+    return value.strip().lower()
+
+
+def specialty_issue_types(specialties: Optional[Iterable[str]]) -> List[IssueType]:
+    """The issue types among a staff member's free-form specialties."""
+    keys = {specialty_key(name) for name in specialties or [] if name}
+    return [issue_type for issue_type in IssueType if specialty_key(issue_type.value) in keys]
+
+
+class DispatchIndex:
+    """
+    Active staff by specialty, each specialty a min-heap on (open
+    assignments, staff id). A change of load pushes a fresh entry instead of
+    reordering the heaps; entries whose load is out of date are dropped when
+    they reach the top, so choosing and assigning are O(log n).
+    """
+
+    def __init__(self, specialties: Dict[str, Iterable[str]], loads: Dict[str, int], max_load: Optional[int] = None):
+        self.max_load = max_load
+        self.loads = {staff_id: loads.get(staff_id, 0) for staff_id in specialties}
+        self.keys: Dict[str, List[Optional[str]]] = {}
+        self.heaps: Dict[Optional[str], List[Tuple[int, str]]] = {ANY: []}
+        for staff_id, names in specialties.items():
+            keys = sorted({specialty_key(name) for name in names or [] if name}) + [ANY]
+            self.keys[staff_id] = keys
+            for key in keys:
+                self.heaps.setdefault(key, []).append((self.loads[staff_id], staff_id))
+        for heap in self.heaps.values():
+            heapq.heapify(heap)
+
+    def __len__(self) -> int:
+        return len(self.loads)
+
+    def _least_loaded(self, key: Optional[str]) -> Optional[str]:
+        heap = self.heaps[key]
+        while heap:
+            load, staff_id = heap[0]
+            if self.loads.get(staff_id) == load:
+                return staff_id
+            heapq.heappop(heap)
+        return None
+
+    def choose(self, issue_type: IssueType, priority: Priority) -> Optional[str]:
+        """
+        The least loaded staff member specializing in the issue type, or of all
+        staff when nobody does. Nobody is chosen once that staff member holds
+        max_load open assignments, except for emergencies.
+        """
+        key = specialty_key(issue_type.value)
+        staff_id = self._least_loaded(key if key in self.heaps else ANY)
+        if staff_id is None:
+            return None
+        if self.max_load is not None and self.loads[staff_id] >= self.max_load and priority != Priority.EMERGENCY:
+            return None
+        return staff_id
+
+    def add_load(self, staff_id: str, delta: int = 1) -> None:
+        if staff_id not in self.loads:
+            return
+        self.loads[staff_id] = max(self.loads[staff_id] + delta, 0)
+        entry = (self.loads[staff_id], staff_id)
+        for key in self.keys[staff_id]:
+            heapq.heappush(self.heaps[key], entry)
+
+    def assign(self, issue_type: IssueType, priority: Priority) -> Optional[str]:
+        """Choose a staff member and count the assignment against them."""
+        staff_id = self.choose(issue_type, priority)
+        if staff_id is not None:
+            self.add_load(staff_id)
+        return staff_id
+
+    def assign_all(self, requests: Iterable[Tuple[str, IssueType, Priority]]) -> Dict[str, Optional[str]]:
+        """Dispatch (id, issue type, priority) requests in the order given, returning the staff chosen by id."""
+        return {request_id: self.assign(issue_type, priority) for request_id, issue_type, priority in requests}
+
+    def choose_all(self, requests: Iterable[Tuple[str, IssueType, Priority]]) -> Dict[str, Optional[str]]:
+        """
+        Choose staff for requests as assign_all does, each choice counted
+        against the next, but leave the loads as they were for the caller to
+        count once the assignments are committed.
+        """
+        chosen = self.assign_all(requests)
+        for staff_id, count in Counter(staff_id for staff_id in chosen.values() if staff_id is not None).items():
+            self.add_load(staff_id, -count)
+        return chosen
+
+
+class Dispatcher:
+    """
+    The dispatch index of this process. It is loaded from the database and
+    kept current by the assignments committed here; as other workers assign and
+    complete work too, it is reloaded after dispatch_index_ttl_seconds.
+    """
+
+    def __init__(self, ttl: float, max_load: Optional[int] = None):
+        self.ttl = ttl
+        self.max_load = max_load
+        self.index: Optional[DispatchIndex] = None
+        self.loaded_at = 0.0
+        self.reloads = 0
+
+    async def get_index(self, db: AsyncSession) -> DispatchIndex:
+        if self.index is None or time.monotonic() - self.loaded_at > self.ttl:
+            await self.load(db)
+        return self.index
+
+    async def load(self, db: AsyncSession) -> None:
+        staff_query = select(DBStaff.id, DBStaff.specialties).where(DBStaff.active.isnot(False))
+        staff_result = await db.execute(staff_query)
+        # Open assignments per staff member, read off ix_request_assignments_staff_active
+        load_query = select(DBRequestAssignment.staff_id, func.count()).where(
+            DBRequestAssignment.completed_at.is_(None)
+        ).group_by(DBRequestAssignment.staff_id)
+        load_result = await db.execute(load_query)
+        self.index = DispatchIndex(dict(staff_result.all()), dict(load_result.all()), self.max_load)
+        self.loaded_at = time.monotonic()
+        self.reloads += 1
+
+    def add_load(self, db: AsyncSession, staff_id: str, delta: int = 1) -> None:
+        """Count `delta` more open assignments against a staff member once `db` commits."""
+        async def apply():
+            if self.index is not None:
+                self.index.add_load(staff_id, delta)
+        after_commit(db, apply)
+
+    async def invalidate(self) -> None:
+        """Reload the index on next use, e.g. once staff or their specialties change."""
+        self.index = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "staff": len(self.index) if self.index is not None else None,
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.index is not None else None,
+            "reloads": self.reloads
+        }
+
+
+dispatcher = Dispatcher(settings.dispatch_index_ttl_seconds, settings.dispatch_max_open_assignments)
@@ -0,0 +1,180 @@
+import hashlib
+import logging
+import re
+import struct
+from enum import Enum
+from functools import lru_cache
+from typing import List, Optional, Set
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .config import settings
+from .database import duplicate_check_engine
+from .models import DuplicateCandidate, IssueType
+from .models.db_models import OPEN_STATUSES, Request as DBRequest
+
+logger = logging.getLogger(__name__)
+
+# MinHash signature length and how many of its values each LSH band combines;
+# a band packs its two 32-bit values into one bigint.
+# 16 bands of 2 make a pair with trigram similarity 0.3 share a band 79% of
+# the time, 0.5 99%, and 0.1 only 15%.
+NUM_HASHES = 32
+BAND_ROWS = 2
+_unpack_hashes = struct.Struct(f"<{NUM_HASHES}I").unpack
+
+# Band matches read per check, the newest of them scored, and duplicates reported
+MAX_MATCHES = 1000
+MAX_CANDIDATES = 50
+MAX_DUPLICATES = 5
+
+QUERY_CANCELED = "57014"
+BACKFILL_BATCH_SIZE = 5000
+
+
+class DuplicatePolicy(str, Enum):
+    CREATE = "create"  # always create, reporting likely duplicates
+    LINK = "link"  # add the submission as a note on a close enough open request instead
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of each word, padded the way pg_trgm pads them."""
+    grams = set()
+    for word in re.split(r"[^a-z0-9]+", text.lower()):
+        if word:
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of two texts' trigram sets."""
+    a, b = trigrams(a), trigrams(b)
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+@lru_cache(maxsize=4096)
+def _band_salts(building_id: str, issue_type: IssueType) -> tuple:
+    """Per-band 64-bit salts, so only requests with the same building and issue type share bands."""
+    return tuple(
+        int.from_bytes(hashlib.blake2b(f"{building_id}:{issue_type.name}:{band}".encode(), digest_size=8).digest(), "big")
+        for band in range(NUM_HASHES // BAND_ROWS)
+    )
+
+
+@lru_cache(maxsize=4096)
+def _bands(building_id: str, issue_type: IssueType, description: str) -> Optional[tuple]:
+    grams = trigrams(description)
+    if not grams:
+        return None
+    # One 128-byte shake digest per trigram gives NUM_HASHES independent 32-bit hashes
+    signature = list(map(min, zip(*(
+        _unpack_hashes(hashlib.shake_128(gram.encode()).digest(4 * NUM_HASHES)) for gram in grams
+    ))))
+    bands = []
+    for band, salt in enumerate(_band_salts(building_id, issue_type)):
+        value = salt ^ (signature[band * BAND_ROWS] << 32 | signature[band * BAND_ROWS + 1])
+        bands.append(value - (1 << 64) if value >= 1 << 63 else value)  # as a signed bigint
+    return tuple(bands)
+
+
+def description_bands(building_id: str, issue_type: IssueType, description: str) -> Optional[List[int]]:
+    """
+    Locality-sensitive hashes of a request for requests.description_bands.
+    Requests in the same building with the same issue type and similar
+    descriptions are likely to share at least one band, so a GIN lookup
+    on `&&` finds duplicate candidates without comparing descriptions.
+    """
+    bands = _bands(building_id, issue_type, description)
+    return list(bands) if bands is not None else None
+
+
+async def find_duplicates(building_id: str, issue_type: IssueType, description: str) -> List[DuplicateCandidate]:
+    """
+    Open requests in the building with the same issue type whose
+    description is at least duplicate_similarity_threshold similar, most
+    similar first. The lookup is a single autocommit statement on
+    duplicate_check_engine, under a duplicate_check_timeout_ms statement
+    timeout; when it runs out the check reports nothing rather than
+    holding up intake.
+    """
+    bands = description_bands(building_id, issue_type, description)
+    if bands is None:
+        return []
+    # Materialized so the planner cannot trade the GIN lookup for a walk down
+    # the created_at index that filters every open request
+    matches = select(
+        DBRequest.id, DBRequest.unit_id, DBRequest.description, DBRequest.status, DBRequest.created_at
+    ).where(
+        DBRequest.description_bands.overlap(bands), OPEN_STATUSES
+    ).limit(MAX_MATCHES).cte("matches").prefix_with("MATERIALIZED")
+    query = select(matches).order_by(matches.c.created_at.desc()).limit(MAX_CANDIDATES)
+
+    try:
+        async with duplicate_check_engine.connect() as conn:
+            rows = (await conn.execute(query)).all()
+    except DBAPIError as e:
+        if getattr(e.orig, "sqlstate", None) == QUERY_CANCELED:
+            logger.warning("Duplicate check exceeded %sms, skipped", settings.duplicate_check_timeout_ms)
+        elif e.connection_invalidated:
+            logger.warning("Duplicate check lost its connection, skipped: %s", e)
+        else:
+            raise
+        rows = []
+
+    duplicates = [
+        DuplicateCandidate(
+            id=row.id, unit_id=row.unit_id, description=row.description, status=row.status,
+            created_at=row.created_at, similarity=round(similarity(description, row.description), 3)
+        )
+        for row in rows
+    ]
+    duplicates = [d for d in duplicates if d.similarity >= settings.duplicate_similarity_threshold]
+    duplicates.sort(key=lambda d: d.similarity, reverse=True)
+    return duplicates[:MAX_DUPLICATES]
+
+
+async def fill_missing_bands(db, ids: List[str]) -> None:
+    """
+    Compute description_bands for the given requests that have none, e.g.
+    closed requests written before the column existed that a bulk status
+    change reopens. Run after the status change, in the same transaction.
+    """
+    table = DBRequest.__table__
+    query = select(table.c.id, table.c.building_id, table.c.issue_type, table.c.description).where(
+        table.c.id.in_(ids), table.c.description_bands.is_(None)
+    )
+    rows = (await db.execute(query)).all()
+    if rows:
+        await _fill_bands(db, rows)
+
+
+async def _fill_bands(db, rows) -> None:
+    table = DBRequest.__table__
+    fill = update(table).where(table.c.id == bindparam("request_id")).values(description_bands=bindparam("bands"))
+    await db.execute(fill, [
+        {"request_id": row.id, "bands": description_bands(row.building_id, row.issue_type, row.description)}
+        for row in rows
+    ])
+
+
+async def backfill_description_bands(conn: AsyncConnection) -> int:
+    """
+    Compute description_bands for open requests written without them, e.g.
+    before the column existed or by the SQL bench seeder. Returns the
+    number of requests updated.
+    """
+    table = DBRequest.__table__
+    last_id, total = "", 0
+    while True:
+        query = select(table.c.id, table.c.building_id, table.c.issue_type, table.c.description).where(
+            table.c.id > last_id, table.c.description_bands.is_(None), OPEN_STATUSES
+        ).order_by(table.c.id).limit(BACKFILL_BATCH_SIZE)
+        rows = (await conn.execute(query)).all()
+        if not rows:
+            return total
+        await _fill_bands(conn, rows)
+        last_id = rows[-1].id
+        total += len(rows)
@@ -0,0 +1,68 @@
+import hashlib
+from typing import Sequence
+
+from fastapi import HTTPException, Request, Response
+
+from .cache import metrics_cache
+from .config import settings
+
+
+def make_etag(*parts) -> str:
+    """Strong entity tag over the given parts of a representation."""
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def row_version(row) -> str:
+    """
+    When a row last changed. updated_at is only set by the API, so rows
+    written with plain SQL fall back to created_at when it was read, and to
+    a constant otherwise.
+    """
+    stamp = row.updated_at or getattr(row, "created_at", None)
+    return stamp.isoformat() if stamp is not None else "-"
+
+
+def rows_etag(http_request: Request, rows: Sequence) -> str:
+    """
+    Entity tag for a response built from `rows`. Every write stamps
+    updated_at, so the ids and update times of the rows together with the
+    URL (filters, fields, include, page) identify the representation.
+    """
+    return make_etag(
+        http_request.url.path,
+        http_request.url.query,
+        *[f"{row.id}@{row_version(row)}" for row in rows]
+    )
+
+
+def matches(http_request: Request, etag: str) -> bool:
+    """If-None-Match check; it uses the weak comparison RFC 9110 prescribes."""
+    header = http_request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in [tag.removeprefix("W/") for tag in candidates]
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def set_etag(response: Response, etag: str, cache_control: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+async def metrics_etag(http_request: Request, response: Response) -> None:
+    """
+    Router dependency for /metrics: answer 304 from the cache's data
+    version before the handler runs, so neither the cache entry nor
+    PostgreSQL is consulted for an unchanged dashboard.
+    """
+    etag = make_etag(await metrics_cache.data_tag(), http_request.url.path, http_request.url.query)
+    cache_control = settings.metrics_cache_control
+    if matches(http_request, etag):
+        raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    set_etag(response, etag, cache_control)
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import logging
+import random
+from contextlib import suppress
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import after_commit, listen_engine
+from .models.db_models import RequestAssignment as DBRequestAssignment
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "request_events"
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD_BYTES = 7500
+
+
+def request_event(
+    event_type: str,
+    request_id: str,
+    building_id: str,
+    status: Any = None,
+    staff_ids: Iterable[str] = ()
+) -> Dict[str, Any]:
+    """An event as sent to stream subscribers."""
+    return {
+        "type": event_type,
+        "request_id": request_id,
+        "building_id": building_id,
+        "status": getattr(status, "value", status),
+        "staff_ids": sorted(set(staff_ids)),
+        "at": datetime.utcnow().isoformat()
+    }
+
+
+async def active_staff_by_request(db: AsyncSession, ids: List[str]) -> Dict[str, List[str]]:
+    """Staff members holding an open assignment on each request, to address its events."""
+    query = select(DBRequestAssignment.request_id, DBRequestAssignment.staff_id).where(
+        DBRequestAssignment.request_id.in_(ids),
+        DBRequestAssignment.completed_at.is_(None)
+    )
+    result = await db.execute(query)
+    staff = {request_id: [] for request_id in ids}
+    for request_id, staff_id in result.all():
+        staff[request_id].append(staff_id)
+    return staff
+
+
+def _payloads(events: List[Dict[str, Any]]) -> List[str]:
+    """Pack events into JSON arrays that each fit in one NOTIFY payload."""
+    payloads, batch, size = [], [], 2
+    for event in events:
+        encoded = json.dumps(event)
+        if batch and size + len(encoded) + 1 > MAX_PAYLOAD_BYTES:
+            payloads.append("[" + ",".join(batch) + "]")
+            batch, size = [], 2
+        batch.append(encoded)
+        size += len(encoded) + 1
+    if batch:
+        payloads.append("[" + ",".join(batch) + "]")
+    return payloads
+
+
+class EventBroker:
+    """
+    Fan request events out to the stream subscribers of this process.
+    With the "postgres" backend writers NOTIFY inside their transaction, so
+    events are only delivered once committed and reach every worker, which
+    each hold one LISTEN connection. The "memory" backend, also used while
+    the listener cannot connect, publishes after commit to this process only;
+    a lost listener is reconnected in the background.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        queue_size: int = 100,
+        reconnect_seconds: float = 1.0,
+        reconnect_max_seconds: float = 60.0
+    ):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.reconnect_seconds = reconnect_seconds
+        self.reconnect_max_seconds = reconnect_max_seconds
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.listener = None
+        self.listener_driver = None
+        self.reconnect_task: Optional[asyncio.Task] = None
+        self.reconnects = 0
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def listening(self) -> bool:
+        return self.listener is not None
+
+    @property
+    def degraded(self) -> bool:
+        """Configured for PostgreSQL but delivering in-process, as the listener is down."""
+        return self.backend == "postgres" and not self.listening
+
+    async def start(self) -> None:
+        if self.backend != "postgres":
+            return
+        if not await self._listen():
+            self._schedule_reconnect()
+
+    async def _listen(self) -> bool:
+        """LISTEN on a connection of its own, outside the request pool."""
+        try:
+            connection = await listen_engine.connect()
+            try:
+                raw = await connection.get_raw_connection()
+                driver = raw.driver_connection
+                await driver.add_listener(CHANNEL, self._on_notify)
+                driver.add_termination_listener(self._on_terminated)
+            except Exception:
+                await connection.invalidate()
+                raise
+        except Exception as e:
+            logger.warning("Cannot LISTEN on %s, publishing request events in-process: %s", CHANNEL, e)
+            return False
+        self.listener = connection
+        self.listener_driver = driver
+        return True
+
+    def _schedule_reconnect(self, lost=None) -> None:
+        if self.reconnect_task is None or self.reconnect_task.done():
+            self.reconnect_task = asyncio.get_running_loop().create_task(self._reconnect(lost))
+
+    async def _reconnect(self, lost=None) -> None:
+        """Retry the LISTEN connection with exponential backoff and jitter until it is back."""
+        if lost is not None:
+            with suppress(Exception):
+                await lost.invalidate()
+        delay = self.reconnect_seconds
+        while True:
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            if await self._listen():
+                self.reconnects += 1
+                logger.info("LISTEN connection on %s restored", CHANNEL)
+                return
+            delay = min(delay * 2, self.reconnect_max_seconds)
+
+    async def stop(self) -> None:
+        if self.reconnect_task is not None:
+            self.reconnect_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.reconnect_task
+            self.reconnect_task = None
+        if self.listener is not None:
+            listener, self.listener = self.listener, None
+            driver, self.listener_driver = self.listener_driver, None
+            if not driver.is_closed():
+                await driver.remove_listener(CHANNEL, self._on_notify)
+            await listener.close()
+
+    def _on_terminated(self, connection) -> None:
+        # Only a connection lost under us is reconnected, not one closed by stop()
+        if connection is not self.listener_driver:
+            return
+        logger.warning("LISTEN connection on %s closed, publishing request events in-process until it is back", CHANNEL)
+        lost, self.listener, self.listener_driver = self.listener, None, None
+        self._schedule_reconnect(lost)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        for event in json.loads(payload):
+            self.deliver(event)
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        """Hand an event to every local subscriber, dropping it for those that fall behind."""
+        self.published += 1
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    async def publish(self, db: AsyncSession, events: List[Dict[str, Any]]) -> None:
+        """Publish events when `db`'s transaction commits."""
+        if not events:
+            return
+        if self.listening:
+            payloads = _payloads(events)
+            await db.execute(select(*[func.pg_notify(CHANNEL, payload) for payload in payloads]))
+        else:
+            async def deliver_all():
+                for event in events:
+                    self.deliver(event)
+            after_commit(db, deliver_all)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.discard(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "postgres" if self.listening else "memory",
+            "degraded": self.degraded,
+            "reconnecting": self.reconnect_task is not None and not self.reconnect_task.done(),
+            "reconnects": self.reconnects,
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "dropped": self.dropped
+        }
+
+
+event_broker = EventBroker(
+    settings.request_events_backend,
+    settings.request_events_queue_size,
+    settings.request_events_reconnect_seconds,
+    settings.request_events_reconnect_max_seconds
+)
+
+
+def matches_filter(event: Dict[str, Any], building_id: Optional[str], staff_id: Optional[str]) -> bool:
+    if building_id and event["building_id"] != building_id:
+        return False
+    if staff_id and staff_id not in event["staff_ids"]:
+        return False
+    return True
+
+
+async def stream_events(building_id: Optional[str], staff_id: Optional[str]):
+    """
+    Subscribe and yield events as server-sent events, with a comment line as
+    a keep-alive when nothing happens so proxies keep the connection open.
+    The subscription is taken here, so a client gone before the stream
+    starts never leaves a queue behind.
+    """
+    queue = event_broker.subscribe()
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.request_events_keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if matches_filter(event, building_id, staff_id):
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        event_broker.unsubscribe(queue)
@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator
+
+from .models.db_models import Request as DBRequest
+
+# Rows fetched from the server-side cursor per round trip, and per chunk written
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = [
+    DBRequest.id, DBRequest.external_id, DBRequest.tenant_id, DBRequest.unit_id, DBRequest.building_id,
+    DBRequest.issue_type, DBRequest.priority, DBRequest.status, DBRequest.description,
+    DBRequest.target_sla_hours, DBRequest.location_details, DBRequest.created_at, DBRequest.updated_at,
+    DBRequest.closed_at, DBRequest.resolution_notes
+]
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+def export_value(value):
+    """Render a column value the same way in both formats."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_csv(rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            "" if value is None else json.dumps(value) if isinstance(value, dict) else export_value(value)
+            for value in row
+        ])
+    return buffer.getvalue()
+
+
+def encode_ndjson(rows) -> str:
+    names = [column.key for column in EXPORT_COLUMNS]
+    return "".join(
+        json.dumps(dict(zip(names, map(export_value, row)))) + "\n"
+        for row in rows
+    )
+
+
+async def stream_export(session_factory, query, format: ExportFormat) -> AsyncIterator[str]:
+    """
+    Yield `query`'s rows encoded as CSV or NDJSON, one chunk per batch.
+    Only one batch is held in memory at a time.
+    """
+    encode = encode_csv if format == ExportFormat.CSV else encode_ndjson
+    if format == ExportFormat.CSV:
+        yield encode_csv([[column.key for column in EXPORT_COLUMNS]])
+
+    async with session_factory() as session:
+        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield encode(rows)
@@ -2,8 +2,15 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from .database import Database
+from .database import AsyncSessionLocal, Database, engine, read_router
 from .config import settings
+from .pagination import NEXT_CURSOR_HEADER
+from .cache import metrics_cache
+from .events import event_broker
+from .dispatch import dispatcher
+from .sla import sla_scheduler
+from .outbox import outbox_backlog
+from .rollups import seed_rollups
 from .routers import buildings, units, tenants, staff, requests, metrics
 
 
@@ -15,11 +22,18 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     await Database.connect_db()
+    async with engine.begin() as conn:
+        if await seed_rollups(conn):
+            print("Built metrics rollups from existing requests")
+    await event_broker.start()
+    await sla_scheduler.start()
     print("Application startup complete")
     
     yield
     
     # Shutdown
+    await sla_scheduler.stop()
+    await event_broker.stop()
     await Database.close_db()
     print("Application shutdown complete")
 
@@ -44,6 +58,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Include routers
@@ -72,6 +87,46 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/pool")
+async def pool_stats():
+    """Connection pool occupancy, checkout wait times and read replica routing."""
+    return {
+        "primary": engine.pool.stats(),
+        "replica": read_router.stats()
+    }
+
+
+@app.get("/health/cache")
+async def cache_stats():
+    """Metrics response cache hit and miss counters."""
+    return await metrics_cache.stats()
+
+
+@app.get("/health/events")
+async def event_stats():
+    """Request event stream subscribers and delivery counters."""
+    return event_broker.stats()
+
+
+@app.get("/health/dispatch")
+async def dispatch_stats():
+    """Size, age and reload count of this worker's dispatch index."""
+    return dispatcher.stats()
+
+
+@app.get("/health/sla")
+async def sla_stats():
+    """Deadlines held by this worker's SLA scheduler and escalations made."""
+    return sla_scheduler.stats()
+
+
+@app.get("/health/outbox")
+async def outbox_stats():
+    """Notifications waiting for outbox_worker.py and those it gave up on."""
+    async with AsyncSessionLocal() as db:
+        return await outbox_backlog(db)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
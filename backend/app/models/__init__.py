@@ -3,10 +3,14 @@ from .schemas import (
     Unit, UnitCreate, UnitUpdate,
     Tenant, TenantCreate, TenantUpdate,
     Staff, StaffCreate, StaffUpdate,
-    Request, RequestCreate, RequestUpdate,
+    Request, RequestCreate, RequestUpdate, RequestView, RequestSearchResult,
+    RequestCreated, DuplicateCandidate,
     RequestStatus, Priority, IssueType,
     Assignment, AssignmentCreate,
     Note, NoteCreate,
+    BulkItemResult, BulkResult, RequestFilter, BulkSelection,
+    BulkStatusUpdate, BulkAssignmentCreate, BulkUpdateResult,
+    DispatchBacklog, DispatchedAssignment, DispatchResult, ClaimRequest,
     EmergencyContact, LocationDetails
 )
 
@@ -15,9 +19,13 @@ __all__ = [
     "Unit", "UnitCreate", "UnitUpdate",
     "Tenant", "TenantCreate", "TenantUpdate",
     "Staff", "StaffCreate", "StaffUpdate",
-    "Request", "RequestCreate", "RequestUpdate",
+    "Request", "RequestCreate", "RequestUpdate", "RequestView", "RequestSearchResult",
+    "RequestCreated", "DuplicateCandidate",
     "RequestStatus", "Priority", "IssueType",
     "Assignment", "AssignmentCreate",
     "Note", "NoteCreate",
+    "BulkItemResult", "BulkResult", "RequestFilter", "BulkSelection",
+    "BulkStatusUpdate", "BulkAssignmentCreate", "BulkUpdateResult",
+    "DispatchBacklog", "DispatchedAssignment", "DispatchResult", "ClaimRequest",
     "EmergencyContact", "LocationDetails"
 ]
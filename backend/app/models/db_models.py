@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Text, ForeignKey, JSON, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Date, DateTime, Boolean, Text, ForeignKey, JSON, Index, Enum as SQLEnum, Computed, text
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import enum
 from ..database import Base
@@ -34,6 +35,9 @@ class IssueType(str, enum.Enum):
 
 class Building(Base):
     __tablename__ = "buildings"
+    __table_args__ = (
+        Index("ix_buildings_created_at_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True)
     name = Column(String(200), nullable=False)
@@ -52,6 +56,10 @@ class Building(Base):
 
 class Unit(Base):
     __tablename__ = "units"
+    __table_args__ = (
+        Index("uq_units_building_id_unit_number", "building_id", "unit_number", unique=True),
+        Index("ix_units_created_at_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True)
     building_id = Column(String, ForeignKey("buildings.id", ondelete="CASCADE"), nullable=False)
@@ -71,6 +79,11 @@ class Unit(Base):
 
 class Tenant(Base):
     __tablename__ = "tenants"
+    __table_args__ = (
+        Index("uq_tenants_email", "email", unique=True),
+        Index("ix_tenants_unit_id", "unit_id"),
+        Index("ix_tenants_created_at_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True)
     unit_id = Column(String, ForeignKey("units.id", ondelete="SET NULL"))
@@ -93,6 +106,10 @@ class Tenant(Base):
 
 class Staff(Base):
     __tablename__ = "staff"
+    __table_args__ = (
+        Index("uq_staff_email", "email", unique=True),
+        Index("ix_staff_created_at_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True)
     full_name = Column(String(200), nullable=False)
@@ -106,8 +123,48 @@ class Staff(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+# Requests that still need work; the partial indexes below are declared with this predicate
+OPEN_STATUSES = text("status IN ('OPEN', 'IN_PROGRESS', 'PENDING')")
+
+
 class Request(Base):
     __tablename__ = "requests"
+    __table_args__ = (
+        # Newest-first listing and keyset pagination
+        Index("ix_requests_created_at_id", "created_at", "id"),
+        # Per-building dashboards filtered by status
+        Index("ix_requests_building_status_created", "building_id", "status", "created_at"),
+        # Tenant request history
+        Index("ix_requests_tenant_created", "tenant_id", "created_at"),
+        Index("ix_requests_status_created", "status", "created_at"),
+        Index("ix_requests_issue_type_created", "issue_type", "created_at"),
+        Index("ix_requests_priority_created", "priority", "created_at"),
+        # Open work queue; closed history is excluded so it stays small
+        Index("ix_requests_open_created", "created_at", postgresql_where=OPEN_STATUSES),
+        # Work queue: requests waiting for a technician, most urgent and earliest due first
+        Index(
+            "ix_requests_work_queue",
+            text("priority DESC"), "sla_due_at",
+            postgresql_where=text("status = 'OPEN'")
+        ),
+        # Duplicate candidates at intake: open requests sharing a MinHash band.
+        # Every insert looks this index up, so new entries skip the pending list.
+        Index(
+            "ix_requests_open_description_bands",
+            "description_bands",
+            postgresql_using="gin",
+            postgresql_with={"fastupdate": "off"},
+            postgresql_where=OPEN_STATUSES
+        ),
+        # Full-text search over description and resolution notes
+        Index("ix_requests_search_vector", "search_vector", postgresql_using="gin"),
+        # SLA deadlines still to escalate, soonest first
+        Index(
+            "ix_requests_sla_pending",
+            "sla_due_at",
+            postgresql_where=text(f"{OPEN_STATUSES.text} AND sla_escalated_at IS NULL")
+        ),
+    )
 
     id = Column(String, primary_key=True)
     external_id = Column(String(100))
@@ -123,11 +180,203 @@ class Request(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     closed_at = Column(DateTime)
-    assignments = Column(JSON, default=list)
-    notes = Column(JSON, default=list)
     resolution_notes = Column(Text)
+    # Maintained by PostgreSQL as created_at and target_sla_hours change
+    sla_due_at = Column(DateTime, Computed("created_at + target_sla_hours * interval '1 hour'", persisted=True))
+    # Set once the SLA scheduler has escalated the request (see app.sla)
+    sla_escalated_at = Column(DateTime)
+    # Maintained by PostgreSQL on every write; description ranks above resolution notes
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(description, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(resolution_notes, '')), 'B')",
+        persisted=True
+    )))
+    # LSH bands of building, issue type and description (see app.duplicates)
+    description_bands = deferred(Column(ARRAY(BigInteger)))
 
     # Relationships
     tenant = relationship("Tenant", back_populates="requests")
     unit = relationship("Unit", back_populates="requests")
     building = relationship("Building", back_populates="requests")
+    assignments = relationship(
+        "RequestAssignment",
+        back_populates="request",
+        cascade="all, delete-orphan",
+        order_by="RequestAssignment.assigned_at",
+        lazy="selectin"
+    )
+    # Notes can grow long, so they are only loaded when a query asks for them
+    notes = relationship(
+        "RequestNote",
+        back_populates="request",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="[RequestNote.created_at, RequestNote.id]",
+        lazy="noload"
+    )
+
+
+class RequestAssignment(Base):
+    __tablename__ = "request_assignments"
+    __table_args__ = (
+        # A staff member can hold at most one active assignment per request
+        Index(
+            "uq_request_assignments_active",
+            "request_id", "staff_id",
+            unique=True,
+            postgresql_where=text("completed_at IS NULL")
+        ),
+        Index("ix_request_assignments_request", "request_id", "assigned_at"),
+        Index("ix_request_assignments_staff", "staff_id", "assigned_at"),
+        # Active jobs per staff member
+        Index(
+            "ix_request_assignments_staff_active",
+            "staff_id",
+            postgresql_where=text("completed_at IS NULL")
+        ),
+    )
+
+    id = Column(String, primary_key=True)
+    request_id = Column(String, ForeignKey("requests.id", ondelete="CASCADE"), nullable=False)
+    staff_id = Column(String, nullable=False)
+    assigned_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    accepted_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    notes = Column(Text)
+
+    # Relationships
+    request = relationship("Request", back_populates="assignments")
+
+
+class RequestNote(Base):
+    __tablename__ = "request_notes"
+    __table_args__ = (
+        Index("ix_request_notes_request_created", "request_id", "created_at", "id"),
+        Index("ix_request_notes_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    id = Column(String, primary_key=True)
+    request_id = Column(String, ForeignKey("requests.id", ondelete="CASCADE"), nullable=False)
+    author_type = Column(String(20), nullable=False)
+    author_id = Column(String, nullable=False)
+    author_name = Column(String(200), nullable=False)
+    body = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', body), 'C')", persisted=True
+    )))
+
+    # Relationships
+    request = relationship("Request", back_populates="notes")
+
+
+# Current number of requests per building, status, priority and issue type
+class RequestStatusRollup(Base):
+    __tablename__ = "request_status_rollups"
+
+    building_id = Column(String, primary_key=True)
+    status = Column(SQLEnum(RequestStatus), primary_key=True)
+    priority = Column(SQLEnum(Priority), primary_key=True)
+    issue_type = Column(SQLEnum(IssueType), primary_key=True)
+    request_count = Column(Integer, nullable=False, default=0)
+
+
+# Number of requests created per day and building
+class RequestDailyRollup(Base):
+    __tablename__ = "request_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    building_id = Column(String, primary_key=True)
+    request_count = Column(Integer, nullable=False, default=0)
+
+
+# Tenant and staff notifications, written in the transaction of the change
+# they announce and delivered afterwards by outbox_worker.py (see app.outbox)
+class OutboxMessage(Base):
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        # Messages still to deliver, in the order they become due
+        Index(
+            "ix_notification_outbox_pending",
+            "available_at",
+            postgresql_where=text("delivered_at IS NULL AND failed_at IS NULL")
+        ),
+        Index("ix_notification_outbox_request", "request_id"),
+        # Delivered messages past their retention, for purging
+        Index(
+            "ix_notification_outbox_delivered",
+            "delivered_at",
+            postgresql_where=text("delivered_at IS NOT NULL")
+        ),
+        # Messages given up on, for inspection
+        Index("ix_notification_outbox_failed", "failed_at", postgresql_where=text("failed_at IS NOT NULL")),
+    )
+
+    # Also the idempotency key sinks receive, so retried deliveries can be recognised
+    id = Column(String, primary_key=True)
+    event_type = Column(String(50), nullable=False)
+    request_id = Column(String, ForeignKey("requests.id", ondelete="CASCADE"), nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Next delivery attempt, pushed back while a worker holds the message and after failures
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    delivered_at = Column(DateTime)
+    # Set when the last allowed attempt fails; the message is not retried again
+    failed_at = Column(DateTime)
+
+
+# CLOSED requests moved out of `requests` once old enough (see app.archive).
+# Range partitioned by created_at month, so the partition key is part of the
+# primary key; partitions are created by the archiver as it needs them.
+class ArchivedRequest(Base):
+    __tablename__ = "requests_archive"
+    __table_args__ = (
+        Index("ix_requests_archive_created_at_id", "created_at", "id"),
+        Index("ix_requests_archive_tenant_created", "tenant_id", "created_at"),
+        Index("ix_requests_archive_building_created", "building_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id = Column(String, primary_key=True)
+    created_at = Column(DateTime, primary_key=True)
+    external_id = Column(String(100))
+    tenant_id = Column(String, nullable=False)
+    unit_id = Column(String, nullable=False)
+    building_id = Column(String, nullable=False)
+    issue_type = Column(SQLEnum(IssueType), nullable=False)
+    priority = Column(SQLEnum(Priority), nullable=False)
+    description = Column(Text, nullable=False)
+    status = Column(SQLEnum(RequestStatus), nullable=False)
+    target_sla_hours = Column(Integer)
+    location_details = Column(JSON)
+    updated_at = Column(DateTime)
+    closed_at = Column(DateTime)
+    resolution_notes = Column(Text)
+    sla_due_at = Column(DateTime)
+    sla_escalated_at = Column(DateTime)
+    # Assignments and notes as the API returns them, since their tables only hold live requests
+    assignments = Column(JSON, nullable=False, default=list)
+    notes = Column(JSON, nullable=False, default=list)
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+# What archived requests add to /metrics/overview, per issue type
+class ArchivedIssueRollup(Base):
+    __tablename__ = "request_archive_rollups"
+
+    issue_type = Column(SQLEnum(IssueType), primary_key=True)
+    request_count = Column(Integer, nullable=False, default=0)
+    resolved_count = Column(Integer, nullable=False, default=0)
+    resolution_hours = Column(Float, nullable=False, default=0)
+    sla_breach_count = Column(Integer, nullable=False, default=0)
+
+
+# What the assignments of archived requests add to /metrics/staff-performance
+class ArchivedAssignmentRollup(Base):
+    __tablename__ = "assignment_archive_rollups"
+
+    staff_id = Column(String, primary_key=True)
+    assignment_count = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
@@ -3,6 +3,8 @@ from typing import Optional, List
 from datetime import datetime
 from enum import Enum
 
+from ..config import settings
+
 
 # Building Models
 class BuildingBase(BaseModel):
@@ -177,6 +179,9 @@ class Assignment(BaseModel):
     completed_at: Optional[datetime] = None
     notes: Optional[str] = None
 
+    class Config:
+        from_attributes = True
+
 
 class Note(BaseModel):
     id: Optional[str] = None
@@ -227,14 +232,61 @@ class Request(RequestBase):
     created_at: datetime
     updated_at: datetime
     closed_at: Optional[datetime] = None
+    sla_due_at: Optional[datetime] = None
+    sla_escalated_at: Optional[datetime] = None
     assignments: List[Assignment] = []
-    notes: List[Note] = []
     resolution_notes: Optional[str] = None
+    # Notes are read with GET /requests/{id}/notes or include=notes, never loaded on writes
 
     class Config:
         from_attributes = True
 
 
+class RequestView(BaseModel):
+    """
+    A request as the read endpoints return it. With `fields=` only the
+    listed fields and `id` are present, and the collections are only
+    present when named in `include=`; fields left out are absent, not null.
+    """
+    external_id: Optional[str] = None
+    tenant_id: Optional[str] = None
+    unit_id: Optional[str] = None
+    building_id: Optional[str] = None
+    issue_type: Optional[IssueType] = None
+    priority: Optional[Priority] = None
+    description: Optional[str] = None
+    target_sla_hours: Optional[int] = None
+    location_details: Optional[LocationDetails] = None
+    id: str
+    status: Optional[RequestStatus] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    closed_at: Optional[datetime] = None
+    sla_due_at: Optional[datetime] = None
+    sla_escalated_at: Optional[datetime] = None
+    assignments: Optional[List[Assignment]] = None
+    notes: Optional[List[Note]] = None
+    resolution_notes: Optional[str] = None
+
+
+class DuplicateCandidate(BaseModel):
+    id: str
+    unit_id: str
+    description: str
+    status: RequestStatus
+    created_at: datetime
+    similarity: float  # trigram similarity of the descriptions, 0 to 1
+
+
+class RequestCreated(Request):
+    possible_duplicates: List[DuplicateCandidate] = []
+    linked: bool = False  # the submission was added to an existing request instead
+
+
+class RequestSearchResult(RequestView):
+    rank: float  # relevance to the search, higher first
+
+
 class AssignmentCreate(BaseModel):
     staff_id: str
     notes: Optional[str] = None
@@ -245,3 +297,68 @@ class NoteCreate(BaseModel):
     author_id: str
     author_name: str
     body: str = Field(..., max_length=2000)
+
+
+# Bulk operation results
+class BulkItemResult(BaseModel):
+    index: int  # position of the item in the submitted list
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+class RequestFilter(BaseModel):
+    status: Optional[RequestStatus] = None
+    building_id: Optional[str] = None
+    tenant_id: Optional[str] = None
+    issue_type: Optional[IssueType] = None
+    priority: Optional[Priority] = None
+
+
+class BulkSelection(BaseModel):
+    """Target requests either by `ids` or by `filter`."""
+    ids: Optional[List[str]] = None
+    filter: Optional[RequestFilter] = None
+
+
+class BulkStatusUpdate(BulkSelection):
+    status: RequestStatus
+    resolution_notes: Optional[str] = None
+
+
+class BulkAssignmentCreate(BulkSelection):
+    staff_id: str
+    notes: Optional[str] = None
+
+
+class BulkUpdateResult(BaseModel):
+    ids: List[str]  # requests that were changed
+    skipped: List[str] = []  # requests left unchanged, e.g. already assigned to the staff member
+    not_found: List[str] = []
+
+
+class DispatchBacklog(BaseModel):
+    """Open, unassigned requests to dispatch, all of them or those matching `filter`."""
+    filter: Optional[RequestFilter] = None
+    limit: Optional[int] = Field(None, gt=0, le=settings.bulk_max_items)  # defaults to bulk_max_items
+
+
+class DispatchedAssignment(BaseModel):
+    request_id: str
+    staff_id: str
+
+
+class DispatchResult(BaseModel):
+    assigned: List[DispatchedAssignment]
+    unassigned: List[str] = []  # no staff member available
+
+
+class ClaimRequest(BaseModel):
+    staff_id: str
+    building_id: Optional[str] = None
+    issue_type: Optional[IssueType] = None  # defaults to the staff member's specialties
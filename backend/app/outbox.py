@@ -0,0 +1,479 @@
+import asyncio
+import json
+import logging
+import random
+import smtplib
+import time
+import uuid
+from contextlib import suppress
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Any, Dict, List, NamedTuple, Optional, Protocol
+
+import httpx
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import AsyncSessionLocal, listen_engine
+from .events import CHANNEL
+from .models.db_models import (
+    OutboxMessage as DBOutboxMessage, Request as DBRequest, Staff as DBStaff, Tenant as DBTenant
+)
+
+logger = logging.getLogger(__name__)
+
+# Who is told about each kind of request event; other events are not notified
+RECIPIENTS = {
+    "created": ("tenant",),
+    "assigned": ("tenant", "staff"),
+    "completed": ("tenant",)
+}
+RETRY_SECONDS = 5.0
+PURGE_BATCH = 1000
+
+
+async def enqueue_notifications(db: AsyncSession, events: List[Dict[str, Any]]) -> None:
+    """
+    Queue notifications for request events in `db`'s transaction, so they
+    are sent if and only if the change they announce commits. Nothing is
+    sent from the request itself; outbox_worker.py delivers them.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "event_type": event["type"],
+            "request_id": event["request_id"],
+            "payload": event,
+            "created_at": now,
+            "available_at": now,
+            "attempts": 0
+        }
+        for event in events if event["type"] in RECIPIENTS
+    ]
+    if rows:
+        await db.execute(DBOutboxMessage.__table__.insert(), rows)
+
+
+class Notification(NamedTuple):
+    """One message to one recipient, as handed to sinks."""
+    # Stable across retries of the same message, for receivers to drop repeats
+    idempotency_key: str
+    event_type: str
+    request_id: str
+    recipient_type: str
+    recipient_id: str
+    name: str
+    email: str
+    subject: str
+    body: str
+    payload: Dict[str, Any]
+
+
+class NotificationSink(Protocol):
+    name: str
+
+    async def send(self, notification: Notification) -> None:
+        """Deliver `notification`, raising on failure so it is retried."""
+
+
+class LogSink:
+    """Write notifications to the log; the default for development."""
+
+    name = "log"
+
+    async def send(self, notification: Notification) -> None:
+        logger.info(
+            "Notify %s %s <%s>: %s [%s]", notification.recipient_type, notification.name,
+            notification.email, notification.subject, notification.idempotency_key
+        )
+
+
+class WebhookSink:
+    """POST each notification as JSON, with its key in an Idempotency-Key header."""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    async def send(self, notification: Notification) -> None:
+        response = await self.client.post(
+            self.url,
+            content=json.dumps(notification._asdict(), default=str),
+            headers={"Content-Type": "application/json", "Idempotency-Key": notification.idempotency_key}
+        )
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class SmtpSink:
+    """Email each notification, with a Message-ID derived from its key."""
+
+    name = "smtp"
+
+    def __init__(self, host: str, port: int, sender: str, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.timeout = timeout
+
+    def message(self, notification: Notification) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = notification.email
+        message["Subject"] = notification.subject
+        message["Message-ID"] = f"<{notification.idempotency_key}@{self.sender.rpartition('@')[2]}>"
+        message.set_content(notification.body)
+        return message
+
+    def _send(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            smtp.send_message(message)
+
+    async def send(self, notification: Notification) -> None:
+        # smtplib blocks, so it runs on a thread
+        await asyncio.to_thread(self._send, self.message(notification))
+
+
+def configured_sinks() -> List[NotificationSink]:
+    """The sinks named in settings.notification_sinks."""
+    sinks = []
+    for name in [name.strip() for name in settings.notification_sinks.split(",") if name.strip()]:
+        if name == "log":
+            sinks.append(LogSink())
+        elif name == "webhook":
+            if not settings.notification_webhook_url:
+                raise RuntimeError("notification_sinks=webhook requires notification_webhook_url")
+            sinks.append(WebhookSink(settings.notification_webhook_url, settings.notification_timeout_seconds))
+        elif name == "smtp":
+            sinks.append(SmtpSink(
+                settings.smtp_host, settings.smtp_port, settings.smtp_sender, settings.notification_timeout_seconds
+            ))
+        else:
+            raise RuntimeError(f"Unknown notification sink: {name}")
+    return sinks
+
+
+def render(event_type: str, recipient_type: str, request: Any) -> tuple:
+    """Subject and body of a notification."""
+    issue = request.issue_type.value
+    if event_type == "created":
+        subject = f"We received your {issue} request"
+    elif event_type == "completed":
+        subject = f"Your {issue} request is complete"
+    elif recipient_type == "staff":
+        subject = f"New {request.priority.value} {issue} job"
+    else:
+        subject = f"A technician is assigned to your {issue} request"
+    body = f"{subject}.\n\nRequest {request.id}: {request.description}"
+    if event_type == "completed" and request.resolution_notes:
+        body += f"\n\nResolution: {request.resolution_notes}"
+    return subject, body
+
+
+async def notifications_for(db: AsyncSession, messages: list) -> Dict[str, List[Notification]]:
+    """
+    The notifications each claimed message stands for. Recipients are looked
+    up when the message is delivered, so writers only store the event.
+    """
+    request_ids = {message.request_id for message in messages}
+    result = await db.execute(select(
+        DBRequest.id, DBRequest.tenant_id, DBRequest.issue_type, DBRequest.priority,
+        DBRequest.description, DBRequest.resolution_notes
+    ).where(DBRequest.id.in_(request_ids)))
+    requests = {row.id: row for row in result.all()}
+
+    tenant_ids = {row.tenant_id for row in requests.values()}
+    staff_ids = {
+        staff_id for message in messages if "staff" in RECIPIENTS[message.event_type]
+        for staff_id in message.payload.get("staff_ids", [])
+    }
+    contacts = {}
+    for kind, model, ids in [("tenant", DBTenant, tenant_ids), ("staff", DBStaff, staff_ids)]:
+        if ids:
+            result = await db.execute(select(model.id, model.full_name, model.email).where(model.id.in_(ids)))
+            contacts.update({(kind, row.id): row for row in result.all()})
+
+    notifications = {}
+    for message in messages:
+        notifications[message.id] = []
+        request = requests.get(message.request_id)
+        if request is None:
+            continue
+        for recipient_type in RECIPIENTS[message.event_type]:
+            ids = [request.tenant_id] if recipient_type == "tenant" else message.payload.get("staff_ids", [])
+            for recipient_id in ids:
+                contact = contacts.get((recipient_type, recipient_id))
+                if contact is None:
+                    continue
+                subject, body = render(message.event_type, recipient_type, request)
+                notifications[message.id].append(Notification(
+                    idempotency_key=f"{message.id}:{recipient_type}:{recipient_id}",
+                    event_type=message.event_type,
+                    request_id=message.request_id,
+                    recipient_type=recipient_type,
+                    recipient_id=recipient_id,
+                    name=contact.full_name,
+                    email=contact.email,
+                    subject=subject,
+                    body=body,
+                    payload=message.payload
+                ))
+    return notifications
+
+
+class OutboxWorker:
+    """
+    Deliver outbox messages to the sinks in batches. A batch is claimed in a
+    short transaction that skips rows other workers hold and pushes their
+    available_at out by the lease, so sinks are called with no transaction
+    open and a worker that dies mid-batch only delays its messages until the
+    lease runs out. Delivery is therefore at least once: receivers recognise
+    repeats by the notification's idempotency key. Failed messages are
+    retried with exponential backoff and jitter until outbox_max_attempts.
+    """
+
+    def __init__(
+        self,
+        sinks: List[NotificationSink],
+        batch_size: int = 100,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 8,
+        backoff_seconds: float = 10.0,
+        backoff_max_seconds: float = 3600.0,
+        poll_seconds: float = 5.0,
+        retention_hours: float = 168.0,
+        reconnect_seconds: float = 1.0,
+        reconnect_max_seconds: float = 60.0
+    ):
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.poll_seconds = poll_seconds
+        self.retention_hours = retention_hours
+        self.reconnect_seconds = reconnect_seconds
+        self.reconnect_max_seconds = reconnect_max_seconds
+        self.wakeup = asyncio.Event()
+        self.listener = None
+        self.listener_driver = None
+        self.lost_listener = None
+        self.listen_delay = reconnect_seconds
+        self.listen_retry_at = 0.0
+        self.reconnects = 0
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+
+    @classmethod
+    def from_settings(cls) -> "OutboxWorker":
+        return cls(
+            configured_sinks(),
+            batch_size=settings.outbox_batch_size,
+            lease_seconds=settings.outbox_lease_seconds,
+            max_attempts=settings.outbox_max_attempts,
+            backoff_seconds=settings.outbox_backoff_seconds,
+            backoff_max_seconds=settings.outbox_backoff_max_seconds,
+            poll_seconds=settings.outbox_poll_seconds,
+            retention_hours=settings.outbox_retention_hours,
+            reconnect_seconds=settings.request_events_reconnect_seconds,
+            reconnect_max_seconds=settings.request_events_reconnect_max_seconds
+        )
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds before retrying after the given number of attempts."""
+        delay = min(self.backoff_seconds * 2 ** (attempts - 1), self.backoff_max_seconds)
+        # Spread retries out, so messages failing together are not retried together
+        return delay * random.uniform(0.5, 1.0)
+
+    async def claim(self, db: AsyncSession, now: datetime) -> list:
+        pending = select(DBOutboxMessage.id).where(
+            DBOutboxMessage.delivered_at.is_(None), DBOutboxMessage.failed_at.is_(None),
+            DBOutboxMessage.available_at <= now
+        ).order_by(DBOutboxMessage.available_at).limit(self.batch_size).with_for_update(skip_locked=True)
+        query = update(DBOutboxMessage).where(DBOutboxMessage.id.in_(pending)).values(
+            attempts=DBOutboxMessage.attempts + 1,
+            available_at=now + timedelta(seconds=self.lease_seconds)
+        ).returning(
+            DBOutboxMessage.id, DBOutboxMessage.event_type, DBOutboxMessage.request_id,
+            DBOutboxMessage.payload, DBOutboxMessage.attempts
+        )
+        result = await db.execute(query)
+        return result.all()
+
+    async def deliver(self, notifications: List[Notification]) -> Optional[str]:
+        """Send to every sink; returns the error of the first failure, if any."""
+        try:
+            for notification in notifications:
+                for sink in self.sinks:
+                    await sink.send(notification)
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"[:1000]
+        return None
+
+    async def drain_once(self) -> int:
+        """Claim and deliver one batch; returns the number of messages claimed."""
+        async with AsyncSessionLocal() as db:
+            messages = await self.claim(db, datetime.utcnow())
+            await db.commit()
+            if not messages:
+                return 0
+            notifications = await notifications_for(db, messages)
+            await db.commit()
+
+        errors = await asyncio.gather(*[self.deliver(notifications[message.id]) for message in messages])
+
+        now = datetime.utcnow()
+        delivered = [message.id for message, error in zip(messages, errors) if error is None]
+        failures = [
+            {
+                "message_id": message.id,
+                "error": error,
+                "available_at": now + timedelta(seconds=self.backoff(message.attempts)),
+                "failed_at": now if message.attempts >= self.max_attempts else None
+            }
+            for message, error in zip(messages, errors) if error is not None
+        ]
+        table = DBOutboxMessage.__table__
+        async with AsyncSessionLocal() as db:
+            if delivered:
+                await db.execute(
+                    update(table).where(table.c.id.in_(delivered)).values(delivered_at=now, last_error=None)
+                )
+            if failures:
+                await db.execute(
+                    update(table).where(table.c.id == bindparam("message_id")).values(
+                        last_error=bindparam("error"),
+                        available_at=bindparam("available_at"),
+                        failed_at=bindparam("failed_at")
+                    ),
+                    failures
+                )
+            await db.commit()
+
+        self.delivered += len(delivered)
+        for failure in failures:
+            if failure["failed_at"] is not None:
+                self.failed += 1
+                logger.error("Giving up on outbox message %s: %s", failure["message_id"], failure["error"])
+            else:
+                self.retried += 1
+                logger.warning("Outbox message %s failed, retrying: %s", failure["message_id"], failure["error"])
+        return len(messages)
+
+    async def purge(self) -> int:
+        """Delete a batch of messages delivered before the retention period."""
+        cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
+        expired = select(DBOutboxMessage.id).where(DBOutboxMessage.delivered_at < cutoff).limit(PURGE_BATCH)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(delete(DBOutboxMessage).where(DBOutboxMessage.id.in_(expired)))
+            await db.commit()
+        return result.rowcount
+
+    async def listen(self) -> bool:
+        """
+        Wake up when request events are published, rather than at the next
+        poll; only possible while the API publishes them with NOTIFY. The
+        connection is opened outside the request pool.
+        """
+        try:
+            connection = await listen_engine.connect()
+            try:
+                raw = await connection.get_raw_connection()
+                driver = raw.driver_connection
+                await driver.add_listener(CHANNEL, self._on_notify)
+                driver.add_termination_listener(self._on_terminated)
+            except Exception:
+                await connection.invalidate()
+                raise
+        except Exception as e:
+            logger.warning("Cannot LISTEN on %s, polling every %ss: %s", CHANNEL, self.poll_seconds, e)
+            self.listen_retry_at = time.monotonic() + self.listen_delay * random.uniform(0.5, 1.0)
+            self.listen_delay = min(self.listen_delay * 2, self.reconnect_max_seconds)
+            return False
+        self.listener = connection
+        self.listener_driver = driver
+        self.listen_delay = self.reconnect_seconds
+        return True
+
+    async def relisten(self) -> None:
+        """Retry a lost LISTEN connection, with exponential backoff and jitter between attempts."""
+        if self.lost_listener is not None:
+            lost, self.lost_listener = self.lost_listener, None
+            with suppress(Exception):
+                await lost.invalidate()
+        if time.monotonic() >= self.listen_retry_at and await self.listen():
+            self.reconnects += 1
+            logger.info("LISTEN connection on %s restored", CHANNEL)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self.wakeup.set()
+
+    def _on_terminated(self, connection) -> None:
+        # Only a connection lost under us is reconnected, not one closed by close()
+        if connection is not self.listener_driver:
+            return
+        logger.warning("LISTEN connection on %s closed, polling every %ss until it is back", CHANNEL, self.poll_seconds)
+        self.lost_listener, self.listener, self.listener_driver = self.listener, None, None
+        self.wakeup.set()
+
+    async def close(self) -> None:
+        if self.listener is not None:
+            listener, self.listener, self.listener_driver = self.listener, None, None
+            await listener.close()
+        for sink in self.sinks:
+            if hasattr(sink, "close"):
+                await sink.close()
+
+    async def run(self) -> None:
+        await self.listen()
+        purged_at = 0.0
+        while True:
+            # Cleared first, so events published during a batch still wake the next one
+            self.wakeup.clear()
+            if self.listener is None:
+                await self.relisten()
+            try:
+                if await self.drain_once() == self.batch_size:
+                    continue
+                if time.monotonic() - purged_at >= 3600:
+                    while await self.purge() == PURGE_BATCH:
+                        pass
+                    purged_at = time.monotonic()
+                wait = self.poll_seconds
+            except Exception:
+                logger.exception("Outbox pass failed, retrying in %ss", RETRY_SECONDS)
+                wait = RETRY_SECONDS
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "failed": self.failed,
+            "listening": self.listener is not None,
+            "reconnects": self.reconnects
+        }
+
+
+async def outbox_backlog(db: AsyncSession) -> Dict[str, Any]:
+    """Messages waiting for delivery and given up on, across all workers."""
+    pending = (await db.execute(select(func.count(), func.min(DBOutboxMessage.created_at)).where(
+        DBOutboxMessage.delivered_at.is_(None), DBOutboxMessage.failed_at.is_(None)
+    ))).one()
+    failed = (await db.execute(select(func.count()).where(DBOutboxMessage.failed_at.isnot(None)))).scalar()
+    return {
+        "pending": pending[0],
+        "failed": failed,
+        "oldest_pending_at": pending[1].isoformat() if pending[1] else None
+    }
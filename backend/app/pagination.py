@@ -0,0 +1,75 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, and_, or_, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: str) -> str:
+    """Encode a (created_at, id) position as an opaque URL-safe token."""
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a token produced by encode_cursor back into (created_at, id)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(created_at) if created_at is not None else None), str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query: Select, model, skip: int, limit: int, cursor: Optional[str] = None, descending: bool = False) -> Select:
+    """
+    Order a list query by (created_at, id) and apply either keyset or offset paging.
+    When a cursor is given, rows are located by a row comparison against the
+    cursor position instead of scanning and discarding `skip` rows.
+    """
+    if descending:
+        query = query.order_by(model.created_at.desc().nulls_first(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at.asc().nulls_last(), model.id.asc())
+
+    if cursor:
+        query = query.where(after_position(model, decode_cursor(cursor), descending))
+    else:
+        query = query.offset(skip)
+
+    return query.limit(limit)
+
+
+def after_position(model, position: tuple, descending: bool):
+    """
+    Match the rows after `position` in (created_at, id) order. Rows without a
+    created_at sort after all others, as in the (created_at, id) indexes, so
+    they are neither skipped by the row comparison nor served twice.
+    """
+    created_at, row_id = position
+    key = tuple_(model.created_at, model.id)
+    if created_at is None:
+        null_rows = and_(model.created_at.is_(None), model.id < row_id if descending else model.id > row_id)
+        return or_(null_rows, model.created_at.is_not(None)) if descending else null_rows
+    if descending:
+        return key < position
+    return or_(key > position, model.created_at.is_(None))
+
+
+def position_key(created_at: Optional[datetime], row_id: str) -> tuple:
+    """
+    Sort key putting in-memory rows in the ascending (created_at, id) order
+    after_position pages through, with rows lacking a created_at last.
+    """
+    return (created_at is None, created_at or datetime.min, row_id)
+
+
+def set_next_cursor(response: Response, rows: Sequence, limit: int) -> None:
+    """Expose the cursor for the page after `rows` when the page came back full."""
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
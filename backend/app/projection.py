@@ -0,0 +1,72 @@
+import copy
+import typing
+from typing import Any, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel
+from sqlalchemy import select
+
+
+def _nested_model(annotation) -> Optional[type]:
+    """The BaseModel inside an annotation such as Optional[List[Note]], if any."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for candidate in typing.get_args(annotation):
+        nested = _nested_model(candidate)
+        if nested is not None:
+            return nested
+    return None
+
+
+class Projection:
+    """
+    Read a response schema straight from table rows. Only the columns the
+    schema declares are selected, and rows are turned into dicts in the
+    schema's field order, skipping ORM instances and model validation.
+    Nested models stored as JSON, alone or in lists, are reduced to their
+    declared keys the way validation would. Fields that are not columns of
+    `model` get their schema default and are left for the caller to fill in.
+
+    Pass `fields` to project only some of the schema's fields; the others
+    are neither selected nor present in the dicts.
+    """
+
+    def __init__(self, schema: type, model: type, fields: Optional[Sequence[str]] = None):
+        table_columns = model.__table__.c
+        self.fields = [name for name in schema.model_fields if fields is None or name in fields]
+        self.columns = [table_columns[name] for name in self.fields if name in table_columns]
+        self.column_names = {column.name for column in self.columns}
+        self.nested = {}
+        self.defaults = {}
+        for name in self.fields:
+            field = schema.model_fields[name]
+            if name not in self.column_names:
+                self.defaults[name] = field.get_default(call_default_factory=True)
+                continue
+            nested = _nested_model(field.annotation)
+            if nested is not None:
+                self.nested[name] = list(nested.model_fields)
+
+    def select(self, *extra_columns):
+        """SELECT the projected columns plus any `extra_columns` not already among them."""
+        extra_columns = [column for column in extra_columns if all(column is not own for own in self.columns)]
+        return select(*self.columns, *extra_columns)
+
+    def to_dict(self, row) -> Dict[str, Any]:
+        mapping = row._mapping
+        item = {}
+        for name in self.fields:
+            if name not in self.column_names:
+                item[name] = copy.copy(self.defaults[name])
+                continue
+            value = mapping[name]
+            if value is not None and name in self.nested:
+                keys = self.nested[name]
+                if isinstance(value, list):
+                    value = [{key: element.get(key) for key in keys} for element in value]
+                else:
+                    value = {key: value.get(key) for key in keys}
+            item[name] = value
+        return item
+
+    def to_dicts(self, rows: Sequence) -> List[Dict[str, Any]]:
+        return [self.to_dict(row) for row in rows]
@@ -0,0 +1,163 @@
+from collections import Counter
+from typing import Iterable, NamedTuple, Optional, Tuple
+
+from sqlalchemy import column, select, text, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models.db_models import (
+    Request as DBRequest, RequestStatusRollup as DBStatusRollup, RequestDailyRollup as DBDailyRollup
+)
+
+
+class RollupSnapshot(NamedTuple):
+    """The attributes of a request that the rollup tables count by."""
+    building_id: str
+    status: str
+    priority: str
+    issue_type: str
+    day: object  # None for requests without created_at, which no daily row counts
+
+
+def rollup_snapshot(db_request: DBRequest) -> RollupSnapshot:
+    """Capture a request's rollup dimensions, e.g. before it is modified."""
+    return RollupSnapshot(
+        building_id=db_request.building_id,
+        status=db_request.status,
+        priority=db_request.priority,
+        issue_type=db_request.issue_type,
+        day=db_request.created_at.date() if db_request.created_at is not None else None
+    )
+
+
+async def apply_rollup_changes(
+    db: AsyncSession,
+    changes: Iterable[Tuple[Optional[RollupSnapshot], Optional[RollupSnapshot]]]
+) -> None:
+    """
+    Move each request's contribution from its `before` snapshot to its `after`
+    snapshot in the same transaction as the write. A None `before` is an
+    insert and a None `after` is a delete.
+    """
+    status_deltas = Counter()
+    daily_deltas = Counter()
+    for before, after in changes:
+        if before is not None:
+            status_deltas[(before.building_id, before.status, before.priority, before.issue_type)] -= 1
+            if before.day is not None:
+                daily_deltas[(before.day, before.building_id)] -= 1
+        if after is not None:
+            status_deltas[(after.building_id, after.status, after.priority, after.issue_type)] += 1
+            if after.day is not None:
+                daily_deltas[(after.day, after.building_id)] += 1
+
+    # Sorted keys keep concurrent writers locking rollup rows in the same order
+    status_rows = [
+        (*key, delta)
+        for key, delta in sorted(status_deltas.items(), key=lambda item: tuple(map(str, item[0])))
+        if delta
+    ]
+    daily_rows = [
+        (*key, delta)
+        for key, delta in sorted(daily_deltas.items(), key=lambda item: tuple(map(str, item[0])))
+        if delta
+    ]
+
+    statements = []
+    if status_rows:
+        statements.append(_upsert_counts(
+            DBStatusRollup, ["building_id", "status", "priority", "issue_type"], status_rows
+        ))
+    if daily_rows:
+        statements.append(_upsert_counts(DBDailyRollup, ["day", "building_id"], daily_rows))
+
+    # Send both upserts in one round trip, the first as a data-modifying CTE
+    if len(statements) == 2:
+        await db.execute(statements[1].add_cte(statements[0].cte("status_rollup_changes")))
+    elif statements:
+        await db.execute(statements[0])
+
+
+def _upsert_counts(model, key_columns, rows):
+    """INSERT ... ON CONFLICT statement adding each row's delta to request_count."""
+    names = key_columns + ["request_count"]
+    changes = values(
+        *[column(name, model.__table__.c[name].type) for name in names],
+        name=f"{model.__tablename__}_changes"
+    ).data(rows)
+    statement = insert(model).from_select(names, select(changes))
+    return statement.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={"request_count": model.request_count + statement.excluded.request_count}
+    )
+
+
+async def update_rollups(db: AsyncSession, before: Optional[RollupSnapshot], after: Optional[RollupSnapshot]) -> None:
+    """Record a single request's change; nothing is written if its dimensions did not move."""
+    if before != after:
+        await apply_rollup_changes(db, [(before, after)])
+
+
+async def rebuild_rollups(conn) -> None:
+    """
+    Regenerate the rollup tables from the requests and requests_archive
+    tables. Writers and the archiver are blocked for the duration so the
+    counters cannot drift while they are rebuilt.
+    """
+    await conn.execute(text("LOCK TABLE requests, requests_archive IN SHARE MODE"))
+    for table in [
+        "request_status_rollups", "request_daily_rollups", "request_archive_rollups", "assignment_archive_rollups"
+    ]:
+        await conn.execute(text(f"DELETE FROM {table}"))
+    # Archived requests still count towards the status and daily rollups
+    all_requests = """(
+        SELECT building_id, status, priority, issue_type, created_at FROM requests
+        UNION ALL
+        SELECT building_id, status, priority, issue_type, created_at FROM requests_archive
+    ) AS all_requests"""
+    await conn.execute(text(f"""
+        INSERT INTO request_status_rollups (building_id, status, priority, issue_type, request_count)
+        SELECT building_id, status, priority, issue_type, count(*)
+        FROM {all_requests}
+        GROUP BY building_id, status, priority, issue_type
+    """))
+    await conn.execute(text(f"""
+        INSERT INTO request_daily_rollups (day, building_id, request_count)
+        SELECT created_at::date, building_id, count(*)
+        FROM {all_requests}
+        WHERE created_at IS NOT NULL
+        GROUP BY created_at::date, building_id
+    """))
+    await conn.execute(text("""
+        INSERT INTO request_archive_rollups (issue_type, request_count, resolved_count, resolution_hours, sla_breach_count)
+        SELECT issue_type, count(*), count(closed_at),
+               coalesce(sum(extract(epoch FROM closed_at - created_at) / 3600), 0),
+               count(*) FILTER (WHERE extract(epoch FROM closed_at - created_at) / 3600 > target_sla_hours)
+        FROM requests_archive
+        GROUP BY issue_type
+    """))
+    await conn.execute(text("""
+        INSERT INTO assignment_archive_rollups (staff_id, assignment_count, completed_count)
+        SELECT assignment->>'staff_id', count(*), count(assignment->>'completed_at')
+        FROM requests_archive, json_array_elements(assignments) AS assignment
+        GROUP BY assignment->>'staff_id'
+    """))
+
+
+async def seed_rollups(conn) -> bool:
+    """
+    Build the rollups of a database that has requests but no rollups yet,
+    as when the rollup tables were just created next to existing data, so
+    the metrics do not read zeros until rebuild_rollups.py is run. Workers
+    starting together wait on a transaction lock and the first one builds
+    them. Returns whether they were built.
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('request_rollups'))"))
+    result = await conn.execute(text("""
+        SELECT NOT EXISTS (SELECT 1 FROM request_status_rollups)
+           AND (EXISTS (SELECT 1 FROM requests) OR EXISTS (SELECT 1 FROM requests_archive))
+    """))
+    if not result.scalar():
+        return False
+    await rebuild_rollups(conn)
+    return True
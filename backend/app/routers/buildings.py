@@ -1,16 +1,23 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Request
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 import uuid
 
-from ..database import get_db
+from ..config import settings
+from ..database import get_db, get_read_db
+from ..etags import matches, not_modified, rows_etag, set_etag
+from ..pagination import paginate, set_next_cursor
+from ..projection import Projection
 from ..models import Building, BuildingCreate, BuildingUpdate
 from ..models.db_models import Building as DBBuilding, Unit as DBUnit
 
 router = APIRouter(prefix="/buildings", tags=["buildings"])
 
+BUILDING_PROJECTION = Projection(Building, DBBuilding)
+
 
 @router.post("/", response_model=Building, status_code=status.HTTP_201_CREATED)
 async def create_building(building: BuildingCreate, db: AsyncSession = Depends(get_db)):
@@ -29,18 +36,29 @@ async def create_building(building: BuildingCreate, db: AsyncSession = Depends(g
     return Building.model_validate(db_building)
 
 
-@router.get("/", response_model=List[Building])
-async def get_buildings(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+@router.get("/", response_model=List[Building], response_class=ORJSONResponse)
+async def get_buildings(
+    http_request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get all buildings with pagination."""
-    query = select(DBBuilding).offset(skip).limit(limit)
+    query = paginate(BUILDING_PROJECTION.select(), DBBuilding, skip, limit, cursor)
     result = await db.execute(query)
-    buildings = result.scalars().all()
-    
-    return [Building.model_validate(building) for building in buildings]
+    rows = result.all()
+    etag = rows_etag(http_request, rows)
+    if matches(http_request, etag):
+        return not_modified(etag, settings.resource_cache_control)
+    
+    response = ORJSONResponse(BUILDING_PROJECTION.to_dicts(rows))
+    set_next_cursor(response, rows, limit)
+    return set_etag(response, etag, settings.resource_cache_control)
 
 
 @router.get("/{building_id}", response_model=Building)
-async def get_building(building_id: str, db: AsyncSession = Depends(get_db)):
+async def get_building(building_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get a specific building by ID."""
     query = select(DBBuilding).where(DBBuilding.id == building_id)
     result = await db.execute(query)
@@ -1,19 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, Depends
 from typing import Dict, List, Any
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, case, and_, cast, extract, Integer
-from sqlalchemy.sql import text
+from sqlalchemy import select, func, and_, cast, literal, union_all, Date, Integer
 
-from ..database import get_db
+from ..database import get_read_db
+from ..cache import cached
+from ..etags import metrics_etag
 from ..models import RequestStatus
-from ..models.db_models import Request as DBRequest, Building as DBBuilding, Staff as DBStaff
+from ..models.db_models import (
+    Request as DBRequest, Building as DBBuilding, Staff as DBStaff,
+    RequestAssignment as DBRequestAssignment, RequestStatusRollup as DBStatusRollup,
+    RequestDailyRollup as DBDailyRollup, ArchivedIssueRollup as DBArchivedIssueRollup,
+    ArchivedAssignmentRollup as DBArchivedAssignmentRollup, ArchivedRequest as DBArchivedRequest
+)
 
-router = APIRouter(prefix="/metrics", tags=["metrics"])
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(metrics_etag)])
 
 
 @router.get("/overview")
-async def get_metrics_overview(db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
+@cached("overview")
+async def get_metrics_overview(db: AsyncSession = Depends(get_read_db)) -> Dict[str, Any]:
     """
     Get comprehensive metrics overview for dashboard.
     Returns:
@@ -24,58 +31,73 @@ async def get_metrics_overview(db: AsyncSession = Depends(get_db)) -> Dict[str,
     - sla_breach_count: Number of requests that exceeded SLA
     - completion_rate: Percentage of closed requests
     """
-    # Total open requests
-    open_query = select(func.count()).select_from(DBRequest).where(
-        DBRequest.status.in_([RequestStatus.OPEN, RequestStatus.IN_PROGRESS, RequestStatus.PENDING])
-    )
-    open_result = await db.execute(open_query)
-    total_open = open_result.scalar()
+    hours_to_close = func.extract('epoch', DBRequest.closed_at - DBRequest.created_at) / 3600
+    is_open = DBRequest.status.in_([RequestStatus.OPEN, RequestStatus.IN_PROGRESS, RequestStatus.PENDING])
+    is_closed = DBRequest.status.in_([RequestStatus.CLOSED, RequestStatus.COMPLETED])
+    has_closed_at = and_(is_closed, DBRequest.closed_at.is_not(None))
     
-    # Total closed requests
-    closed_query = select(func.count()).select_from(DBRequest).where(
-        DBRequest.status.in_([RequestStatus.CLOSED, RequestStatus.COMPLETED])
+    # One scan of the live requests: conditional aggregates per issue type...
+    live = select(
+        DBRequest.issue_type.label('issue_type'),
+        func.count().label('count'),
+        func.count().filter(is_open).label('open_count'),
+        func.count().filter(is_closed).label('closed_count'),
+        func.sum(hours_to_close).filter(has_closed_at).label('resolution_hours'),
+        func.count().filter(has_closed_at).label('resolved_count'),
+        func.count().filter(
+            and_(has_closed_at, hours_to_close > DBRequest.target_sla_hours)
+        ).label('sla_breach_count')
+    ).group_by(DBRequest.issue_type)
+    # ...plus the archived ones, all CLOSED, from their rollup
+    archived = select(
+        DBArchivedIssueRollup.issue_type,
+        DBArchivedIssueRollup.request_count,
+        literal(0),
+        DBArchivedIssueRollup.request_count,
+        DBArchivedIssueRollup.resolution_hours,
+        DBArchivedIssueRollup.resolved_count,
+        DBArchivedIssueRollup.sla_breach_count
     )
-    closed_result = await db.execute(closed_query)
-    total_closed = closed_result.scalar()
+    both = union_all(live, archived).subquery('both_tables')
+    per_issue_type = select(
+        both.c.issue_type,
+        cast(func.sum(both.c.count), Integer).label('count'),
+        func.sum(both.c.open_count).label('open_count'),
+        func.sum(both.c.closed_count).label('closed_count'),
+        func.sum(both.c.resolution_hours).label('resolution_hours'),
+        func.sum(both.c.resolved_count).label('resolved_count'),
+        func.sum(both.c.sla_breach_count).label('sla_breach_count')
+    ).group_by(both.c.issue_type).cte('per_issue_type')
     
-    # Average resolution time
-    avg_query = select(
-        func.avg(
-            func.extract('epoch', DBRequest.closed_at - DBRequest.created_at) / 3600
+    # ...rolled up to table-wide totals with window sums over the (at most 9) groups
+    query = select(
+        per_issue_type.c.issue_type,
+        per_issue_type.c.count,
+        cast(func.sum(per_issue_type.c.open_count).over(), Integer).label('total_open'),
+        cast(func.sum(per_issue_type.c.closed_count).over(), Integer).label('total_closed'),
+        cast(func.sum(per_issue_type.c.sla_breach_count).over(), Integer).label('sla_breach_count'),
+        (
+            func.sum(per_issue_type.c.resolution_hours).over()
+            / func.nullif(func.sum(per_issue_type.c.resolved_count).over(), 0)
         ).label('avg_hours')
-    ).where(
-        and_(
-            DBRequest.status.in_([RequestStatus.CLOSED, RequestStatus.COMPLETED]),
-            DBRequest.closed_at.is_not(None)
-        )
-    )
-    avg_result = await db.execute(avg_query)
-    avg_hours = avg_result.scalar()
+    ).order_by(per_issue_type.c.count.desc())
+    
+    result = await db.execute(query)
+    rows = result.fetchall()
+    
+    totals = rows[0] if rows else None
+    total_open = totals.total_open if totals else 0
+    total_closed = totals.total_closed if totals else 0
+    sla_breach_count = totals.sla_breach_count if totals else 0
+    avg_hours = totals.avg_hours if totals else None
     average_resolution_time = round(float(avg_hours), 2) if avg_hours else 0
     
     # Top 5 issue types
-    top_issues_query = select(
-        DBRequest.issue_type.label('issue_type'),
-        func.count().label('count')
-    ).group_by(DBRequest.issue_type).order_by(func.count().desc()).limit(5)
-    
-    top_issues_result = await db.execute(top_issues_query)
     top_issue_types = [
         {"issue_type": str(row.issue_type), "count": row.count}
-        for row in top_issues_result.fetchall()
+        for row in rows[:5]
     ]
     
-    # SLA breach count
-    sla_breach_query = select(func.count()).select_from(DBRequest).where(
-        and_(
-            DBRequest.status.in_([RequestStatus.CLOSED, RequestStatus.COMPLETED]),
-            DBRequest.closed_at.is_not(None),
-            func.extract('epoch', DBRequest.closed_at - DBRequest.created_at) / 3600 > DBRequest.target_sla_hours
-        )
-    )
-    sla_breach_result = await db.execute(sla_breach_query)
-    sla_breach_count = sla_breach_result.scalar()
-    
     # Completion rate
     total_requests = total_open + total_closed
     completion_rate = round((total_closed / total_requests * 100), 2) if total_requests > 0 else 0
@@ -92,12 +114,14 @@ async def get_metrics_overview(db: AsyncSession = Depends(get_db)) -> Dict[str,
 
 
 @router.get("/requests-by-status")
-async def get_requests_by_status(db: AsyncSession = Depends(get_db)) -> List[Dict[str, Any]]:
+@cached("requests-by-status")
+async def get_requests_by_status(db: AsyncSession = Depends(get_read_db)) -> List[Dict[str, Any]]:
     """Get count of requests grouped by status."""
+    count = func.sum(DBStatusRollup.request_count)
     query = select(
-        DBRequest.status.label('status'),
-        func.count().label('count')
-    ).group_by(DBRequest.status).order_by(func.count().desc())
+        DBStatusRollup.status.label('status'),
+        count.label('count')
+    ).group_by(DBStatusRollup.status).having(count > 0).order_by(count.desc())
     
     result = await db.execute(query)
     return [
@@ -107,12 +131,14 @@ async def get_requests_by_status(db: AsyncSession = Depends(get_db)) -> List[Dic
 
 
 @router.get("/requests-by-priority")
-async def get_requests_by_priority(db: AsyncSession = Depends(get_db)) -> List[Dict[str, Any]]:
+@cached("requests-by-priority")
+async def get_requests_by_priority(db: AsyncSession = Depends(get_read_db)) -> List[Dict[str, Any]]:
     """Get count of requests grouped by priority."""
+    count = func.sum(DBStatusRollup.request_count)
     query = select(
-        DBRequest.priority.label('priority'),
-        func.count().label('count')
-    ).group_by(DBRequest.priority).order_by(func.count().desc())
+        DBStatusRollup.priority.label('priority'),
+        count.label('count')
+    ).group_by(DBStatusRollup.priority).having(count > 0).order_by(count.desc())
     
     result = await db.execute(query)
     return [
@@ -122,16 +148,37 @@ async def get_requests_by_priority(db: AsyncSession = Depends(get_db)) -> List[D
 
 
 @router.get("/requests-over-time")
-async def get_requests_over_time(days: int = 30, db: AsyncSession = Depends(get_db)) -> List[Dict[str, Any]]:
+@cached("requests-over-time")
+async def get_requests_over_time(days: int = 30, db: AsyncSession = Depends(get_read_db)) -> List[Dict[str, Any]]:
     """Get count of requests created over time."""
     start_date = datetime.utcnow() - timedelta(days=days)
+    next_day = datetime.combine(start_date.date() + timedelta(days=1), time.min)
     
-    query = select(
-        func.date(DBRequest.created_at).label('date'),
-        func.count().label('count')
+    # The first day only counts from start_date on, so it is counted from the
+    # requests table and the archive; every later day is whole and comes from
+    # the daily rollup, which counts archived requests too
+    live_count, archived_count = [
+        select(func.count()).where(
+            model.created_at >= start_date,
+            model.created_at < next_day
+        ).scalar_subquery()
+        for model in (DBRequest, DBArchivedRequest)
+    ]
+    first_day = select(
+        literal(start_date.date(), Date).label('date'),
+        (live_count + archived_count).label('count')
+    )
+    later_days = select(
+        DBDailyRollup.day.label('date'),
+        func.sum(DBDailyRollup.request_count).label('count')
     ).where(
-        DBRequest.created_at >= start_date
-    ).group_by(func.date(DBRequest.created_at)).order_by(func.date(DBRequest.created_at))
+        DBDailyRollup.day >= next_day.date()
+    ).group_by(DBDailyRollup.day)
+    
+    days_query = union_all(first_day, later_days).subquery()
+    query = select(days_query.c.date, days_query.c.count).where(
+        days_query.c.count > 0
+    ).order_by(days_query.c.date)
     
     result = await db.execute(query)
     return [
@@ -141,29 +188,25 @@ async def get_requests_over_time(days: int = 30, db: AsyncSession = Depends(get_
 
 
 @router.get("/building-performance")
-async def get_building_performance(db: AsyncSession = Depends(get_db)) -> List[Dict[str, Any]]:
+@cached("building-performance")
+async def get_building_performance(db: AsyncSession = Depends(get_read_db)) -> List[Dict[str, Any]]:
     """Get performance metrics by building."""
+    total = func.sum(DBStatusRollup.request_count)
     query = select(
-        DBRequest.building_id,
+        DBStatusRollup.building_id,
         DBBuilding.name.label('building_name'),
-        func.count().label('total_requests'),
-        func.sum(
-            case(
-                (DBRequest.status.in_([RequestStatus.OPEN, RequestStatus.IN_PROGRESS]), 1),
-                else_=0
-            )
-        ).label('open_requests'),
-        func.sum(
-            case(
-                (DBRequest.status.in_([RequestStatus.CLOSED, RequestStatus.COMPLETED]), 1),
-                else_=0
-            )
-        ).label('closed_requests')
+        total.label('total_requests'),
+        func.coalesce(func.sum(DBStatusRollup.request_count).filter(
+            DBStatusRollup.status.in_([RequestStatus.OPEN, RequestStatus.IN_PROGRESS])
+        ), 0).label('open_requests'),
+        func.coalesce(func.sum(DBStatusRollup.request_count).filter(
+            DBStatusRollup.status.in_([RequestStatus.CLOSED, RequestStatus.COMPLETED])
+        ), 0).label('closed_requests')
     ).join(
-        DBBuilding, DBRequest.building_id == DBBuilding.id
+        DBBuilding, DBStatusRollup.building_id == DBBuilding.id
     ).group_by(
-        DBRequest.building_id, DBBuilding.name
-    ).order_by(func.count().desc())
+        DBStatusRollup.building_id, DBBuilding.name
+    ).having(total > 0).order_by(total.desc())
     
     result = await db.execute(query)
     return [
@@ -179,51 +222,50 @@ async def get_building_performance(db: AsyncSession = Depends(get_db)) -> List[D
 
 
 @router.get("/staff-performance")
-async def get_staff_performance(db: AsyncSession = Depends(get_db)) -> List[Dict[str, Any]]:
+@cached("staff-performance")
+async def get_staff_performance(db: AsyncSession = Depends(get_read_db)) -> List[Dict[str, Any]]:
     """Get performance metrics by staff member."""
-    # Get all requests with assignments
-    query = select(DBRequest.assignments, DBRequest.id).where(DBRequest.assignments.is_not(None))
+    is_completed = DBRequestAssignment.completed_at.is_not(None)
+    
+    # Live assignments per staff member, plus those of archived requests from their rollup
+    live = select(
+        DBRequestAssignment.staff_id,
+        func.count().label("total"),
+        func.count().filter(is_completed).label("completed")
+    ).group_by(DBRequestAssignment.staff_id)
+    archived = select(
+        DBArchivedAssignmentRollup.staff_id,
+        DBArchivedAssignmentRollup.assignment_count,
+        DBArchivedAssignmentRollup.completed_count
+    )
+    both = union_all(live, archived).subquery("both_tables")
+    total = cast(func.sum(both.c.total), Integer)
+    completed = cast(func.sum(both.c.completed), Integer)
+    
+    # Enrich with staff names in the same statement
+    query = select(
+        both.c.staff_id,
+        DBStaff.id.label("known_staff_id"),
+        DBStaff.full_name,
+        DBStaff.role,
+        total.label("total_assignments"),
+        completed.label("completed_assignments"),
+        (total - completed).label("active_assignments")
+    ).outerjoin(
+        DBStaff, DBStaff.id == both.c.staff_id
+    ).group_by(
+        both.c.staff_id, DBStaff.id, DBStaff.full_name, DBStaff.role
+    ).order_by(total.desc())
+    
     result = await db.execute(query)
-    requests = result.fetchall()
-    
-    # Process assignments
-    staff_stats = {}
-    for row in requests:
-        if not row.assignments:
-            continue
-        for assignment in row.assignments:
-            staff_id = assignment.get("staff_id")
-            if not staff_id:
-                continue
-            
-            if staff_id not in staff_stats:
-                staff_stats[staff_id] = {
-                    "total_assignments": 0,
-                    "completed_assignments": 0,
-                    "active_assignments": 0
-                }
-            
-            staff_stats[staff_id]["total_assignments"] += 1
-            if assignment.get("completed_at"):
-                staff_stats[staff_id]["completed_assignments"] += 1
-            else:
-                staff_stats[staff_id]["active_assignments"] += 1
-    
-    # Enrich with staff names
-    results = []
-    for staff_id, stats in staff_stats.items():
-        staff_query = select(DBStaff).where(DBStaff.id == staff_id)
-        staff_result = await db.execute(staff_query)
-        staff = staff_result.scalar_one_or_none()
-        
-        results.append({
-            "_id": staff_id,
-            "staff_name": staff.full_name if staff else "Unknown",
-            "staff_role": staff.role if staff else "Unknown",
-            **stats
-        })
-    
-    # Sort by total assignments
-    results.sort(key=lambda x: x["total_assignments"], reverse=True)
-    
-    return results
+    return [
+        {
+            "_id": row.staff_id,
+            "staff_name": row.full_name if row.known_staff_id else "Unknown",
+            "staff_role": row.role if row.known_staff_id else "Unknown",
+            "total_assignments": row.total_assignments,
+            "completed_assignments": row.completed_assignments,
+            "active_assignments": row.active_assignments
+        }
+        for row in result.fetchall()
+    ]
@@ -1,64 +1,627 @@
-from fastapi import APIRouter, HTTPException, status, Query, Depends
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Response, Body
+from fastapi import Request as HTTPRequest
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Any, Dict, List, Optional
+from collections import Counter
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, update, insert, exists, func, literal, true, union_all, Boolean
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import uuid
+from pydantic import ValidationError
 
-from ..database import get_db
+from .. import database
+from ..config import settings
+from ..database import get_db, get_read_db, after_commit
+from ..cache import metrics_cache
+from ..events import active_staff_by_request, event_broker, request_event, stream_events
+from ..etags import matches, not_modified, rows_etag, set_etag
+from ..rollups import RollupSnapshot, apply_rollup_changes, rollup_snapshot, update_rollups
+from ..pagination import decode_cursor, paginate, position_key, set_next_cursor
+from ..export import EXPORT_COLUMNS, ExportFormat, stream_export
+from ..projection import Projection
+from ..search import search_matches
+from ..duplicates import DuplicatePolicy, description_bands, fill_missing_bands, find_duplicates
+from ..dispatch import dispatcher, specialty_issue_types
+from ..sla import sla_due_at, sla_scheduler
+from ..outbox import enqueue_notifications
 from ..models import (
-    Request, RequestCreate, RequestUpdate, RequestStatus,
-    AssignmentCreate, Assignment, NoteCreate, Note
+    Request, RequestCreate, RequestCreated, RequestUpdate, RequestView, RequestSearchResult, RequestStatus,
+    AssignmentCreate, Assignment, NoteCreate, Note, BulkItemResult, BulkResult,
+    BulkSelection, BulkStatusUpdate, BulkAssignmentCreate, BulkUpdateResult,
+    DispatchBacklog, DispatchedAssignment, DispatchResult, ClaimRequest
 )
 from ..models.db_models import (
     Request as DBRequest, Tenant as DBTenant, Unit as DBUnit,
-    Building as DBBuilding, Staff as DBStaff
+    Building as DBBuilding, Staff as DBStaff, RequestAssignment as DBRequestAssignment,
+    RequestNote as DBRequestNote, ArchivedRequest as DBArchivedRequest, OPEN_STATUSES
 )
 
 router = APIRouter(prefix="/requests", tags=["requests"])
 
+# Collections embedded on request with `include`: projection, parent key and order
+RELATED_PROJECTIONS = {
+    "assignments": (
+        Projection(Assignment, DBRequestAssignment), DBRequestAssignment.request_id,
+        [DBRequestAssignment.assigned_at]
+    ),
+    "notes": (
+        Projection(Note, DBRequestNote), DBRequestNote.request_id,
+        [DBRequestNote.created_at, DBRequestNote.id]
+    )
+}
+# Fields that `fields=` can select; the collections are chosen with `include`
+REQUEST_FIELDS = [name for name in RequestView.model_fields if name not in RELATED_PROJECTIONS]
+
+
+def split_param(value: Optional[str]) -> set:
+    return {part.strip() for part in (value or "").split(",") if part.strip()}
+
+
+def parse_include(include: Optional[str]) -> set:
+    """Split a comma-separated `include` parameter, rejecting unknown names."""
+    requested = split_param(include)
+    unknown = requested - RELATED_PROJECTIONS.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def request_projection(fields: Optional[str], related: set) -> Projection:
+    """
+    Projection for a request read. Without `fields` every scalar field is
+    returned; with it only the listed ones plus `id`. Columns that are not
+    asked for are not selected, and collections are only embedded when
+    named in `include`.
+    """
+    if fields is None:
+        return Projection(RequestView, DBRequest, set(REQUEST_FIELDS) | related)
+    requested = split_param(fields)
+    unknown = requested - set(REQUEST_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field: {', '.join(sorted(unknown))}")
+    return Projection(RequestView, DBRequest, requested | {"id"} | related)
+
+
+async def attach_related(db: AsyncSession, items: List[Dict[str, Any]], names: set) -> None:
+    """Fill the named collections of projected requests with one query per collection."""
+    by_id = {item["id"]: item for item in items}
+    if not by_id:
+        return
+    for name in sorted(names):
+        projection, parent_key, order_by = RELATED_PROJECTIONS[name]
+        for item in items:
+            item[name] = []
+        query = projection.select(parent_key.label("parent_id")).where(
+            parent_key.in_(list(by_id))
+        ).order_by(*order_by)
+        result = await db.execute(query)
+        for row in result.all():
+            by_id[row.parent_id][name].append(projection.to_dict(row))
+
+
+def active_staff(db_request: DBRequest) -> List[str]:
+    """Staff members holding an open assignment on a loaded request."""
+    return [assignment.staff_id for assignment in db_request.assignments if assignment.completed_at is None]
 
-@router.post("/", response_model=Request, status_code=status.HTTP_201_CREATED)
-async def create_request(request: RequestCreate, db: AsyncSession = Depends(get_db)):
-    """Create a new maintenance request."""
-    # Validate tenant exists
-    tenant_query = select(DBTenant).where(DBTenant.id == request.tenant_id)
-    tenant_result = await db.execute(tenant_query)
-    if not tenant_result.scalar_one_or_none():
+
+async def link_duplicate(db: AsyncSession, request: RequestCreate, duplicate_id: str) -> Optional[DBRequest]:
+    """
+    Add a submission to an open request as a note from the submitting
+    tenant. Returns None if that request has been closed in the meantime.
+    """
+    tenant_query = select(DBTenant.full_name).where(DBTenant.id == request.tenant_id)
+    tenant = (await db.execute(tenant_query)).first()
+    if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
     
-    # Validate unit exists
-    unit_query = select(DBUnit).where(DBUnit.id == request.unit_id)
-    unit_result = await db.execute(unit_query)
-    if not unit_result.scalar_one_or_none():
-        raise HTTPException(status_code=404, detail="Unit not found")
-    
-    # Validate building exists
-    building_query = select(DBBuilding).where(DBBuilding.id == request.building_id)
-    building_result = await db.execute(building_query)
-    if not building_result.scalar_one_or_none():
-        raise HTTPException(status_code=404, detail="Building not found")
+    query = select(DBRequest).where(DBRequest.id == duplicate_id, OPEN_STATUSES).with_for_update()
+    result = await db.execute(query)
+    db_request = result.scalar_one_or_none()
+    if not db_request:
+        return None
     
-    db_request = DBRequest(
+    now = datetime.utcnow()
+    db.add(DBRequestNote(
         id=str(uuid.uuid4()),
-        **request.model_dump(),
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
-        closed_at=None,
-        assignments=[],
-        notes=[],
-        resolution_notes=None
-    )
+        request_id=duplicate_id,
+        author_type="tenant",
+        author_id=request.tenant_id,
+        author_name=tenant.full_name,
+        body=request.description,
+        created_at=now
+    ))
+    db_request.updated_at = now
+    
+    await event_broker.publish(db, [request_event(
+        "note_added", db_request.id, db_request.building_id, db_request.status, active_staff(db_request)
+    )])
     
-    db.add(db_request)
     await db.flush()
     await db.refresh(db_request)
+    return db_request
+
+
+@router.post("/", response_model=RequestCreated, status_code=status.HTTP_201_CREATED)
+async def create_request(
+    request: RequestCreate,
+    response: Response,
+    on_duplicate: DuplicatePolicy = DuplicatePolicy.CREATE,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create a new maintenance request.
+    Open requests in the same building with the same issue type and a
+    similar description are returned as `possible_duplicates`. With
+    `on_duplicate=link` a submission close enough to one of them is added
+    to it as a note instead, and that request is returned with 200.
+    """
+    duplicates = await find_duplicates(request.building_id, request.issue_type, request.description)
+    if (
+        on_duplicate == DuplicatePolicy.LINK and duplicates
+        and duplicates[0].similarity >= settings.duplicate_link_threshold
+    ):
+        db_request = await link_duplicate(db, request, duplicates[0].id)
+        if db_request is not None:
+            linked = RequestCreated.model_validate(db_request)
+            linked.possible_duplicates = duplicates
+            linked.linked = True
+            response.status_code = status.HTTP_200_OK
+            return linked
+    
+    now = datetime.utcnow()
+    values = {
+        "id": str(uuid.uuid4()),
+        **request.model_dump(),
+        "created_at": now,
+        "updated_at": now,
+        "closed_at": None,
+        "resolution_notes": None,
+        "description_bands": description_bands(request.building_id, request.issue_type, request.description)
+    }
+    columns = DBRequest.__table__.c
+    
+    # Validate tenant, unit and building and insert the request in one statement:
+    # the INSERT only produces a row when all three exist
+    checks = select(
+        exists().where(DBTenant.id == request.tenant_id).label("tenant_found"),
+        exists().where(DBUnit.id == request.unit_id).label("unit_found"),
+        exists().where(DBBuilding.id == request.building_id).label("building_found")
+    ).cte("checks")
+    inserted = insert(DBRequest).from_select(
+        list(values),
+        select(*[literal(value, columns[name].type).label(name) for name, value in values.items()]).where(
+            checks.c.tenant_found, checks.c.unit_found, checks.c.building_found
+        )
+    ).returning(*columns).cte("inserted")
+    query = select(checks, inserted).select_from(checks.outerjoin(inserted, true()))
+    
+    result = await db.execute(query)
+    row = result.one()
+    
+    if not row.tenant_found:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    if not row.unit_found:
+        raise HTTPException(status_code=404, detail="Unit not found")
+    if not row.building_found:
+        raise HTTPException(status_code=404, detail="Building not found")
+    
+    await update_rollups(db, None, rollup_snapshot(row))
+    events = [request_event("created", row.id, row.building_id, row.status)]
+    await event_broker.publish(db, events)
+    await enqueue_notifications(db, events)
+    after_commit(db, metrics_cache.invalidate)
+    sla_scheduler.track(row.id, row.sla_due_at)
+    
+    return RequestCreated.model_validate({
+        **{column.name: getattr(row, column.name) for column in columns},
+        "possible_duplicates": duplicates
+    })
+
+
+@router.post("/bulk", response_model=BulkResult)
+async def create_requests_bulk(items: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_db)):
+    """
+    Create many maintenance requests in one call.
+    Each item is validated on its own: valid items are inserted and invalid
+    ones are reported by index with the reason, without failing the batch.
+    """
+    if len(items) > settings.bulk_max_items:
+        raise HTTPException(status_code=400, detail=f"At most {settings.bulk_max_items} items per bulk request")
+    
+    results = [BulkItemResult(index=index) for index in range(len(items))]
+    parsed = {}
+    for index, item in enumerate(items):
+        try:
+            parsed[index] = RequestCreate.model_validate(item)
+        except ValidationError as e:
+            results[index].error = "; ".join(
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()
+            )
+    
+    # Look up every referenced tenant, unit and building in one set-based query
+    found = {"tenant": set(), "unit": set(), "building": set()}
+    if parsed:
+        lookup = union_all(*[
+            select(literal(kind).label("kind"), model.id).where(
+                model.id.in_({getattr(request, f"{kind}_id") for request in parsed.values()})
+            )
+            for kind, model in [("tenant", DBTenant), ("unit", DBUnit), ("building", DBBuilding)]
+        ])
+        for kind, found_id in (await db.execute(lookup)).all():
+            found[kind].add(found_id)
+    
+    now = datetime.utcnow()
+    rows = []
+    for index, request in parsed.items():
+        missing = next((kind for kind in found if getattr(request, f"{kind}_id") not in found[kind]), None)
+        if missing:
+            results[index].error = f"{missing.capitalize()} not found"
+            continue
+        results[index].id = str(uuid.uuid4())
+        rows.append({
+            "id": results[index].id,
+            **request.model_dump(),
+            "created_at": now,
+            "updated_at": now,
+            "closed_at": None,
+            "resolution_notes": None,
+            "description_bands": description_bands(request.building_id, request.issue_type, request.description)
+        })
+    
+    if rows:
+        # Sent as multi-row INSERT ... VALUES batches rather than one statement per row
+        await db.execute(insert(DBRequest), rows)
+        await apply_rollup_changes(db, [
+            (None, RollupSnapshot(
+                row["building_id"], row["status"], row["priority"], row["issue_type"], now.date()
+            ))
+            for row in rows
+        ])
+        events = [request_event("created", row["id"], row["building_id"], row["status"]) for row in rows]
+        await event_broker.publish(db, events)
+        await enqueue_notifications(db, events)
+        after_commit(db, metrics_cache.invalidate)
+        for row in rows:
+            sla_scheduler.track(row["id"], sla_due_at(now, row["target_sla_hours"]))
+    
+    return BulkResult(succeeded=len(rows), failed=len(items) - len(rows), results=results)
+
+
+async def lock_bulk_targets(db: AsyncSession, selection: BulkSelection) -> list:
+    """
+    Lock the requests a bulk operation applies to and return their rollup
+    dimensions. Rows are locked in id order so overlapping bulk calls
+    cannot deadlock each other.
+    """
+    conditions = []
+    if selection.ids:
+        if len(selection.ids) > settings.bulk_max_items:
+            raise HTTPException(status_code=400, detail=f"At most {settings.bulk_max_items} ids per bulk request")
+        conditions.append(DBRequest.id.in_(set(selection.ids)))
+    if selection.filter:
+        for key, value in selection.filter.model_dump(exclude_none=True).items():
+            conditions.append(getattr(DBRequest, key) == value)
+    if not conditions:
+        raise HTTPException(status_code=400, detail="Provide ids or a non-empty filter")
+    
+    query = select(
+        DBRequest.id, DBRequest.building_id, DBRequest.status, DBRequest.priority,
+        DBRequest.issue_type, DBRequest.created_at
+    ).where(*conditions).order_by(DBRequest.id).limit(settings.bulk_max_items + 1).with_for_update()
+    result = await db.execute(query)
+    rows = result.all()
+    if len(rows) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=400, detail=f"Filter matches more than {settings.bulk_max_items} requests"
+        )
+    return rows
+
+
+def missing_ids(selection: BulkSelection, rows: list) -> List[str]:
+    found = {row.id for row in rows}
+    return sorted(set(selection.ids or []) - found)
+
+
+@router.patch("/bulk-status", response_model=BulkUpdateResult)
+async def update_status_bulk(update_request: BulkStatusUpdate, db: AsyncSession = Depends(get_db)):
+    """Set the status of every selected request in one statement."""
+    rows = await lock_bulk_targets(db, update_request)
+    ids = [row.id for row in rows]
+    
+    if ids:
+        now = datetime.utcnow()
+        values = {"status": update_request.status, "updated_at": now}
+        # Handle status change to CLOSED: stamp closed_at where it is not set yet
+        if update_request.status in [RequestStatus.CLOSED, RequestStatus.COMPLETED]:
+            values["closed_at"] = func.coalesce(DBRequest.closed_at, now)
+        if update_request.resolution_notes is not None:
+            values["resolution_notes"] = update_request.resolution_notes
+        
+        await db.execute(
+            update(DBRequest).where(DBRequest.id.in_(ids)).values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        # Requests moved into the open set must be findable by duplicate detection
+        if update_request.status in [RequestStatus.OPEN, RequestStatus.IN_PROGRESS, RequestStatus.PENDING]:
+            await fill_missing_bands(db, ids)
+        await apply_rollup_changes(db, [
+            (rollup_snapshot(row), rollup_snapshot(row)._replace(status=update_request.status))
+            for row in rows
+        ])
+        staff = await active_staff_by_request(db, ids)
+        await event_broker.publish(db, [
+            request_event("updated", row.id, row.building_id, update_request.status, staff[row.id])
+            for row in rows
+        ])
+        after_commit(db, metrics_cache.invalidate)
+    
+    return BulkUpdateResult(ids=ids, not_found=missing_ids(update_request, rows))
+
+
+@router.post("/bulk-assign", response_model=BulkUpdateResult)
+async def assign_requests_bulk(assignment: BulkAssignmentCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Assign one staff member to every selected request. Requests the staff
+    member already holds an active assignment on are skipped.
+    """
+    # Validate staff exists
+    staff_query = select(DBStaff.id).where(DBStaff.id == assignment.staff_id)
+    staff_result = await db.execute(staff_query)
+    if not staff_result.first():
+        raise HTTPException(status_code=404, detail="Staff member not found")
+    
+    rows = await lock_bulk_targets(db, assignment)
+    
+    # Create assignments; the partial unique index on active assignments makes
+    # ON CONFLICT skip requests this staff member is already assigned to
+    now = datetime.utcnow()
+    assigned = set()
+    if rows:
+        insert_query = pg_insert(DBRequestAssignment).on_conflict_do_nothing().returning(
+            DBRequestAssignment.request_id
+        )
+        result = await db.execute(insert_query, [
+            {
+                "id": str(uuid.uuid4()),
+                "request_id": row.id,
+                "staff_id": assignment.staff_id,
+                "assigned_at": now,
+                "accepted_at": None,
+                "completed_at": None,
+                "notes": assignment.notes
+            }
+            for row in rows
+        ])
+        assigned = set(result.scalars().all())
+    to_assign = [row for row in rows if row.id in assigned]
+    ids = [row.id for row in to_assign]
+    
+    if ids:
+        dispatcher.add_load(db, assignment.staff_id, len(ids))
+        await db.execute(
+            update(DBRequest).where(DBRequest.id.in_(ids))
+            .values(status=RequestStatus.IN_PROGRESS, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await fill_missing_bands(db, ids)
+        await apply_rollup_changes(db, [
+            (rollup_snapshot(row), rollup_snapshot(row)._replace(status=RequestStatus.IN_PROGRESS))
+            for row in to_assign
+        ])
+        staff = await active_staff_by_request(db, ids)
+        events = [
+            request_event("assigned", row.id, row.building_id, RequestStatus.IN_PROGRESS, staff[row.id])
+            for row in to_assign
+        ]
+        await event_broker.publish(db, events)
+        await enqueue_notifications(db, [{**event, "staff_ids": [assignment.staff_id]} for event in events])
+        after_commit(db, metrics_cache.invalidate)
+    
+    return BulkUpdateResult(
+        ids=ids,
+        skipped=[row.id for row in rows if row.id not in assigned],
+        not_found=missing_ids(assignment, rows)
+    )
+
+
+async def record_dispatch(db: AsyncSession, rows: list, chosen: Dict[str, str]) -> None:
+    """Insert the assignments chosen for unassigned requests and put the requests in progress."""
+    now = datetime.utcnow()
+    ids = [row.id for row in rows]
+    await db.execute(insert(DBRequestAssignment), [
+        {
+            "id": str(uuid.uuid4()),
+            "request_id": row.id,
+            "staff_id": chosen[row.id],
+            "assigned_at": now,
+            "accepted_at": None,
+            "completed_at": None,
+            "notes": None
+        }
+        for row in rows
+    ])
+    await db.execute(
+        update(DBRequest).where(DBRequest.id.in_(ids))
+        .values(status=RequestStatus.IN_PROGRESS, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    await apply_rollup_changes(db, [
+        (rollup_snapshot(row), rollup_snapshot(row)._replace(status=RequestStatus.IN_PROGRESS))
+        for row in rows
+    ])
+    events = [
+        request_event("assigned", row.id, row.building_id, RequestStatus.IN_PROGRESS, [chosen[row.id]])
+        for row in rows
+    ]
+    await event_broker.publish(db, events)
+    await enqueue_notifications(db, events)
+    for staff_id, count in Counter(chosen[row.id] for row in rows).items():
+        dispatcher.add_load(db, staff_id, count)
+    after_commit(db, metrics_cache.invalidate)
+
+
+def unassigned():
+    """Condition on requests nobody holds an active assignment on."""
+    return ~exists().where(
+        DBRequestAssignment.request_id == DBRequest.id,
+        DBRequestAssignment.completed_at.is_(None)
+    )
+
+
+def work_queue(*conditions):
+    """
+    Lock open requests nobody is working on, most urgent and earliest due
+    first, reading them off ix_requests_work_queue. Rows another
+    transaction has locked are skipped rather than waited for, so
+    concurrent claimers each get different requests without queueing
+    behind one another.
+    """
+    return select(
+        DBRequest.id, DBRequest.building_id, DBRequest.status, DBRequest.priority,
+        DBRequest.issue_type, DBRequest.created_at
+    ).where(DBRequest.status == RequestStatus.OPEN, unassigned(), *conditions).order_by(
+        # The priority enum sorts in declaration order, LOW to EMERGENCY
+        DBRequest.priority.desc(), DBRequest.sla_due_at
+    ).with_for_update(of=DBRequest, skip_locked=True)
+
+
+@router.post("/dispatch", response_model=DispatchResult)
+async def dispatch_backlog(backlog: Optional[DispatchBacklog] = None, db: AsyncSession = Depends(get_db)):
+    """
+    Assign open requests nobody is working on to the least loaded staff
+    member specializing in their issue type, emergencies first and then
+    earliest due first. Requests locked by another dispatch are left to it.
+    """
+    backlog = backlog or DispatchBacklog()
+    limit = backlog.limit or settings.bulk_max_items
+    conditions = []
+    if backlog.filter:
+        for key, value in backlog.filter.model_dump(exclude_none=True).items():
+            conditions.append(getattr(DBRequest, key) == value)
+    
+    result = await db.execute(work_queue(*conditions).limit(limit))
+    rows = result.all()
+    
+    index = await dispatcher.get_index(db)
+    chosen = index.choose_all((row.id, row.issue_type, row.priority) for row in rows)
+    to_assign = [row for row in rows if chosen[row.id] is not None]
+    if to_assign:
+        await record_dispatch(db, to_assign, chosen)
+    
+    return DispatchResult(
+        assigned=[DispatchedAssignment(request_id=row.id, staff_id=chosen[row.id]) for row in to_assign],
+        unassigned=[row.id for row in rows if chosen[row.id] is None]
+    )
+
+
+@router.post(
+    "/claim-next",
+    response_model=Request,
+    responses={status.HTTP_204_NO_CONTENT: {"description": "No open request to claim"}}
+)
+async def claim_next_request(claim: ClaimRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Assign the most urgent, earliest due open request nobody is working on
+    to a staff member and return it. Without an `issue_type` only requests
+    in the staff member's specialties are offered, or any request when none
+    of them is an issue type. Concurrent claims never return the same request.
+    """
+    staff_query = select(DBStaff.active, DBStaff.specialties).where(DBStaff.id == claim.staff_id)
+    staff_result = await db.execute(staff_query)
+    staff = staff_result.first()
+    if not staff:
+        raise HTTPException(status_code=404, detail="Staff member not found")
+    if staff.active is False:
+        raise HTTPException(status_code=400, detail="Staff member is inactive")
+    
+    conditions = []
+    if claim.building_id:
+        conditions.append(DBRequest.building_id == claim.building_id)
+    issue_types = [claim.issue_type] if claim.issue_type else specialty_issue_types(staff.specialties)
+    if issue_types:
+        conditions.append(DBRequest.issue_type.in_(issue_types))
+    
+    result = await db.execute(work_queue(*conditions).limit(1))
+    row = result.first()
+    if not row:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
     
+    await record_dispatch(db, [row], {row.id: claim.staff_id})
+    
+    db_request = await db.get(DBRequest, row.id)
     return Request.model_validate(db_request)
 
 
-@router.get("/", response_model=List[Request])
+def filter_requests(
+    query, status_filter=None, tenant_id=None, building_id=None, issue_type=None, priority=None, model=DBRequest
+):
+    """Apply the list filters shared by get_requests and export_requests, to requests or requests_archive."""
+    if status_filter:
+        query = query.where(model.status == status_filter)
+    if tenant_id:
+        query = query.where(model.tenant_id == tenant_id)
+    if building_id:
+        query = query.where(model.building_id == building_id)
+    if issue_type:
+        query = query.where(model.issue_type == issue_type)
+    if priority:
+        query = query.where(model.priority == priority)
+    return query
+
+
+def archive_projection(projection: Projection) -> Projection:
+    """
+    The same projection over requests_archive, which stores assignments and
+    notes with each request, so they are selected rather than attached.
+    """
+    return Projection(RequestView, DBArchivedRequest, projection.fields)
+
+
+def page_with_archive(filters: tuple, skip: int, limit: int, cursor: Optional[str]):
+    """
+    Page through live and archived requests together, newest first, reading
+    only the keys; each table contributes at most the rows the page could need.
+    """
+    branches = [
+        paginate(
+            filter_requests(
+                select(model.id, model.created_at, model.updated_at, literal(archived, Boolean).label("archived")),
+                *filters, model=model
+            ),
+            model, 0, skip + limit, cursor, descending=True
+        )
+        for model, archived in [(DBRequest, False), (DBArchivedRequest, True)]
+    ]
+    page = union_all(*branches).subquery("page")
+    return paginate(select(page), page.c, 0 if cursor else skip, limit, descending=True)
+
+
+async def read_page(db: AsyncSession, rows: list, projection: Projection, related: set) -> List[Dict[str, Any]]:
+    """
+    Read the live and archived requests of a page in its order. The archiver
+    may move a request between the page query and these reads, so live
+    requests that are gone are looked for in the archive too, and requests
+    deleted meanwhile are left out.
+    """
+    by_id = {}
+    live_ids = [row.id for row in rows if not row.archived]
+    if live_ids:
+        result = await db.execute(projection.select().where(DBRequest.id.in_(live_ids)))
+        live = projection.to_dicts(result.all())
+        await attach_related(db, live, related)
+        by_id.update((item["id"], item) for item in live)
+    archived_ids = [row.id for row in rows if row.archived or row.id not in by_id]
+    if archived_ids:
+        archived = archive_projection(projection)
+        result = await db.execute(archived.select().where(DBArchivedRequest.id.in_(archived_ids)))
+        by_id.update((item["id"], item) for item in archived.to_dicts(result.all()))
+    return [by_id[row.id] for row in rows if row.id in by_id]
+
+
+@router.get("/", response_model=List[RequestView], response_class=ORJSONResponse)
 async def get_requests(
+    http_request: HTTPRequest,
     status_filter: Optional[RequestStatus] = Query(None, alias="status"),
     tenant_id: Optional[str] = None,
     building_id: Optional[str] = None,
@@ -66,45 +629,181 @@ async def get_requests(
     priority: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all requests with optional filters."""
-    query = select(DBRequest).offset(skip).limit(limit).order_by(desc(DBRequest.created_at))
+    """
+    Get all requests with optional filters.
+    Pass the X-Next-Cursor header of a full page back as `cursor` to fetch the
+    next page by keyset instead of by offset. `fields=status,description`
+    returns only those fields plus `id`; assignments and notes are only
+    embedded with `include=assignments,notes`. Old CLOSED requests moved to
+    the archive are only listed with `include_archived=true`.
+    """
+    related = parse_include(include)
+    projection = request_projection(fields, related)
+    filters = (status_filter, tenant_id, building_id, issue_type, priority)
+    if include_archived:
+        # Only the keys are paged through; the page's rows are read afterwards
+        query = page_with_archive(filters, skip, limit, cursor)
+    else:
+        # id, created_at and updated_at are always read for the cursor and the ETag
+        query = paginate(
+            projection.select(DBRequest.id, DBRequest.created_at, DBRequest.updated_at),
+            DBRequest, skip, limit, cursor, descending=True
+        )
+        query = filter_requests(query, *filters)
     
-    if status_filter:
-        query = query.where(DBRequest.status == status_filter)
-    if tenant_id:
-        query = query.where(DBRequest.tenant_id == tenant_id)
-    if building_id:
-        query = query.where(DBRequest.building_id == building_id)
-    if issue_type:
-        query = query.where(DBRequest.issue_type == issue_type)
-    if priority:
-        query = query.where(DBRequest.priority == priority)
+    result = await db.execute(query)
+    rows = result.all()
+    # Adding notes or assignments stamps updated_at, so the collections need not be read
+    etag = rows_etag(http_request, rows)
+    if matches(http_request, etag):
+        return not_modified(etag, settings.resource_cache_control)
+    
+    if include_archived:
+        requests = await read_page(db, rows, projection, related)
+    else:
+        requests = projection.to_dicts(rows)
+        await attach_related(db, requests, related)
+    
+    response = ORJSONResponse(requests)
+    set_next_cursor(response, rows, limit)
+    return set_etag(response, etag, settings.resource_cache_control)
+
+
+@router.get("/search", response_model=List[RequestSearchResult], response_class=ORJSONResponse)
+async def search_requests(
+    q: str = Query(..., min_length=1, max_length=200),
+    status_filter: Optional[RequestStatus] = Query(None, alias="status"),
+    tenant_id: Optional[str] = None,
+    building_id: Optional[str] = None,
+    issue_type: Optional[str] = None,
+    priority: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Search request descriptions, resolution notes and notes, most relevant
+    first. `q` takes web search syntax ("burst pipe", leak or drip, -heater)
+    and combines with the list filters, `fields` and `include`.
+    """
+    related = parse_include(include)
+    projection = request_projection(fields, related)
+    hits = search_matches(
+        q, lambda query: filter_requests(query, status_filter, tenant_id, building_id, issue_type, priority)
+    )
+    query = projection.select(hits.c.rank).join_from(
+        DBRequest, hits, DBRequest.id == hits.c.request_id
+    ).order_by(
+        hits.c.rank.desc(), DBRequest.created_at.desc(), DBRequest.id.desc()
+    ).offset(skip).limit(limit)
     
     result = await db.execute(query)
-    requests = result.scalars().all()
+    rows = result.all()
+    requests = projection.to_dicts(rows)
+    for request, row in zip(requests, rows):
+        request["rank"] = row.rank
+    await attach_related(db, requests, related)
+    return ORJSONResponse(requests)
+
+
+@router.get("/export")
+async def export_requests(
+    format: ExportFormat = ExportFormat.NDJSON,
+    status_filter: Optional[RequestStatus] = Query(None, alias="status"),
+    tenant_id: Optional[str] = None,
+    building_id: Optional[str] = None,
+    issue_type: Optional[str] = None,
+    priority: Optional[str] = None
+):
+    """
+    Export every request matching the filters as CSV or NDJSON, oldest first.
+    Rows are read through a server-side cursor and written as they arrive,
+    so memory use does not grow with the size of the export.
+    """
+    query = filter_requests(
+        select(*EXPORT_COLUMNS), status_filter, tenant_id, building_id, issue_type, priority
+    ).order_by(DBRequest.created_at, DBRequest.id)
+    # The session has to outlive this handler, so the stream opens its own
+    session_factory = await database.read_router.session_factory()
+    
+    if format == ExportFormat.CSV:
+        media_type, filename = "text/csv", "requests.csv"
+    else:
+        media_type, filename = "application/x-ndjson", "requests.ndjson"
     
-    return [Request.model_validate(req) for req in requests]
+    return StreamingResponse(
+        stream_export(session_factory, query, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
-@router.get("/{request_id}", response_model=Request)
-async def get_request(request_id: str, db: AsyncSession = Depends(get_db)):
-    """Get a specific request by ID."""
-    query = select(DBRequest).where(DBRequest.id == request_id)
+@router.get("/stream")
+async def stream_request_events(building_id: Optional[str] = None, staff_id: Optional[str] = None):
+    """
+    Server-sent events for request changes: created, updated, assigned,
+    completed, note_added and deleted, each with the request id, building,
+    status and assigned staff. Narrow the stream to one building or to the
+    requests a staff member is assigned to.
+    """
+    return StreamingResponse(
+        stream_events(building_id, staff_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/{request_id}", response_model=RequestView, response_class=ORJSONResponse)
+async def get_request(
+    http_request: HTTPRequest,
+    request_id: str,
+    fields: Optional[str] = None,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get a specific request by ID, archived or not. `fields` and `include`
+    narrow and extend the response the same way as on the list endpoint.
+    """
+    related = parse_include(include)
+    projection = request_projection(fields, related)
+    query = projection.select(DBRequest.updated_at).where(DBRequest.id == request_id)
     result = await db.execute(query)
-    request = result.scalar_one_or_none()
+    row = result.first()
     
-    if not request:
-        raise HTTPException(status_code=404, detail="Request not found")
+    archived = None
+    if not row:
+        archived = archive_projection(projection)
+        query = archived.select(DBArchivedRequest.updated_at).where(DBArchivedRequest.id == request_id)
+        result = await db.execute(query)
+        row = result.first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Request not found")
+    
+    etag = rows_etag(http_request, [row])
+    if matches(http_request, etag):
+        return not_modified(etag, settings.resource_cache_control)
     
-    return Request.model_validate(request)
+    if archived is not None:
+        return set_etag(ORJSONResponse(archived.to_dict(row)), etag, settings.resource_cache_control)
+    request = projection.to_dict(row)
+    await attach_related(db, [request], related)
+    return set_etag(ORJSONResponse(request), etag, settings.resource_cache_control)
 
 
 @router.put("/{request_id}", response_model=Request)
 async def update_request(request_id: str, request_update: RequestUpdate, db: AsyncSession = Depends(get_db)):
     """Update a request."""
-    query = select(DBRequest).where(DBRequest.id == request_id)
+    # Locked so concurrent writers apply their rollup deltas from the row's current state
+    query = select(DBRequest).where(DBRequest.id == request_id).with_for_update()
     result = await db.execute(query)
     db_request = result.scalar_one_or_none()
     
@@ -115,6 +814,8 @@ async def update_request(request_id: str, request_update: RequestUpdate, db: Asy
     if not update_data:
         raise HTTPException(status_code=400, detail="No fields to update")
     
+    before = rollup_snapshot(db_request)
+    
     # Handle status change to CLOSED
     if "status" in update_data and update_data["status"] in [RequestStatus.CLOSED, RequestStatus.COMPLETED]:
         if not db_request.closed_at:
@@ -122,11 +823,27 @@ async def update_request(request_id: str, request_update: RequestUpdate, db: Asy
     
     for key, value in update_data.items():
         setattr(db_request, key, value)
+    # A reopened request may have been closed before its bands were backfilled
+    if update_data.keys() & {"description", "issue_type", "status"}:
+        db_request.description_bands = description_bands(
+            db_request.building_id, db_request.issue_type, db_request.description
+        )
+    # A new SLA target is a new deadline to escalate on
+    if "target_sla_hours" in update_data:
+        db_request.sla_escalated_at = None
     
     db_request.updated_at = datetime.utcnow()
     
+    await update_rollups(db, before, rollup_snapshot(db_request))
+    await event_broker.publish(db, [request_event(
+        "updated", db_request.id, db_request.building_id, db_request.status, active_staff(db_request)
+    )])
+    after_commit(db, metrics_cache.invalidate)
+    
     await db.flush()
     await db.refresh(db_request)
+    if db_request.sla_escalated_at is None:
+        sla_scheduler.track(db_request.id, db_request.sla_due_at)
     
     return Request.model_validate(db_request)
 
@@ -134,14 +851,19 @@ async def update_request(request_id: str, request_update: RequestUpdate, db: Asy
 @router.delete("/{request_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_request(request_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a request."""
-    query = select(DBRequest).where(DBRequest.id == request_id)
+    query = select(DBRequest).where(DBRequest.id == request_id).with_for_update()
     result = await db.execute(query)
     db_request = result.scalar_one_or_none()
     
     if not db_request:
         raise HTTPException(status_code=404, detail="Request not found")
     
+    await update_rollups(db, rollup_snapshot(db_request), None)
+    await event_broker.publish(db, [request_event(
+        "deleted", db_request.id, db_request.building_id, db_request.status, active_staff(db_request)
+    )])
     await db.delete(db_request)
+    after_commit(db, metrics_cache.invalidate)
     
     return None
 
@@ -150,7 +872,7 @@ async def delete_request(request_id: str, db: AsyncSession = Depends(get_db)):
 async def assign_request(request_id: str, assignment: AssignmentCreate, db: AsyncSession = Depends(get_db)):
     """Assign a staff member to a request."""
     # Validate request exists
-    request_query = select(DBRequest).where(DBRequest.id == request_id)
+    request_query = select(DBRequest).where(DBRequest.id == request_id).with_for_update()
     request_result = await db.execute(request_query)
     db_request = request_result.scalar_one_or_none()
     
@@ -164,32 +886,74 @@ async def assign_request(request_id: str, assignment: AssignmentCreate, db: Asyn
         raise HTTPException(status_code=404, detail="Staff member not found")
     
     # Check if already assigned
-    for existing_assignment in db_request.assignments or []:
-        if existing_assignment.get("staff_id") == assignment.staff_id and not existing_assignment.get("completed_at"):
-            raise HTTPException(status_code=400, detail="Staff member already assigned to this request")
+    active_query = select(DBRequestAssignment.id).where(
+        DBRequestAssignment.request_id == request_id,
+        DBRequestAssignment.staff_id == assignment.staff_id,
+        DBRequestAssignment.completed_at.is_(None)
+    )
+    active_result = await db.execute(active_query)
+    if active_result.first():
+        raise HTTPException(status_code=400, detail="Staff member already assigned to this request")
+    
+    before = rollup_snapshot(db_request)
     
     # Create assignment
-    new_assignment = {
-        "staff_id": assignment.staff_id,
-        "assigned_at": datetime.utcnow().isoformat(),
-        "accepted_at": None,
-        "completed_at": None,
-        "notes": assignment.notes
-    }
+    db_request.assignments.append(DBRequestAssignment(
+        id=str(uuid.uuid4()),
+        staff_id=assignment.staff_id,
+        assigned_at=datetime.utcnow(),
+        accepted_at=None,
+        completed_at=None,
+        notes=assignment.notes
+    ))
+    dispatcher.add_load(db, assignment.staff_id)
     
     # Update request
-    current_assignments = db_request.assignments or []
-    current_assignments.append(new_assignment)
-    db_request.assignments = current_assignments
     db_request.status = RequestStatus.IN_PROGRESS
     db_request.updated_at = datetime.utcnow()
     
+    await update_rollups(db, before, rollup_snapshot(db_request))
+    # Only the newly assigned staff member is notified; the stream goes to everyone on the request
+    events = [request_event(
+        "assigned", db_request.id, db_request.building_id, db_request.status, active_staff(db_request)
+    )]
+    await event_broker.publish(db, events)
+    await enqueue_notifications(db, [{**events[0], "staff_ids": [assignment.staff_id]}])
+    after_commit(db, metrics_cache.invalidate)
+    
     await db.flush()
     await db.refresh(db_request)
     
     return Request.model_validate(db_request)
 
 
+@router.post("/{request_id}/dispatch", response_model=Request)
+async def dispatch_request(request_id: str, db: AsyncSession = Depends(get_db)):
+    """Assign an unassigned request to the least loaded staff member specializing in its issue type."""
+    query = select(
+        DBRequest.id, DBRequest.building_id, DBRequest.status, DBRequest.priority,
+        DBRequest.issue_type, DBRequest.created_at, unassigned().label("unassigned")
+    ).where(DBRequest.id == request_id).with_for_update(of=DBRequest)
+    result = await db.execute(query)
+    row = result.first()
+    
+    if not row:
+        raise HTTPException(status_code=404, detail="Request not found")
+    if row.status in [RequestStatus.COMPLETED, RequestStatus.CLOSED]:
+        raise HTTPException(status_code=400, detail="Request is already closed")
+    if not row.unassigned:
+        raise HTTPException(status_code=400, detail="Request is already assigned")
+    
+    index = await dispatcher.get_index(db)
+    staff_id = index.choose(row.issue_type, row.priority)
+    if staff_id is None:
+        raise HTTPException(status_code=409, detail="No staff member available")
+    await record_dispatch(db, [row], {row.id: staff_id})
+    
+    db_request = await db.get(DBRequest, request_id)
+    return Request.model_validate(db_request)
+
+
 @router.post("/{request_id}/notes", response_model=Request)
 async def add_note(request_id: str, note: NoteCreate, db: AsyncSession = Depends(get_db)):
     """Add a note to a request."""
@@ -201,33 +965,77 @@ async def add_note(request_id: str, note: NoteCreate, db: AsyncSession = Depends
     if not db_request:
         raise HTTPException(status_code=404, detail="Request not found")
     
-    # Create note
-    new_note = {
-        "id": str(uuid.uuid4()),
-        "author_type": note.author_type,
-        "author_id": note.author_id,
-        "author_name": note.author_name,
-        "body": note.body,
-        "created_at": datetime.utcnow().isoformat()
-    }
+    # Append the note as its own row; existing notes are never read or rewritten
+    db.add(DBRequestNote(
+        id=str(uuid.uuid4()),
+        request_id=request_id,
+        author_type=note.author_type,
+        author_id=note.author_id,
+        author_name=note.author_name,
+        body=note.body,
+        created_at=datetime.utcnow()
+    ))
     
     # Update request
-    current_notes = db_request.notes or []
-    current_notes.append(new_note)
-    db_request.notes = current_notes
     db_request.updated_at = datetime.utcnow()
     
+    await event_broker.publish(db, [request_event(
+        "note_added", db_request.id, db_request.building_id, db_request.status, active_staff(db_request)
+    )])
+    
     await db.flush()
     await db.refresh(db_request)
     
     return Request.model_validate(db_request)
 
 
+@router.get("/{request_id}/notes", response_model=List[Note])
+async def get_notes(
+    request_id: str,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the notes of a request, oldest first, with offset or cursor pagination."""
+    request_query = select(DBRequest.id).where(DBRequest.id == request_id)
+    request_result = await db.execute(request_query)
+    if not request_result.first():
+        # Archived requests keep their notes with them
+        archived_query = select(DBArchivedRequest.notes).where(DBArchivedRequest.id == request_id)
+        archived = (await db.execute(archived_query)).first()
+        if not archived:
+            raise HTTPException(status_code=404, detail="Request not found")
+        notes = sorted(
+            (Note.model_validate(note) for note in archived.notes),
+            key=lambda note: position_key(note.created_at, note.id)
+        )
+        if cursor:
+            position = position_key(*decode_cursor(cursor))
+            notes = [note for note in notes if position_key(note.created_at, note.id) > position]
+        else:
+            notes = notes[skip:]
+        notes = notes[:limit]
+        set_next_cursor(response, notes, limit)
+        return notes
+    
+    query = paginate(
+        select(DBRequestNote).where(DBRequestNote.request_id == request_id),
+        DBRequestNote, skip, limit, cursor
+    )
+    result = await db.execute(query)
+    notes = result.scalars().all()
+    set_next_cursor(response, notes, limit)
+    
+    return [Note.model_validate(note) for note in notes]
+
+
 @router.post("/{request_id}/complete", response_model=Request)
 async def complete_assignment(request_id: str, staff_id: str, db: AsyncSession = Depends(get_db)):
     """Mark an assignment as completed."""
     # Validate request exists
-    query = select(DBRequest).where(DBRequest.id == request_id)
+    query = select(DBRequest).where(DBRequest.id == request_id).with_for_update()
     result = await db.execute(query)
     db_request = result.scalar_one_or_none()
     
@@ -235,23 +1043,33 @@ async def complete_assignment(request_id: str, staff_id: str, db: AsyncSession =
         raise HTTPException(status_code=404, detail="Request not found")
     
     # Find and update the assignment
-    assignments = db_request.assignments or []
-    assignment_found = False
-    
-    for assignment in assignments:
-        if assignment.get("staff_id") == staff_id and not assignment.get("completed_at"):
-            assignment["completed_at"] = datetime.utcnow().isoformat()
-            assignment_found = True
-            break
+    complete_query = update(DBRequestAssignment).where(
+        DBRequestAssignment.request_id == request_id,
+        DBRequestAssignment.staff_id == staff_id,
+        DBRequestAssignment.completed_at.is_(None)
+    ).values(completed_at=datetime.utcnow()).execution_options(synchronize_session="fetch")
+    complete_result = await db.execute(complete_query)
     
-    if not assignment_found:
+    if complete_result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Active assignment not found for this staff member")
+    dispatcher.add_load(db, staff_id, -1)
+    
+    before = rollup_snapshot(db_request)
     
     # Update request
-    db_request.assignments = assignments
     db_request.status = RequestStatus.COMPLETED
     db_request.updated_at = datetime.utcnow()
     
+    await update_rollups(db, before, rollup_snapshot(db_request))
+    # The staff member who completed the work is told as well
+    events = [request_event(
+        "completed", db_request.id, db_request.building_id, db_request.status,
+        [*active_staff(db_request), staff_id]
+    )]
+    await event_broker.publish(db, events)
+    await enqueue_notifications(db, events)
+    after_commit(db, metrics_cache.invalidate)
+    
     await db.flush()
     await db.refresh(db_request)
     
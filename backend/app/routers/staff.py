@@ -1,16 +1,24 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 import uuid
 
-from ..database import get_db
+from ..config import settings
+from ..database import get_db, get_read_db, after_commit
+from ..dispatch import dispatcher
+from ..etags import matches, not_modified, rows_etag, set_etag
+from ..pagination import paginate, set_next_cursor
+from ..projection import Projection
 from ..models import Staff, StaffCreate, StaffUpdate
 from ..models.db_models import Staff as DBStaff
 
 router = APIRouter(prefix="/staff", tags=["staff"])
 
+STAFF_PROJECTION = Projection(Staff, DBStaff)
+
 
 @router.post("/", response_model=Staff, status_code=status.HTTP_201_CREATED)
 async def create_staff(staff: StaffCreate, db: AsyncSession = Depends(get_db)):
@@ -29,28 +37,41 @@ async def create_staff(staff: StaffCreate, db: AsyncSession = Depends(get_db)):
     )
     
     db.add(db_staff)
+    after_commit(db, dispatcher.invalidate)
     await db.flush()
     await db.refresh(db_staff)
     
     return Staff.model_validate(db_staff)
 
 
-@router.get("/", response_model=List[Staff])
-async def get_staff(active: Optional[bool] = None, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+@router.get("/", response_model=List[Staff], response_class=ORJSONResponse)
+async def get_staff(
+    http_request: Request,
+    active: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get all staff members with optional active filter."""
-    query = select(DBStaff).offset(skip).limit(limit)
+    query = paginate(STAFF_PROJECTION.select(), DBStaff, skip, limit, cursor)
     
     if active is not None:
         query = query.where(DBStaff.active == active)
     
     result = await db.execute(query)
-    staff_list = result.scalars().all()
-    
-    return [Staff.model_validate(staff) for staff in staff_list]
+    rows = result.all()
+    etag = rows_etag(http_request, rows)
+    if matches(http_request, etag):
+        return not_modified(etag, settings.resource_cache_control)
+    
+    response = ORJSONResponse(STAFF_PROJECTION.to_dicts(rows))
+    set_next_cursor(response, rows, limit)
+    return set_etag(response, etag, settings.resource_cache_control)
 
 
 @router.get("/{staff_id}", response_model=Staff)
-async def get_staff_member(staff_id: str, db: AsyncSession = Depends(get_db)):
+async def get_staff_member(staff_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get a specific staff member by ID."""
     query = select(DBStaff).where(DBStaff.id == staff_id)
     result = await db.execute(query)
@@ -92,6 +113,7 @@ async def update_staff(staff_id: str, staff_update: StaffUpdate, db: AsyncSessio
         setattr(db_staff, key, value)
     
     db_staff.updated_at = datetime.utcnow()
+    after_commit(db, dispatcher.invalidate)
     
     await db.flush()
     await db.refresh(db_staff)
@@ -112,6 +134,7 @@ async def delete_staff(staff_id: str, db: AsyncSession = Depends(get_db)):
     # Soft delete instead of hard delete
     db_staff.active = False
     db_staff.updated_at = datetime.utcnow()
+    after_commit(db, dispatcher.invalidate)
     
     await db.flush()
     
@@ -1,16 +1,25 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
 import uuid
 
-from ..database import get_db
+from ..config import settings
+from ..database import get_db, get_read_db
+from ..etags import matches, not_modified, rows_etag, set_etag
+from ..pagination import paginate, set_next_cursor
+from ..projection import Projection
 from ..models import Tenant, TenantCreate, TenantUpdate
-from ..models.db_models import Tenant as DBTenant, Unit as DBUnit, Request as DBRequest
+from ..models.db_models import (
+    Tenant as DBTenant, Unit as DBUnit, Request as DBRequest, ArchivedRequest as DBArchivedRequest
+)
 
 router = APIRouter(prefix="/tenants", tags=["tenants"])
 
+TENANT_PROJECTION = Projection(Tenant, DBTenant)
+
 
 @router.post("/", response_model=Tenant, status_code=status.HTTP_201_CREATED)
 async def create_tenant(tenant: TenantCreate, db: AsyncSession = Depends(get_db)):
@@ -43,22 +52,34 @@ async def create_tenant(tenant: TenantCreate, db: AsyncSession = Depends(get_db)
     return Tenant.model_validate(db_tenant)
 
 
-@router.get("/", response_model=List[Tenant])
-async def get_tenants(unit_id: Optional[str] = None, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+@router.get("/", response_model=List[Tenant], response_class=ORJSONResponse)
+async def get_tenants(
+    http_request: Request,
+    unit_id: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get all tenants with optional unit filter."""
-    query = select(DBTenant).offset(skip).limit(limit)
+    query = paginate(TENANT_PROJECTION.select(), DBTenant, skip, limit, cursor)
     
     if unit_id:
         query = query.where(DBTenant.unit_id == unit_id)
     
     result = await db.execute(query)
-    tenants = result.scalars().all()
-    
-    return [Tenant.model_validate(tenant) for tenant in tenants]
+    rows = result.all()
+    etag = rows_etag(http_request, rows)
+    if matches(http_request, etag):
+        return not_modified(etag, settings.resource_cache_control)
+    
+    response = ORJSONResponse(TENANT_PROJECTION.to_dicts(rows))
+    set_next_cursor(response, rows, limit)
+    return set_etag(response, etag, settings.resource_cache_control)
 
 
 @router.get("/{tenant_id}", response_model=Tenant)
-async def get_tenant(tenant_id: str, db: AsyncSession = Depends(get_db)):
+async def get_tenant(tenant_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get a specific tenant by ID."""
     query = select(DBTenant).where(DBTenant.id == tenant_id)
     result = await db.execute(query)
@@ -111,7 +132,13 @@ async def update_tenant(tenant_id: str, tenant_update: TenantUpdate, db: AsyncSe
 async def delete_tenant(tenant_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a tenant."""
     # Check if tenant has requests
-    requests_query = select(func.count()).select_from(DBRequest).where(DBRequest.tenant_id == tenant_id)
+    # Archived requests still refer to the tenant
+    requests_query = select(
+        select(func.count()).select_from(DBRequest).where(DBRequest.tenant_id == tenant_id).scalar_subquery()
+        + select(func.count()).select_from(DBArchivedRequest).where(
+            DBArchivedRequest.tenant_id == tenant_id
+        ).scalar_subquery()
+    )
     requests_result = await db.execute(requests_query)
     requests_count = requests_result.scalar()
     
@@ -1,16 +1,23 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
 import uuid
 
-from ..database import get_db
+from ..config import settings
+from ..database import get_db, get_read_db
+from ..etags import matches, not_modified, rows_etag, set_etag
+from ..pagination import paginate, set_next_cursor
+from ..projection import Projection
 from ..models import Unit, UnitCreate, UnitUpdate
 from ..models.db_models import Unit as DBUnit, Building as DBBuilding, Tenant as DBTenant
 
 router = APIRouter(prefix="/units", tags=["units"])
 
+UNIT_PROJECTION = Projection(Unit, DBUnit)
+
 
 @router.post("/", response_model=Unit, status_code=status.HTTP_201_CREATED)
 async def create_unit(unit: UnitCreate, db: AsyncSession = Depends(get_db)):
@@ -51,22 +58,34 @@ async def create_unit(unit: UnitCreate, db: AsyncSession = Depends(get_db)):
     return Unit.model_validate(db_unit)
 
 
-@router.get("/", response_model=List[Unit])
-async def get_units(building_id: Optional[str] = None, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+@router.get("/", response_model=List[Unit], response_class=ORJSONResponse)
+async def get_units(
+    http_request: Request,
+    building_id: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get all units with optional building filter."""
-    query = select(DBUnit).offset(skip).limit(limit)
+    query = paginate(UNIT_PROJECTION.select(), DBUnit, skip, limit, cursor)
     
     if building_id:
         query = query.where(DBUnit.building_id == building_id)
     
     result = await db.execute(query)
-    units = result.scalars().all()
-    
-    return [Unit.model_validate(unit) for unit in units]
+    rows = result.all()
+    etag = rows_etag(http_request, rows)
+    if matches(http_request, etag):
+        return not_modified(etag, settings.resource_cache_control)
+    
+    response = ORJSONResponse(UNIT_PROJECTION.to_dicts(rows))
+    set_next_cursor(response, rows, limit)
+    return set_etag(response, etag, settings.resource_cache_control)
 
 
 @router.get("/{unit_id}", response_model=Unit)
-async def get_unit(unit_id: str, db: AsyncSession = Depends(get_db)):
+async def get_unit(unit_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get a specific unit by ID."""
     query = select(DBUnit).where(DBUnit.id == unit_id)
     result = await db.execute(query)
@@ -0,0 +1,35 @@
+from typing import Callable
+
+from sqlalchemy import Select, func, literal_column, select, union_all
+
+from .models.db_models import Request as DBRequest, RequestNote as DBRequestNote
+
+# Text search configuration of the generated search_vector columns
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+
+def search_matches(q: str, restrict: Callable[[Select], Select] = lambda query: query):
+    """
+    Subquery of (request_id, rank) for requests whose description,
+    resolution notes or notes match `q`. `q` uses web search syntax:
+    quoted phrases, `or` and `-excluded` words. Requests and notes are
+    each matched through their own GIN index; a request's rank is the sum
+    of its own rank and those of its matching notes.
+
+    `restrict` adds conditions on requests to both sides before ranking,
+    so a narrow filter also narrows the rows that have to be ranked.
+    """
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    hits = union_all(
+        restrict(select(
+            DBRequest.id.label("request_id"),
+            func.ts_rank(DBRequest.search_vector, query).label("rank")
+        ).where(DBRequest.search_vector.bool_op("@@")(query))),
+        restrict(select(
+            DBRequestNote.request_id,
+            func.ts_rank(DBRequestNote.search_vector, query).label("rank")
+        ).join_from(DBRequestNote, DBRequest).where(DBRequestNote.search_vector.bool_op("@@")(query)))
+    ).subquery("hits")
+    return select(
+        hits.c.request_id, func.sum(hits.c.rank).label("rank")
+    ).group_by(hits.c.request_id).subquery("search_matches")
@@ -0,0 +1,232 @@
+import asyncio
+import heapq
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import metrics_cache
+from .config import settings
+from .database import AsyncSessionLocal, after_commit, run_after_commit
+from .events import active_staff_by_request, event_broker, request_event
+from .models import Priority
+from .models.db_models import OPEN_STATUSES, Request as DBRequest, RequestNote as DBRequestNote
+from .rollups import apply_rollup_changes, rollup_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Priority a request is raised to when its SLA runs out
+ESCALATED_PRIORITY = {
+    Priority.LOW: Priority.MEDIUM,
+    Priority.MEDIUM: Priority.HIGH,
+    Priority.HIGH: Priority.EMERGENCY,
+    Priority.EMERGENCY: Priority.EMERGENCY
+}
+RETRY_SECONDS = 5.0
+
+# Called with the escalations of each pass once they are committed
+EscalationHook = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+
+def sla_due_at(created_at: datetime, target_sla_hours: int) -> datetime:
+    """The deadline PostgreSQL stores in requests.sla_due_at."""
+    return created_at + timedelta(hours=target_sla_hours)
+
+
+def escalation_cutoff(now: datetime) -> datetime:
+    """Requests due by this time are escalated."""
+    return now + timedelta(minutes=settings.sla_escalation_lead_minutes)
+
+
+async def escalate_due(db: AsyncSession, ids: List[str], now: datetime) -> List[Dict[str, Any]]:
+    """
+    Escalate the requests among `ids` that are open, due and not escalated
+    yet: raise their priority a level, add a note and publish an
+    sla_breached event. Requests are locked while they are checked and
+    stamped with sla_escalated_at, so each is escalated exactly once even
+    with a scheduler in every worker; rows another transaction holds are
+    skipped and picked up again on a later pass.
+    """
+    query = select(
+        DBRequest.id, DBRequest.building_id, DBRequest.status, DBRequest.priority,
+        DBRequest.issue_type, DBRequest.created_at, DBRequest.target_sla_hours, DBRequest.sla_due_at
+    ).where(
+        DBRequest.id.in_(ids), OPEN_STATUSES,
+        DBRequest.sla_escalated_at.is_(None), DBRequest.sla_due_at <= escalation_cutoff(now)
+    ).order_by(DBRequest.id).with_for_update(skip_locked=True)
+    result = await db.execute(query)
+    rows = result.all()
+    if not rows:
+        return []
+
+    table = DBRequest.__table__
+    await db.execute(
+        update(table).where(table.c.id == bindparam("request_id"))
+        .values(priority=bindparam("escalated"), sla_escalated_at=now, updated_at=now),
+        [{"request_id": row.id, "escalated": ESCALATED_PRIORITY[row.priority]} for row in rows]
+    )
+    await db.execute(insert(DBRequestNote), [
+        {
+            "id": str(uuid.uuid4()),
+            "request_id": row.id,
+            "author_type": "system",
+            "author_id": "sla-scheduler",
+            "author_name": "SLA scheduler",
+            "body": (
+                f"{'Breached' if row.sla_due_at <= now else 'About to breach'} the {row.target_sla_hours}h SLA "
+                f"due {row.sla_due_at:%Y-%m-%d %H:%M} UTC; priority raised from "
+                f"{row.priority.value} to {ESCALATED_PRIORITY[row.priority].value}."
+            ),
+            "created_at": now
+        }
+        for row in rows
+    ])
+    await apply_rollup_changes(db, [
+        (rollup_snapshot(row), rollup_snapshot(row)._replace(priority=ESCALATED_PRIORITY[row.priority]))
+        for row in rows
+    ])
+    staff = await active_staff_by_request(db, [row.id for row in rows])
+    await event_broker.publish(db, [
+        request_event("sla_breached", row.id, row.building_id, row.status, staff[row.id]) for row in rows
+    ])
+    after_commit(db, metrics_cache.invalidate)
+
+    return [
+        {
+            "request_id": row.id,
+            "building_id": row.building_id,
+            "sla_due_at": row.sla_due_at,
+            "previous_priority": row.priority,
+            "priority": ESCALATED_PRIORITY[row.priority],
+            "staff_ids": staff[row.id]
+        }
+        for row in rows
+    ]
+
+
+class SlaScheduler:
+    """
+    Escalate requests as their SLA deadlines pass. Each worker keeps the
+    next sla_scheduler_window deadlines in a min-heap and sleeps until the
+    first is due. The heap is reloaded from ix_requests_sla_pending, which
+    only holds open requests not escalated yet, at startup, every
+    sla_scheduler_refresh_seconds to see other workers' requests, and when
+    it runs dry; deadlines this worker sets in the meantime are pushed as
+    they are written.
+    """
+
+    def __init__(self, enabled: bool, window: int, refresh_seconds: float):
+        self.enabled = enabled
+        self.window = window
+        self.refresh_seconds = refresh_seconds
+        self.heap: List[Tuple[datetime, str]] = []
+        # Latest deadline loaded when the window was full; later ones wait for a reload
+        self.horizon: Optional[datetime] = None
+        self.refreshed_at: Optional[float] = None
+        self.hooks: List[EscalationHook] = []
+        self.task: Optional[asyncio.Task] = None
+        self.wakeup = asyncio.Event()
+        self.escalated = 0
+
+    def add_hook(self, hook: EscalationHook) -> None:
+        """Notify `hook` of every escalation, e.g. to page the building manager."""
+        self.hooks.append(hook)
+
+    def track(self, request_id: str, due_at: Optional[datetime]) -> None:
+        """Schedule a deadline this worker has just written."""
+        if due_at is None or (self.horizon is not None and due_at > self.horizon):
+            return
+        heapq.heappush(self.heap, (due_at, request_id))
+        if self.heap[0] == (due_at, request_id):
+            self.wakeup.set()
+
+    async def start(self) -> None:
+        if self.enabled:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            task, self.task = self.task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def refresh(self, db: AsyncSession) -> None:
+        query = select(DBRequest.sla_due_at, DBRequest.id).where(
+            OPEN_STATUSES, DBRequest.sla_escalated_at.is_(None), DBRequest.sla_due_at.isnot(None)
+        ).order_by(DBRequest.sla_due_at).limit(self.window)
+        result = await db.execute(query)
+        # Rows come sorted, which is already a valid heap
+        self.heap = [(due_at, request_id) for due_at, request_id in result.all()]
+        self.horizon = self.heap[-1][0] if len(self.heap) == self.window else None
+        self.refreshed_at = time.monotonic()
+
+    def pop_due(self, cutoff: datetime) -> List[str]:
+        ids = []
+        while self.heap and self.heap[0][0] <= cutoff:
+            ids.append(heapq.heappop(self.heap)[1])
+        return ids
+
+    async def run_once(self) -> float:
+        """Reload the heap when due and escalate what has come due; returns the seconds until the next pass."""
+        stale = self.refreshed_at is None or time.monotonic() - self.refreshed_at >= self.refresh_seconds
+        if stale or (not self.heap and self.horizon is not None):
+            async with AsyncSessionLocal() as db:
+                await self.refresh(db)
+
+        now = datetime.utcnow()
+        ids = self.pop_due(escalation_cutoff(now))
+        for start in range(0, len(ids), settings.bulk_max_items):
+            async with AsyncSessionLocal() as db:
+                escalations = await escalate_due(db, ids[start:start + settings.bulk_max_items], now)
+                await db.commit()
+            await run_after_commit(db)
+            self.escalated += len(escalations)
+            if escalations:
+                await self.notify(escalations)
+
+        wait = self.refresh_seconds - (time.monotonic() - self.refreshed_at)
+        if self.heap:
+            wait = min(wait, (self.heap[0][0] - escalation_cutoff(datetime.utcnow())).total_seconds())
+        return max(wait, 0.0)
+
+    async def notify(self, escalations: List[Dict[str, Any]]) -> None:
+        for hook in self.hooks:
+            try:
+                await hook(escalations)
+            except Exception:
+                logger.exception("SLA escalation hook %r failed", hook)
+
+    async def run(self) -> None:
+        while True:
+            # Cleared first, so deadlines tracked during a pass still wake the next one
+            self.wakeup.clear()
+            try:
+                wait = await self.run_once()
+            except Exception:
+                logger.exception("SLA scheduler pass failed, retrying in %ss", RETRY_SECONDS)
+                wait = RETRY_SECONDS
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.task is not None and not self.task.done(),
+            "scheduled": len(self.heap),
+            "next_due_at": self.heap[0][0].isoformat() if self.heap else None,
+            "horizon": self.horizon.isoformat() if self.horizon else None,
+            "escalated": self.escalated
+        }
+
+
+sla_scheduler = SlaScheduler(
+    settings.sla_scheduler_enabled, settings.sla_scheduler_window, settings.sla_scheduler_refresh_seconds
+)
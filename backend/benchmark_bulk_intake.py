@@ -0,0 +1,98 @@
+"""
+Benchmark request intake in rows per second: N calls of create_request
+against one POST /requests/bulk call with N items. Both run in a
+transaction that is rolled back, so the database is left unchanged.
+
+Needs at least one tenant with a unit (python seed_pg_data.py), then:
+
+    python benchmark_bulk_intake.py --rows 5000
+    python benchmark_bulk_intake.py --rows 5000 --rtt-ms 2
+
+--rtt-ms adds that much delay to every statement to approximate the
+round-trip time of a remote database over TLS.
+"""
+import argparse
+import asyncio
+import time
+from fastapi import Response
+from sqlalchemy import event, select
+
+from app.database import engine, AsyncSessionLocal
+from app.duplicates import DuplicatePolicy
+from app.models import RequestCreate
+from app.models.db_models import Tenant as DBTenant, Unit as DBUnit
+from app.routers.requests import create_request, create_requests_bulk
+
+
+async def one_at_a_time(items, db):
+    for item in items:
+        await create_request(RequestCreate.model_validate(item), Response(), DuplicatePolicy.CREATE, db)
+
+
+async def bulk(items, db):
+    result = await create_requests_bulk(items, db)
+    assert result.failed == 0, result.results[:5]
+
+
+async def run(label, handler, items, rtt_ms):
+    """Time one call of handler over all items and count the statements it sends."""
+    statements = 0
+
+    def on_statement(*args):
+        nonlocal statements
+        statements += 1
+        if rtt_ms:
+            time.sleep(rtt_ms / 1000)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_statement)
+    try:
+        async with AsyncSessionLocal() as session:
+            started = time.perf_counter()
+            await handler(items, session)
+            elapsed = time.perf_counter() - started
+            await session.rollback()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_statement)
+
+    print(
+        f"{label:<16} statements: {statements:>6}   "
+        f"elapsed: {elapsed * 1000:>9.1f} ms   "
+        f"throughput: {len(items) / elapsed:>9,.0f} rows/s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk request intake")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--rtt-ms", type=float, default=0, help="simulated delay per statement")
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(DBTenant.id, DBUnit.id, DBUnit.building_id)
+            .join(DBUnit, DBTenant.unit_id == DBUnit.id)
+            .limit(1)
+        )
+        tenant_id, unit_id, building_id = result.one()
+
+    items = [
+        {
+            "tenant_id": tenant_id,
+            "unit_id": unit_id,
+            "building_id": building_id,
+            "issue_type": ["Plumbing", "Electrical", "HVAC"][i % 3],
+            "priority": ["Low", "Medium", "High"][i % 3],
+            "description": f"Imported request {i}"
+        }
+        for i in range(args.rows)
+    ]
+    print(f"{args.rows:,} rows, simulated round trip {args.rtt_ms} ms\n")
+
+    await run("one at a time", one_at_a_time, items, args.rtt_ms)
+    await run("bulk", bulk, items, args.rtt_ms)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+"""
+Benchmark many technicians claiming work at once through claim_next_request,
+each claim its own committed transaction as in POST /requests/claim-next.
+With SKIP LOCKED claimers pass over rows others hold; the "for update"
+run swaps in a plain FOR UPDATE, under which they queue behind whoever
+holds the head of the queue. "select" times only the statement that
+picks and locks the request, which is where a convoy shows; end-to-end
+times also include this one process's CPU, which hundreds of claimers
+share. Claimed requests are put back afterwards.
+
+Needs open requests (python seed_bench_data.py) and at least one staff
+member, and a server allowing more than --claimers connections:
+
+    python benchmark_claim_next.py --claimers 200 --claims 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from unittest import mock
+
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database import engine_options
+from app.models import ClaimRequest, IssueType, RequestStatus
+from app.models.db_models import (
+    OutboxMessage as DBOutboxMessage, Request as DBRequest, RequestAssignment as DBRequestAssignment, Staff as DBStaff
+)
+from app.rollups import apply_rollup_changes, rollup_snapshot
+from app.routers import requests
+from app.routers.requests import claim_next_request, work_queue
+
+
+def waiting_work_queue(*conditions):
+    return work_queue(*conditions).with_for_update(of=DBRequest)
+
+
+async def warm(sessions):
+    async with sessions() as db:
+        await db.connection()
+        await asyncio.sleep(0.5)
+
+
+async def claimer(sessions, claim, claims, latencies, claimed, start):
+    await start.wait()
+    for _ in range(claims):
+        started = time.perf_counter()
+        async with sessions() as db:
+            result = await claim_next_request(claim, db)
+            await db.commit()
+        latencies.append(time.perf_counter() - started)
+        claimed.append(result.id)
+
+
+async def release(sessions, ids, staff_id):
+    """Put claimed requests back in the queue and their rollup counts back, dropping their notifications."""
+    async with sessions() as db:
+        rows = (await db.execute(select(
+            DBRequest.id, DBRequest.building_id, DBRequest.status, DBRequest.priority,
+            DBRequest.issue_type, DBRequest.created_at
+        ).where(DBRequest.id.in_(ids)))).all()
+        await db.execute(delete(DBRequestAssignment).where(
+            DBRequestAssignment.request_id.in_(ids), DBRequestAssignment.staff_id == staff_id
+        ))
+        await db.execute(delete(DBOutboxMessage).where(
+            DBOutboxMessage.request_id.in_(ids), DBOutboxMessage.event_type == "assigned",
+            DBOutboxMessage.delivered_at.is_(None)
+        ))
+        await db.execute(update(DBRequest).where(DBRequest.id.in_(ids)).values(status=RequestStatus.OPEN))
+        await apply_rollup_changes(db, [
+            (rollup_snapshot(row), rollup_snapshot(row)._replace(status=RequestStatus.OPEN)) for row in rows
+        ])
+        await db.commit()
+
+
+def percentiles(values):
+    values = sorted(values)
+    return statistics.median(values) * 1000, values[max(int(len(values) * 0.99) - 1, 0)] * 1000
+
+
+async def run(label, sessions, claim, args):
+    latencies, claimed, start = [], [], asyncio.Event()
+    selects = []
+
+    def before(conn, cursor, statement, *args):
+        conn.info["started"] = time.perf_counter()
+
+    def after(conn, cursor, statement, *args):
+        if "FOR UPDATE OF requests" in statement:
+            selects.append(time.perf_counter() - conn.info["started"])
+
+    sync_engine = sessions.kw["bind"].sync_engine
+    event.listen(sync_engine, "before_cursor_execute", before)
+    event.listen(sync_engine, "after_cursor_execute", after)
+    tasks = [
+        asyncio.create_task(claimer(sessions, claim, args.claims, latencies, claimed, start))
+        for _ in range(args.claimers)
+    ]
+    await asyncio.sleep(0.1)
+    started = time.perf_counter()
+    start.set()
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        elapsed = time.perf_counter() - started
+        event.remove(sync_engine, "before_cursor_execute", before)
+        event.remove(sync_engine, "after_cursor_execute", after)
+        await release(sessions, claimed, claim.staff_id)
+
+    print(
+        f"{label:<12} claims/s: {len(latencies) / elapsed:>6,.0f}   "
+        "claim p50/p99: {:>7.1f} /{:>7.1f} ms   ".format(*percentiles(latencies)) +
+        "select p50/p99: {:>7.1f} /{:>7.1f} ms   ".format(*percentiles(selects)) +
+        f"distinct: {len(set(claimed))}/{len(claimed)}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent claim-next")
+    parser.add_argument("--claimers", type=int, default=200)
+    parser.add_argument("--claims", type=int, default=5, help="claims per claimer, one after the other")
+    args = parser.parse_args()
+
+    options = {**engine_options(), "echo": False, "pool_size": args.claimers, "max_overflow": 0}
+    bench_engine = create_async_engine(settings.database_url, **options)
+    sessions = async_sessionmaker(bench_engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessions() as db:
+        staff_id = (await db.execute(select(DBStaff.id).order_by(DBStaff.id).limit(1))).scalar_one()
+    # One issue type, so every claimer competes for the same head of the queue
+    claim = ClaimRequest(staff_id=staff_id, issue_type=IssueType.PLUMBING)
+
+    try:
+        # Open every connection up front, so claims are not timed against connection setup
+        await asyncio.gather(*[warm(sessions) for _ in range(args.claimers)])
+        await run("skip locked", sessions, claim, args)
+        with mock.patch.object(requests, "work_queue", waiting_work_queue):
+            await run("for update", sessions, claim, args)
+    finally:
+        await bench_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+"""
+Benchmark POST /requests: the original create_request (three existence
+SELECTs, INSERT, refresh) against the single-statement version in
+app/routers/requests.py, with and without its duplicate check. Each call
+runs in its own transaction that is rolled back, so the database is left
+unchanged.
+
+Needs at least one tenant with a unit (python seed_pg_data.py), then:
+
+    python benchmark_create_request.py --iterations 500
+    python benchmark_create_request.py --iterations 500 --rtt-ms 2
+
+--rtt-ms adds that much delay to every statement to approximate the
+round-trip time of a remote database over TLS.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime
+from unittest import mock
+from fastapi import HTTPException, Response
+from sqlalchemy import event, select
+
+from app.database import engine, duplicate_check_engine, AsyncSessionLocal
+from app.models import Request, RequestCreate
+from app.models.db_models import (
+    Request as DBRequest, Tenant as DBTenant, Unit as DBUnit, Building as DBBuilding
+)
+from app.rollups import rollup_snapshot, update_rollups
+from app.duplicates import DuplicatePolicy
+from app.routers import requests as requests_router
+
+
+async def legacy_create_request(request, db):
+    """The five-round-trip implementation the endpoint used before, kept as the baseline."""
+    tenant_result = await db.execute(select(DBTenant).where(DBTenant.id == request.tenant_id))
+    if not tenant_result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    unit_result = await db.execute(select(DBUnit).where(DBUnit.id == request.unit_id))
+    if not unit_result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Unit not found")
+    building_result = await db.execute(select(DBBuilding).where(DBBuilding.id == request.building_id))
+    if not building_result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Building not found")
+
+    db_request = DBRequest(
+        id=str(uuid.uuid4()),
+        **request.model_dump(),
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+        closed_at=None,
+        resolution_notes=None
+    )
+    db.add(db_request)
+    await update_rollups(db, None, rollup_snapshot(db_request))
+    await db.flush()
+    await db.refresh(db_request)
+    return Request.model_validate(db_request)
+
+
+async def create_request(request, db):
+    return await requests_router.create_request(request, Response(), DuplicatePolicy.CREATE, db)
+
+
+async def create_request_unchecked(request, db):
+    async def no_duplicates(*args):
+        return []
+    with mock.patch.object(requests_router, "find_duplicates", no_duplicates):
+        return await create_request(request, db)
+
+
+async def run(label, handler, payload, iterations, rtt_ms):
+    """Time `iterations` calls of handler and count the statements each one sends."""
+    statements = 0
+
+    def on_statement(*args):
+        nonlocal statements
+        statements += 1
+        if rtt_ms:
+            time.sleep(rtt_ms / 1000)
+
+    engines = [engine, duplicate_check_engine]
+    for target in engines:
+        event.listen(target.sync_engine, "before_cursor_execute", on_statement)
+    timings = []
+    try:
+        for _ in range(iterations):
+            async with AsyncSessionLocal() as session:
+                started = time.perf_counter()
+                await handler(payload, session)
+                timings.append((time.perf_counter() - started) * 1000)
+                await session.rollback()
+    finally:
+        for target in engines:
+            event.remove(target.sync_engine, "before_cursor_execute", on_statement)
+
+    timings.sort()
+    print(
+        f"{label:<16} round trips/call: {statements / iterations:>4.1f}   "
+        f"p50: {statistics.median(timings):>7.2f} ms   "
+        f"p99: {timings[max(int(len(timings) * 0.99) - 1, 0)]:>7.2f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark POST /requests")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--rtt-ms", type=float, default=0, help="simulated delay per statement")
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(DBTenant.id, DBUnit.id, DBUnit.building_id)
+            .join(DBUnit, DBTenant.unit_id == DBUnit.id)
+            .limit(1)
+        )
+        tenant_id, unit_id, building_id = result.one()
+
+    payload = RequestCreate(
+        tenant_id=tenant_id,
+        unit_id=unit_id,
+        building_id=building_id,
+        issue_type="Plumbing",
+        priority="High",
+        description="Benchmark request"
+    )
+    print(f"{args.iterations} iterations each, simulated round trip {args.rtt_ms} ms\n")
+
+    # Warm up the connection pool and statement caches
+    await run("warm-up", legacy_create_request, payload, 20, 0)
+    await run("warm-up", create_request, payload, 20, 0)
+    print()
+    await run("five queries", legacy_create_request, payload, args.iterations, args.rtt_ms)
+    await run("single insert", create_request_unchecked, payload, args.iterations, args.rtt_ms)
+    await run("+ dup check", create_request, payload, args.iterations, args.rtt_ms)
+
+    await engine.dispose()
+    await duplicate_check_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Benchmark the list endpoints: the original ORM path (hydrate instances,
+model_validate each one, validate again against response_model) against
+the projection path in the routers (select the schema's columns, build
+dicts, encode with orjson). Both run through the full ASGI stack; the
+original handlers are mounted under /legacy for the run.
+
+    python benchmark_list_endpoints.py --iterations 200 --limit 100
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, Response
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.database import engine, get_read_db
+from app.main import app
+from app.models import Building, Unit, Tenant, Staff, Request, RequestStatus
+from app.models.db_models import (
+    Building as DBBuilding, Unit as DBUnit, Tenant as DBTenant, Staff as DBStaff, Request as DBRequest
+)
+from app.pagination import paginate, set_next_cursor
+from app.routers.requests import filter_requests
+
+legacy = APIRouter(prefix="/legacy")
+
+
+def legacy_list(path, schema, model):
+    """Register the original list handler for a simple resource."""
+    @legacy.get(path, response_model=List[schema])
+    async def handler(
+        response: Response,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        db: AsyncSession = Depends(get_read_db)
+    ):
+        result = await db.execute(paginate(select(model), model, skip, limit, cursor))
+        items = result.scalars().all()
+        set_next_cursor(response, items, limit)
+        return [schema.model_validate(item) for item in items]
+
+
+legacy_list("/buildings/", Building, DBBuilding)
+legacy_list("/units/", Unit, DBUnit)
+legacy_list("/tenants/", Tenant, DBTenant)
+legacy_list("/staff/", Staff, DBStaff)
+
+
+@legacy.get("/requests/", response_model=List[Request])
+async def legacy_requests(
+    response: Response,
+    status_filter: Optional[RequestStatus] = Query(None, alias="status"),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Assignments were always embedded, notes only with include=notes
+    query = paginate(select(DBRequest), DBRequest, skip, limit, cursor, descending=True)
+    if "notes" in (include or ""):
+        query = query.options(selectinload(DBRequest.notes))
+    query = filter_requests(query, status_filter)
+    result = await db.execute(query)
+    requests = result.scalars().all()
+    set_next_cursor(response, requests, limit)
+    return [Request.model_validate(req) for req in requests]
+
+
+async def measure(client, url, iterations):
+    """Requests per second over `iterations` sequential calls, plus the last response."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        response = await client.get(url)
+    elapsed = time.perf_counter() - started
+    return iterations / elapsed, response
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the list endpoints")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    app.include_router(legacy)
+    # The original request list always carried both collections
+    paths = ["/buildings/", "/units/", "/tenants/", "/staff/", "/requests/?include=assignments,notes"]
+    print(f"{args.iterations} calls per endpoint, limit={args.limit}\n")
+    print(f"{'endpoint':<38}{'ORM req/s':>12}{'projection req/s':>20}{'speedup':>10}   same body")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        for path in paths:
+            separator = "&" if "?" in path else "?"
+            url = f"{path}{separator}limit={args.limit}"
+            # Warm up both paths
+            await measure(client, f"/legacy{url}", 5)
+            await measure(client, url, 5)
+
+            legacy_rate, legacy_response = await measure(client, f"/legacy{url}", args.iterations)
+            rate, response = await measure(client, url, args.iterations)
+            same = (
+                json.loads(legacy_response.content) == json.loads(response.content)
+                and legacy_response.headers.get("x-next-cursor") == response.headers.get("x-next-cursor")
+            )
+            print(f"{path:<38}{legacy_rate:>12,.0f}{rate:>20,.0f}{rate / legacy_rate:>9.2f}x   {same}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
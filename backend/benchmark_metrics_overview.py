@@ -0,0 +1,126 @@
+"""
+Benchmark /metrics/overview: the original five-query implementation against
+the single-pass aggregate query in app/routers/metrics.py.
+Seed a large dataset first (python seed_bench_data.py --requests 1000000), then:
+
+    python benchmark_metrics_overview.py --iterations 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from sqlalchemy import event, select, func, and_
+
+from app.database import engine, AsyncSessionLocal
+from app.models import RequestStatus
+from app.models.db_models import Request as DBRequest
+from app.routers.metrics import get_metrics_overview
+
+
+async def legacy_metrics_overview(db):
+    """The five-scan implementation the endpoint used before, kept as the baseline."""
+    open_result = await db.execute(select(func.count()).select_from(DBRequest).where(
+        DBRequest.status.in_([RequestStatus.OPEN, RequestStatus.IN_PROGRESS, RequestStatus.PENDING])
+    ))
+    total_open = open_result.scalar()
+
+    closed_result = await db.execute(select(func.count()).select_from(DBRequest).where(
+        DBRequest.status.in_([RequestStatus.CLOSED, RequestStatus.COMPLETED])
+    ))
+    total_closed = closed_result.scalar()
+
+    avg_result = await db.execute(select(
+        func.avg(func.extract('epoch', DBRequest.closed_at - DBRequest.created_at) / 3600)
+    ).where(and_(
+        DBRequest.status.in_([RequestStatus.CLOSED, RequestStatus.COMPLETED]),
+        DBRequest.closed_at.is_not(None)
+    )))
+    avg_hours = avg_result.scalar()
+    average_resolution_time = round(float(avg_hours), 2) if avg_hours else 0
+
+    top_issues_result = await db.execute(select(
+        DBRequest.issue_type.label('issue_type'),
+        func.count().label('count')
+    ).group_by(DBRequest.issue_type).order_by(func.count().desc()).limit(5))
+    top_issue_types = [
+        {"issue_type": str(row.issue_type), "count": row.count}
+        for row in top_issues_result.fetchall()
+    ]
+
+    sla_breach_result = await db.execute(select(func.count()).select_from(DBRequest).where(and_(
+        DBRequest.status.in_([RequestStatus.CLOSED, RequestStatus.COMPLETED]),
+        DBRequest.closed_at.is_not(None),
+        func.extract('epoch', DBRequest.closed_at - DBRequest.created_at) / 3600 > DBRequest.target_sla_hours
+    )))
+    sla_breach_count = sla_breach_result.scalar()
+
+    total_requests = total_open + total_closed
+    completion_rate = round((total_closed / total_requests * 100), 2) if total_requests > 0 else 0
+
+    return {
+        "total_open_requests": total_open,
+        "total_closed_requests": total_closed,
+        "total_requests": total_requests,
+        "average_resolution_time": average_resolution_time,
+        "top_issue_types": top_issue_types,
+        "sla_breach_count": sla_breach_count,
+        "completion_rate": completion_rate
+    }
+
+
+async def run(label, handler, iterations):
+    """Time `iterations` calls of handler and count the statements each one sends."""
+    statements = 0
+
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    timings = []
+    payload = None
+    try:
+        for _ in range(iterations):
+            async with AsyncSessionLocal() as session:
+                started = time.perf_counter()
+                payload = await handler(session)
+                timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+
+    timings.sort()
+    print(
+        f"{label:<14} round trips/call: {statements / iterations:>4.1f}   "
+        f"p50: {statistics.median(timings):>9.1f} ms   "
+        f"p95: {timings[int(len(timings) * 0.95) - 1 if len(timings) > 1 else 0]:>9.1f} ms   "
+        f"mean: {statistics.mean(timings):>9.1f} ms"
+    )
+    return payload
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark /metrics/overview")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(select(func.count()).select_from(DBRequest))).scalar()
+    print(f"requests table: {rows:,} rows, {args.iterations} iterations each\n")
+
+    legacy = await run("five queries", legacy_metrics_overview, args.iterations)
+    # Bypass the response cache so every call reaches the database
+    single = await run("single pass", get_metrics_overview.__wrapped__, args.iterations)
+
+    # Top-5 ordering among equal counts is unspecified in both versions
+    same = json.dumps(legacy, sort_keys=True) == json.dumps(single, sort_keys=True)
+    print(f"\nresponses identical: {same}")
+    if not same:
+        print(json.dumps(legacy, indent=2))
+        print(json.dumps(single, indent=2))
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+Print the PostgreSQL EXPLAIN plan of every query the read endpoints issue.
+Each endpoint is called in-process and the statements it sends are
+captured, so the plans are those of the queries the routers actually run.
+Run this after seeding to confirm which index every query uses:
+
+    python explain_queries.py            # EXPLAIN
+    python explain_queries.py --analyze  # EXPLAIN (ANALYZE, BUFFERS)
+"""
+import asyncio
+import sys
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event, select
+
+from app.database import engine, read_engine
+from app.main import app
+from app.models.db_models import Request
+from app.pagination import encode_cursor
+
+
+def build_endpoints(sample):
+    """Return (path, params) pairs covering the list, search and metrics reads."""
+    cursor = encode_cursor(sample["created_at"], sample["request_id"])
+    return [
+        ("/requests/", {}),
+        ("/requests/", {"cursor": cursor}),
+        ("/requests/", {"status": "OPEN"}),
+        ("/requests/", {"building_id": sample["building_id"], "status": "OPEN"}),
+        ("/requests/", {"tenant_id": sample["tenant_id"]}),
+        ("/requests/", {"include": "assignments,notes"}),
+        ("/requests/", {"include_archived": "true"}),
+        ("/requests/search", {"q": "leak"}),
+        (f"/requests/{sample['request_id']}", {}),
+        (f"/requests/{sample['request_id']}/notes", {}),
+        ("/units/", {"building_id": sample["building_id"]}),
+        ("/tenants/", {"unit_id": sample["unit_id"]}),
+        ("/staff/", {}),
+        ("/buildings/", {}),
+        ("/metrics/overview", {}),
+        ("/metrics/requests-by-status", {}),
+        ("/metrics/requests-by-priority", {}),
+        ("/metrics/requests-over-time", {}),
+        ("/metrics/building-performance", {}),
+        ("/metrics/staff-performance", {}),
+    ]
+
+
+async def explain_queries(analyze: bool = False):
+    """Call every read endpoint and print the plan of each query it ran."""
+    prefix = "EXPLAIN (ANALYZE, BUFFERS)" if analyze else "EXPLAIN"
+
+    async with engine.connect() as conn:
+        row = (await conn.execute(
+            select(Request.id, Request.building_id, Request.tenant_id, Request.unit_id, Request.created_at).limit(1)
+        )).first()
+    if not row:
+        print("No requests found - seed the database first.")
+        return
+    sample = {
+        "request_id": row.id,
+        "building_id": row.building_id,
+        "tenant_id": row.tenant_id,
+        "unit_id": row.unit_id,
+        "created_at": row.created_at,
+    }
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    engines = [engine] + ([read_engine] if read_engine is not None else [])
+    for target in engines:
+        event.listen(target.sync_engine, "before_cursor_execute", capture)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://explain") as client:
+        async with engine.connect() as conn:
+            driver = (await conn.get_raw_connection()).driver_connection
+            for path, params in build_endpoints(sample):
+                captured.clear()
+                response = await client.get(path, params=params)
+                queries = list(captured)
+
+                print("=" * 80)
+                print(f"GET {path} {params or ''} -> {response.status_code}")
+                for statement, parameters in queries:
+                    print("-" * 80)
+                    print(statement.strip())
+                    print()
+                    for plan_row in await driver.fetch(f"{prefix} {statement}", *(parameters or ())):
+                        print(plan_row[0])
+                print()
+
+    for target in engines:
+        event.remove(target.sync_engine, "before_cursor_execute", capture)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(explain_queries(analyze="--analyze" in sys.argv))
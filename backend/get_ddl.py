@@ -10,7 +10,8 @@ from app.database import engine
 async def get_table_ddl():
     """Get CREATE TABLE statements for all tables."""
     
-    tables = ['buildings', 'units', 'tenants', 'staff', 'requests']
+    tables = ['buildings', 'units', 'tenants', 'staff', 'requests', 'request_assignments', 'request_notes',
+              'request_status_rollups', 'request_daily_rollups']
     
     print("=" * 80)
     print("DATABASE DDL STATEMENTS - For Documentation")
@@ -1,6 +1,8 @@
 """
 Initialize PostgreSQL database - create all tables.
-Run this script once before seeding data.
+Run this script once before seeding data. New tables are created with
+their indexes; tables that already existed are left as they are, so run
+migrate_indexes.py afterwards to build the indexes added since.
 """
 import asyncio
 from app.database import engine, Base
@@ -16,7 +18,8 @@ async def init_db():
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
     
-    print("✅ Database tables created successfully!")
+    print("✅ Missing database tables created successfully!")
+    print("   Existing tables get newer indexes from: python migrate_indexes.py")
 
 if __name__ == "__main__":
     asyncio.run(init_db())
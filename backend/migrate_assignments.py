@@ -0,0 +1,65 @@
+"""
+Move request assignments from the requests.assignments JSON column into the
+request_assignments table. Safe to run more than once: requests that already
+have rows in request_assignments are skipped.
+
+    python migrate_assignments.py                # create table + backfill
+    python migrate_assignments.py --drop-column  # also drop requests.assignments
+"""
+import asyncio
+import sys
+from sqlalchemy import text
+
+from app.database import engine, Base
+import app.models.db_models  # noqa: F401 - register tables on Base.metadata
+
+
+async def migrate_assignments(drop_column: bool = False):
+    """Create request_assignments and backfill it from the legacy JSON column."""
+    print("Creating request_assignments table...")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+        column_query = text("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'requests' AND column_name = 'assignments'
+        """)
+        if not (await conn.execute(column_query)).first():
+            print("✅ requests.assignments does not exist - nothing to backfill")
+            return
+
+        print("Backfilling request_assignments from requests.assignments...")
+        result = await conn.execute(text("""
+            INSERT INTO request_assignments (
+                id, request_id, staff_id, assigned_at, accepted_at, completed_at, notes
+            )
+            SELECT gen_random_uuid()::text,
+                   r.id,
+                   a.value ->> 'staff_id',
+                   COALESCE(NULLIF(a.value ->> 'assigned_at', '')::timestamp, r.created_at),
+                   NULLIF(a.value ->> 'accepted_at', '')::timestamp,
+                   NULLIF(a.value ->> 'completed_at', '')::timestamp,
+                   a.value ->> 'notes'
+            FROM requests r
+            CROSS JOIN LATERAL json_array_elements(r.assignments) AS a(value)
+            WHERE json_typeof(r.assignments) = 'array'
+              AND NULLIF(a.value ->> 'staff_id', '') IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM request_assignments ra WHERE ra.request_id = r.id
+              )
+            ON CONFLICT DO NOTHING
+        """))
+        print(f"✅ Backfilled {result.rowcount} assignments")
+
+        if drop_column:
+            await conn.execute(text("ALTER TABLE requests DROP COLUMN assignments"))
+            print("✅ Dropped requests.assignments")
+
+
+async def main():
+    await migrate_assignments(drop_column="--drop-column" in sys.argv)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
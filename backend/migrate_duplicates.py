@@ -0,0 +1,44 @@
+"""
+Add requests.description_bands, the MinHash bands duplicate detection
+looks up, fill it for open requests and build its GIN index. Safe to run
+more than once; run it again after loading requests with
+seed_bench_data.py, which writes rows in SQL without bands.
+
+    python migrate_duplicates.py
+"""
+import asyncio
+import logging
+import time
+from sqlalchemy import text
+
+from app.database import engine, build_indexes
+from app.duplicates import backfill_description_bands
+import app.models.db_models  # noqa: F401 - register tables on Base.metadata
+
+
+async def migrate_duplicates():
+    """Add the column, backfill it, then index it."""
+    async with engine.begin() as conn:
+        # Backfilling every open request can outlast db_statement_timeout_ms
+        await conn.execute(text("SET LOCAL statement_timeout = 0"))
+        print("Adding requests.description_bands...")
+        await conn.execute(text("ALTER TABLE requests ADD COLUMN IF NOT EXISTS description_bands bigint[]"))
+
+        print("Backfilling open requests...")
+        started = time.perf_counter()
+        total = await backfill_description_bands(conn)
+        print(f"✅ Backfilled {total} requests in {time.perf_counter() - started:.1f}s")
+
+    # Built after the backfill, which is faster than maintaining it row by row
+    await build_indexes("ix_requests_open_description_bands")
+    print("✅ Duplicate detection ready")
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    await migrate_duplicates()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+Build the request, unit, tenant and staff indexes declared on the models on
+a database whose tables predate them; init_db.py and the API only create
+missing tables. Indexes are built concurrently, so the API can keep
+serving writes while this runs. Safe to run more than once.
+
+Tenant and staff emails held by more than one row are reported, and their
+unique indexes are skipped until they are resolved. With --fix-emails the
+oldest row keeps the address and later rows get theirs tagged with their
+id, e.g. jo+<id>@example.com.
+
+    python migrate_indexes.py
+    python migrate_indexes.py --fix-emails
+"""
+import asyncio
+import logging
+import sys
+from sqlalchemy import text
+
+from app.database import engine, build_indexes
+import app.models.db_models  # noqa: F401 - register tables on Base.metadata
+
+INDEXES = [
+    "ix_buildings_created_at_id",
+    "uq_units_building_id_unit_number",
+    "ix_units_created_at_id",
+    "uq_tenants_email",
+    "ix_tenants_unit_id",
+    "ix_tenants_created_at_id",
+    "uq_staff_email",
+    "ix_staff_created_at_id",
+    "ix_requests_created_at_id",
+    "ix_requests_building_status_created",
+    "ix_requests_tenant_created",
+    "ix_requests_status_created",
+    "ix_requests_issue_type_created",
+    "ix_requests_priority_created",
+    "ix_requests_open_created",
+]
+EMAIL_INDEXES = {"tenants": "uq_tenants_email", "staff": "uq_staff_email"}
+
+
+async def duplicate_emails(conn, table: str) -> list:
+    """Rows of `table` sharing an email with an older row, oldest first."""
+    result = await conn.execute(text(f"""
+        SELECT id, email FROM (
+            SELECT id, email, row_number() OVER (PARTITION BY email ORDER BY created_at NULLS LAST, id) AS n
+            FROM {table}
+        ) ranked
+        WHERE n > 1
+        ORDER BY email, id
+    """))
+    return result.all()
+
+
+async def tag_duplicate_emails(conn, table: str) -> None:
+    """Tag the email of every row but the oldest holder's with the row's id."""
+    await conn.execute(text(f"""
+        UPDATE {table} t
+        SET email = split_part(t.email, '@', 1) || '+' || t.id || '@' || split_part(t.email, '@', 2)
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY email ORDER BY created_at NULLS LAST, id) AS n
+            FROM {table}
+        ) ranked
+        WHERE t.id = ranked.id AND ranked.n > 1
+    """))
+
+
+async def migrate_indexes(fix_emails: bool = False) -> bool:
+    """Check emails, then build the indexes; returns False when an email index was skipped."""
+    print("Checking tenant and staff emails...")
+    skipped = set()
+    async with engine.begin() as conn:
+        for table, index in EMAIL_INDEXES.items():
+            duplicates = await duplicate_emails(conn, table)
+            if not duplicates:
+                continue
+            for row in duplicates:
+                print(f"⚠️  {table} {row.id} shares its email {row.email} with an older row")
+            if fix_emails:
+                await tag_duplicate_emails(conn, table)
+                print(f"✅ Tagged {len(duplicates)} {table} emails")
+            else:
+                skipped.add(index)
+
+    await build_indexes(*[name for name in INDEXES if name not in skipped])
+    if skipped:
+        print(f"❌ Skipped {', '.join(sorted(skipped))}: resolve the emails above, or rerun with --fix-emails")
+        return False
+    print("✅ Indexes ready")
+    return True
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    ok = await migrate_indexes(fix_emails="--fix-emails" in sys.argv)
+    await engine.dispose()
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""
+Move request notes from the requests.notes JSON column into the
+request_notes table. Safe to run more than once: requests that already
+have rows in request_notes are skipped.
+
+    python migrate_notes.py                # create table + backfill
+    python migrate_notes.py --drop-column  # also drop requests.notes
+"""
+import asyncio
+import sys
+from sqlalchemy import text
+
+from app.database import engine, Base
+import app.models.db_models  # noqa: F401 - register tables on Base.metadata
+
+
+async def migrate_notes(drop_column: bool = False):
+    """Create request_notes and backfill it from the legacy JSON column."""
+    print("Creating request_notes table...")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+        column_query = text("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'requests' AND column_name = 'notes'
+        """)
+        if not (await conn.execute(column_query)).first():
+            print("✅ requests.notes does not exist - nothing to backfill")
+            return
+
+        print("Backfilling request_notes from requests.notes...")
+        result = await conn.execute(text("""
+            INSERT INTO request_notes (
+                id, request_id, author_type, author_id, author_name, body, created_at
+            )
+            SELECT COALESCE(NULLIF(n.value ->> 'id', ''), gen_random_uuid()::text),
+                   r.id,
+                   COALESCE(n.value ->> 'author_type', ''),
+                   COALESCE(n.value ->> 'author_id', ''),
+                   COALESCE(n.value ->> 'author_name', ''),
+                   COALESCE(n.value ->> 'body', ''),
+                   COALESCE(NULLIF(n.value ->> 'created_at', '')::timestamp, r.updated_at, r.created_at)
+            FROM requests r
+            CROSS JOIN LATERAL json_array_elements(r.notes) AS n(value)
+            WHERE json_typeof(r.notes) = 'array'
+              AND NOT EXISTS (
+                  SELECT 1 FROM request_notes rn WHERE rn.request_id = r.id
+              )
+            ON CONFLICT DO NOTHING
+        """))
+        print(f"✅ Backfilled {result.rowcount} notes")
+
+        if drop_column:
+            await conn.execute(text("ALTER TABLE requests DROP COLUMN notes"))
+            print("✅ Dropped requests.notes")
+
+
+async def main():
+    await migrate_notes(drop_column="--drop-column" in sys.argv)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
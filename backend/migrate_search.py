@@ -0,0 +1,43 @@
+"""
+Add the full-text search columns (requests.search_vector and
+request_notes.search_vector) with their GIN indexes to an existing
+database. Both columns are generated, so PostgreSQL computes them for
+existing rows when they are added and keeps them current afterwards.
+Safe to run more than once.
+
+    python migrate_search.py
+"""
+import asyncio
+import logging
+from sqlalchemy import text
+
+from app.database import engine, Base, build_indexes
+from app.models.db_models import Request, RequestNote
+
+
+async def migrate_search():
+    """Add the generated tsvector columns, then build their indexes."""
+    async with engine.begin() as conn:
+        # Creates request_notes, with its column and index, when migrate_notes.py has not run
+        await conn.run_sync(Base.metadata.create_all)
+        for model in [Request, RequestNote]:
+            table = model.__table__
+            column = table.c.search_vector
+            print(f"Adding {table.name}.search_vector...")
+            # Adding a stored generated column rewrites the table
+            await conn.execute(text(
+                f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({column.computed.sqltext}) STORED"
+            ))
+    await build_indexes("ix_requests_search_vector", "ix_request_notes_search_vector")
+    print("✅ Full-text search columns ready")
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    await migrate_search()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+"""
+Add requests.sla_due_at, generated from created_at and target_sla_hours,
+and requests.sla_escalated_at with the index the SLA scheduler reads its
+deadlines from. Open requests already past their deadline are stamped as
+escalated so the scheduler does not raise the priority of the whole
+existing backlog at once; their breaches are counted in the metrics as
+before. Safe to run more than once.
+
+    python migrate_sla.py
+"""
+import asyncio
+import logging
+import time
+from sqlalchemy import text
+
+from app.database import engine, build_indexes
+from app.models.db_models import Request, OPEN_STATUSES
+
+
+async def migrate_sla():
+    """Add both columns, stamp overdue requests, then build the index."""
+    async with engine.begin() as conn:
+        # Adding a stored generated column rewrites the table, which can outlast db_statement_timeout_ms
+        await conn.execute(text("SET LOCAL statement_timeout = 0"))
+        column = Request.__table__.c.sla_due_at
+        print("Adding requests.sla_due_at and requests.sla_escalated_at...")
+        await conn.execute(text(
+            f"ALTER TABLE requests ADD COLUMN IF NOT EXISTS sla_due_at timestamp without time zone "
+            f"GENERATED ALWAYS AS ({column.computed.sqltext}) STORED"
+        ))
+        await conn.execute(text(
+            "ALTER TABLE requests ADD COLUMN IF NOT EXISTS sla_escalated_at timestamp without time zone"
+        ))
+
+        print("Stamping overdue open requests...")
+        started = time.perf_counter()
+        result = await conn.execute(text(
+            f"UPDATE requests SET sla_escalated_at = sla_due_at "
+            f"WHERE {OPEN_STATUSES.text} AND sla_escalated_at IS NULL AND sla_due_at <= now() at time zone 'utc'"
+        ))
+        print(f"✅ Stamped {result.rowcount} requests in {time.perf_counter() - started:.1f}s")
+
+    await build_indexes("ix_requests_sla_pending")
+    print("✅ SLA scheduling ready")
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    await migrate_sla()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,33 @@
+"""
+Replace ix_requests_dispatch_queue with ix_requests_work_queue, which
+orders open requests by priority and SLA deadline for claim-next and
+dispatch. Needs requests.sla_due_at (python migrate_sla.py). Safe to run
+more than once.
+
+    python migrate_work_queue.py
+"""
+import asyncio
+import logging
+from sqlalchemy import text
+
+from app.database import engine, build_indexes
+import app.models.db_models  # noqa: F401 - register tables on Base.metadata
+
+
+async def migrate_work_queue():
+    # The old index keeps serving dispatch until the new one is built
+    await build_indexes("ix_requests_work_queue")
+    async with engine.begin() as conn:
+        print("Dropping ix_requests_dispatch_queue...")
+        await conn.execute(text("DROP INDEX IF EXISTS ix_requests_dispatch_queue"))
+    print("✅ Work queue index ready")
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    await migrate_work_queue()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,36 @@
+"""
+Deliver tenant and staff notifications queued in notification_outbox by
+the API (see app.outbox). Run one or more next to the API; workers share
+the outbox without delivering the same batch twice. Sinks are chosen with
+NOTIFICATION_SINKS, e.g.
+
+    NOTIFICATION_SINKS=smtp,webhook NOTIFICATION_WEBHOOK_URL=https://... python outbox_worker.py
+"""
+import asyncio
+import logging
+import signal
+
+from app.database import engine
+from app.outbox import OutboxWorker
+
+
+async def main():
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logging.getLogger("app").setLevel(logging.INFO)
+    worker = OutboxWorker.from_settings()
+    print(f"Delivering notifications to: {', '.join(sink.name for sink in worker.sinks) or 'nowhere'}")
+    task = asyncio.create_task(worker.run())
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(signum, task.cancel)
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await worker.close()
+        await engine.dispose()
+        print(f"Outbox worker stopped: {worker.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,32 @@
+"""
+Recount the metrics rollup tables from the requests and requests_archive tables.
+The API keeps the rollups current on every write, and builds them at
+startup when they are empty; run this after any bulk change made outside
+the API.
+
+    python rebuild_rollups.py
+"""
+import asyncio
+from sqlalchemy import text
+
+from app.database import engine, Base
+from app.rollups import rebuild_rollups
+import app.models.db_models  # noqa: F401 - register tables on Base.metadata
+
+
+async def main():
+    """Create the rollup tables if needed and repopulate them."""
+    print("Rebuilding metrics rollups...")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await rebuild_rollups(conn)
+
+        status_rows = (await conn.execute(text("SELECT count(*) FROM request_status_rollups"))).scalar()
+        daily_rows = (await conn.execute(text("SELECT count(*) FROM request_daily_rollups"))).scalar()
+
+    print(f"✅ Rollups rebuilt: {status_rows:,} status rows, {daily_rows:,} daily rows")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
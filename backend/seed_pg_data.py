@@ -10,7 +10,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.database import AsyncSessionLocal
-from app.models.db_models import Building, Unit, Tenant, Staff, Request
+from app.rollups import apply_rollup_changes, rollup_snapshot
+from app.duplicates import description_bands
+from app.models.db_models import Building, Unit, Tenant, Staff, Request, RequestAssignment, RequestNote
 from app.models import RequestStatus, Priority, IssueType
 
 # Sample data
@@ -166,8 +168,6 @@ async def seed_data():
                     created_at=created_at,
                     updated_at=created_at + timedelta(hours=randint(1, 48)),
                     closed_at=created_at + timedelta(hours=randint(24, 168)) if status in [RequestStatus.COMPLETED, RequestStatus.CLOSED] else None,
-                    assignments=[],
-                    notes=[],
                     resolution_notes="Issue resolved successfully" if status in [RequestStatus.COMPLETED, RequestStatus.CLOSED] else None,
                     location_details={
                         "neighborhood": unit.unit_number,
@@ -179,31 +179,37 @@ async def seed_data():
                 # Add assignments for in_progress/completed/closed requests
                 if status in [RequestStatus.IN_PROGRESS, RequestStatus.COMPLETED, RequestStatus.CLOSED]:
                     assigned_staff = choice(staff_members)
-                    assignment = {
-                        "staff_id": assigned_staff.id,
-                        "assigned_at": (created_at + timedelta(hours=randint(1, 12))).isoformat(),
-                        "accepted_at": (created_at + timedelta(hours=randint(13, 24))).isoformat(),
-                        "completed_at": (created_at + timedelta(hours=randint(25, 72))).isoformat() if status in [RequestStatus.COMPLETED, RequestStatus.CLOSED] else None,
-                        "notes": "Working on it"
-                    }
+                    assignment = RequestAssignment(
+                        id=str(uuid.uuid4()),
+                        staff_id=assigned_staff.id,
+                        assigned_at=created_at + timedelta(hours=randint(1, 12)),
+                        accepted_at=created_at + timedelta(hours=randint(13, 24)),
+                        completed_at=created_at + timedelta(hours=randint(25, 72)) if status in [RequestStatus.COMPLETED, RequestStatus.CLOSED] else None,
+                        notes="Working on it"
+                    )
                     request.assignments = [assignment]
                 
+                request.description_bands = description_bands(
+                    request.building_id, request.issue_type, request.description
+                )
+                
                 # Add notes for some requests
                 if randint(1, 3) == 1:  # 33% chance
-                    note = {
-                        "id": str(uuid.uuid4()),
-                        "author_type": "tenant",
-                        "author_id": tenant.id,
-                        "author_name": tenant.full_name,
-                        "body": "Please fix this as soon as possible.",
-                        "created_at": (created_at + timedelta(hours=randint(1, 6))).isoformat()
-                    }
+                    note = RequestNote(
+                        id=str(uuid.uuid4()),
+                        author_type="tenant",
+                        author_id=tenant.id,
+                        author_name=tenant.full_name,
+                        body="Please fix this as soon as possible.",
+                        created_at=created_at + timedelta(hours=randint(1, 6))
+                    )
                     request.notes = [note]
                 
                 requests.append(request)
                 session.add(request)
             
             await session.flush()
+            await apply_rollup_changes(session, [(None, rollup_snapshot(request)) for request in requests])
             print(f"✅ Created {len(requests)} requests")
             
             # Commit all changes
@@ -0,0 +1,45 @@
+"""Shared fixtures for tests that run against a live PostgreSQL server."""
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from app.database import engine
+
+
+@pytest.fixture
+async def building():
+    """A building with one unit, tenant and staff member, removed afterwards."""
+    suffix = uuid.uuid4().hex[:12]
+    ids = {key: f"test-{key}-{suffix}" for key in ["building", "unit", "tenant", "staff"]}
+    params = {**ids, "suffix": suffix, "now": datetime.utcnow()}
+    async with engine.begin() as conn:
+        await conn.execute(text("""
+            INSERT INTO buildings (id, name, address, city, state, created_at, updated_at)
+            VALUES (:building, 'Test Building', '1 Test Way', 'Boston', 'MA', :now, :now)
+        """), params)
+        await conn.execute(text("""
+            INSERT INTO units (id, building_id, unit_number, floor, bedrooms, bathrooms, created_at, updated_at)
+            VALUES (:unit, :building, '1A', 1, 1, 1, :now, :now)
+        """), params)
+        await conn.execute(text("""
+            INSERT INTO tenants (id, unit_id, full_name, email, phone, created_at, updated_at)
+            VALUES (:tenant, :unit, 'Test Tenant', 'tenant-' || :suffix || '@example.com', '555-0100', :now, :now)
+        """), params)
+        await conn.execute(text("""
+            INSERT INTO staff (id, full_name, email, phone, role, specialties, active, created_at, updated_at)
+            VALUES (:staff, 'Test Staff', 'staff-' || :suffix || '@example.com', '555-0101', 'Plumber', '[]', true, :now, :now)
+        """), params)
+
+    yield ids
+
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM requests WHERE building_id = :building"), ids)
+        await conn.execute(text("DELETE FROM request_status_rollups WHERE building_id = :building"), ids)
+        await conn.execute(text("DELETE FROM request_daily_rollups WHERE building_id = :building"), ids)
+        await conn.execute(text("DELETE FROM staff WHERE id = :staff"), ids)
+        await conn.execute(text("DELETE FROM tenants WHERE id = :tenant"), ids)
+        await conn.execute(text("DELETE FROM units WHERE id = :unit"), ids)
+        await conn.execute(text("DELETE FROM buildings WHERE id = :building"), ids)
+    await engine.dispose()
@@ -42,3 +42,25 @@ async def test_get_metrics_overview():
     assert "average_resolution_time" in data
     assert "top_issue_types" in data
     assert "sla_breach_count" in data
+
+
+def test_cursor_round_trip():
+    """Test that pagination cursors decode back to their position."""
+    from datetime import datetime
+    from app.pagination import encode_cursor, decode_cursor
+    created_at = datetime(2025, 1, 15, 9, 30, 0)
+    cursor = encode_cursor(created_at, "req-1")
+    assert decode_cursor(cursor) == (created_at, "req-1")
+
+
+def test_cursor_round_trip_without_created_at():
+    """Test that rows without a created_at still produce a usable cursor."""
+    from app.pagination import encode_cursor, decode_cursor
+    cursor = encode_cursor(None, "req-1")
+    assert decode_cursor(cursor) == (None, "req-1")
+
+
+def test_request_view_only_requires_id():
+    """Test that the read schema documents every field but id as optional."""
+    from app.models import RequestView
+    assert RequestView.model_json_schema()["required"] == ["id"]
@@ -0,0 +1,94 @@
+"""Archiving CLOSED requests against a live PostgreSQL server."""
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+
+from app.archive import archive_closed, ensure_partitions
+from app.database import AsyncSessionLocal, get_read_db
+from app.main import app
+from app.pagination import position_key
+
+# Late in the day, so a requests-over-time window can start earlier that day
+CREATED_AT = datetime(1990, 1, 5, 23, 59, 59)
+CUTOFF = datetime(1990, 2, 1)
+
+
+def test_archived_note_positions_follow_live_order():
+    """Test that archived notes page like live ones, including past a cursor without a created_at."""
+    keys = [position_key(CREATED_AT, "b"), position_key(None, "a"), position_key(CREATED_AT, "a"), position_key(CUTOFF, "a")]
+    assert sorted(keys) == [
+        position_key(CREATED_AT, "a"), position_key(CREATED_AT, "b"), position_key(CUTOFF, "a"), position_key(None, "a")
+    ]
+    assert position_key(CUTOFF, "z") < position_key(None, "a") < position_key(None, "b")
+
+
+@pytest.mark.asyncio
+async def test_archived_requests_read_the_same(building):
+    """Test that an archived request, its assignments and notes are still served, and listed only on request."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/requests/", json={
+            "tenant_id": building["tenant"],
+            "unit_id": building["unit"],
+            "building_id": building["building"],
+            "issue_type": "Structural",
+            "priority": "Low",
+            "description": "Crack in the stairwell plaster"
+        })
+        request_id = response.json()["id"]
+        await client.post(f"/requests/{request_id}/assign", json={"staff_id": building["staff"]})
+        await client.post(f"/requests/{request_id}/notes", json={
+            "author_type": "staff",
+            "author_id": building["staff"],
+            "author_name": "Test Staff",
+            "body": "Patched and painted",
+            "created_at": datetime.utcnow().isoformat()
+        })
+        live = (await client.get(f"/requests/{request_id}", params={"include": "assignments,notes"})).json()
+
+        # Archive inside one transaction that reads are pointed at and that is rolled back
+        # afterwards, so no archive rows, partitions or rollup counts are left behind
+        db = AsyncSessionLocal()
+
+        async def archived_db():
+            yield db
+
+        app.dependency_overrides[get_read_db] = archived_db
+        try:
+            await db.execute(text("""
+                UPDATE requests SET status = 'CLOSED', created_at = :created_at, closed_at = :closed_at WHERE id = :id
+            """), {"id": request_id, "created_at": CREATED_AT, "closed_at": CREATED_AT + timedelta(days=3)})
+            await ensure_partitions(db, [CREATED_AT])
+            assert await archive_closed(db, CUTOFF, 10) == 1
+            assert (await db.execute(text("SELECT count(*) FROM requests WHERE id = :id"), {"id": request_id})).scalar() == 0
+
+            response = await client.get(f"/requests/{request_id}", params={"include": "assignments,notes"})
+            assert response.status_code == 200
+            archived = response.json()
+            assert archived["status"] == "CLOSED"
+            assert archived["assignments"] == live["assignments"]
+            assert archived["notes"] == live["notes"]
+
+            response = await client.get(f"/requests/{request_id}/notes")
+            assert [note["body"] for note in response.json()] == ["Patched and painted"]
+
+            params = {"tenant_id": building["tenant"]}
+            response = await client.get("/requests/", params=params)
+            assert response.json() == []
+            response = await client.get("/requests/", params={**params, "include_archived": "true", "fields": "status"})
+            assert response.json() == [{"id": request_id, "status": "CLOSED"}]
+
+            result = await db.execute(text("""
+                SELECT assignment_count, completed_count FROM assignment_archive_rollups WHERE staff_id = :staff
+            """), building)
+            assert tuple(result.one()) == (1, 0)
+
+            # The partial first day of requests-over-time is counted from the archive as well
+            days = (datetime.utcnow() - CREATED_AT).days + 1
+            response = await client.get("/metrics/requests-over-time", params={"days": days})
+            assert response.json()[0] == {"date": "1990-01-05", "count": 1}
+        finally:
+            app.dependency_overrides.pop(get_read_db)
+            await db.rollback()
+            await db.close()
@@ -0,0 +1,101 @@
+"""Bulk request endpoints against a live PostgreSQL server."""
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+
+from app.database import engine
+from app.main import app
+
+
+def request_payload(building, **overrides):
+    return {
+        "tenant_id": building["tenant"],
+        "unit_id": building["unit"],
+        "building_id": building["building"],
+        "issue_type": "Plumbing",
+        "priority": "High",
+        "description": "Leaking tap",
+        **overrides
+    }
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_reports_each_item(building):
+    """Test that valid items are inserted and invalid ones are reported by index."""
+    items = [
+        request_payload(building),
+        request_payload(building, unit_id="no-such-unit"),
+        request_payload(building, priority="Whenever"),
+        request_payload(building, issue_type="Electrical")
+    ]
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/requests/bulk", json=items)
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["succeeded"], body["failed"]) == (2, 2)
+        results = body["results"]
+        assert results[1]["error"] == "Unit not found"
+        assert results[2]["error"].startswith("priority:")
+        assert results[1]["id"] is None and results[2]["id"] is None
+
+        for index in [0, 3]:
+            response = await client.get(f"/requests/{results[index]['id']}")
+            assert response.status_code == 200
+            assert response.json()["issue_type"] == items[index]["issue_type"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_assign_and_close(building):
+    """Test that bulk-assign skips active assignments and bulk-status stamps closed_at."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/requests/bulk", json=[request_payload(building) for _ in range(3)])
+        ids = [result["id"] for result in response.json()["results"]]
+
+        response = await client.post(f"/requests/{ids[0]}/assign", json={"staff_id": building["staff"]})
+        assert response.status_code == 200
+
+        response = await client.post("/requests/bulk-assign", json={
+            "filter": {"building_id": building["building"]},
+            "staff_id": building["staff"]
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert sorted(body["ids"]) == sorted(ids[1:])
+        assert body["skipped"] == [ids[0]]
+
+        response = await client.patch("/requests/bulk-status", json={
+            "ids": ids[:2] + ["no-such-request"],
+            "status": "CLOSED"
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert sorted(body["ids"]) == sorted(ids[:2])
+        assert body["not_found"] == ["no-such-request"]
+
+        response = await client.get(f"/requests/{ids[0]}")
+        assert response.json()["status"] == "CLOSED"
+        assert response.json()["closed_at"] is not None
+        response = await client.get(f"/requests/{ids[2]}", params={"include": "assignments"})
+        assert response.json()["status"] == "IN_PROGRESS"
+        assert len(response.json()["assignments"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_reopen_fills_description_bands(building):
+    """Test that requests reopened by bulk-status get bands for duplicate detection."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/requests/bulk", json=[request_payload(building)])
+        request_id = response.json()["results"][0]["id"]
+
+        # Closed before the bands existed
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "UPDATE requests SET status = 'CLOSED', description_bands = NULL WHERE id = :id"
+            ), {"id": request_id})
+
+        response = await client.patch("/requests/bulk-status", json={"ids": [request_id], "status": "OPEN"})
+        assert response.status_code == 200
+
+    async with engine.connect() as conn:
+        bands = await conn.scalar(text("SELECT description_bands FROM requests WHERE id = :id"), {"id": request_id})
+    assert bands is not None
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from app.cache import MemoryCacheBackend, ResponseCache
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_computation():
+    """Test that simultaneous lookups of a cold key compute it once."""
+    cache = ResponseCache(MemoryCacheBackend(), ttl=30)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"total": 1}
+
+    results = await asyncio.gather(*[cache.get_or_compute("overview", {}, compute) for _ in range(50)])
+    assert calls == 1
+    assert all(result == {"total": 1} for result in results)
+    assert cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_bumps_version():
+    """Test that a write makes earlier entries unreachable."""
+    cache = ResponseCache(MemoryCacheBackend(), ttl=30)
+    values = iter([1, 2])
+
+    async def compute():
+        return next(values)
+
+    assert await cache.get_or_compute("status", {}, compute) == 1
+    assert await cache.get_or_compute("status", {}, compute) == 1
+    await cache.invalidate()
+    assert await cache.get_or_compute("status", {}, compute) == 2
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted():
+    """Test that the backend drops the least recently used key when full."""
+    backend = MemoryCacheBackend(max_entries=2)
+    await backend.set("a", 1, ttl=30)
+    await backend.set("b", 2, ttl=30)
+    await backend.get("a")
+    await backend.set("c", 3, ttl=30)
+    assert await backend.get("b") is None
+    assert await backend.get("a") == 1
+    assert backend.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_followers_recover_when_leader_is_cancelled():
+    """Test that waiters on a cancelled computation compute the value themselves."""
+    cache = ResponseCache(MemoryCacheBackend(), ttl=30)
+    started = asyncio.Event()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            started.set()
+            await asyncio.sleep(10)
+        return {"total": 1}
+
+    leader = asyncio.create_task(cache.get_or_compute("overview", {}, compute))
+    await started.wait()
+    follower = asyncio.create_task(cache.get_or_compute("overview", {}, compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await asyncio.wait_for(follower, timeout=1) == {"total": 1}
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_entries_computed_right_after_a_write_expire_with_replica_lag():
+    """Test that a miss soon after a write is only kept as long as a replica may lag."""
+    backend = MemoryCacheBackend()
+    cache = ResponseCache(backend, ttl=30, replica_lag_seconds=0.05)
+    values = iter([1, 2, 3])
+
+    async def compute():
+        return next(values)
+
+    assert await cache.get_or_compute("status", {}, compute) == 1
+    await cache.invalidate()
+    assert await cache.get_or_compute("status", {}, compute) == 2
+    assert await cache.get_or_compute("status", {}, compute) == 2
+    await asyncio.sleep(0.1)
+    # Recomputed once the replica has had time to catch up, then kept for the full ttl
+    assert await cache.get_or_compute("status", {}, compute) == 3
+    assert await cache.get_or_compute("status", {}, compute) == 3
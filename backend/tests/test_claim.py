@@ -0,0 +1,58 @@
+"""Claiming work from the open request queue against a live PostgreSQL server."""
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+
+from app.database import engine
+from app.main import app
+
+CLAIMERS = 40
+REQUESTS = 15
+
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_never_share_a_request(building):
+    """Test that claims come most urgent first and that concurrent claimers each get a different request."""
+    payload = {
+        "tenant_id": building["tenant"],
+        "unit_id": building["unit"],
+        "building_id": building["building"],
+        "issue_type": "Appliances",
+        "description": "Dishwasher will not drain"
+    }
+    claim = {"staff_id": building["staff"], "building_id": building["building"]}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/requests/bulk", json=[
+            {**payload, "priority": "Low"},
+            {**payload, "priority": "High", "target_sla_hours": 48},
+            {**payload, "priority": "High", "target_sla_hours": 8},
+            *[{**payload, "priority": "Medium"} for _ in range(REQUESTS - 3)]
+        ])
+        low, high_later, high_sooner = [result["id"] for result in response.json()["results"][:3]]
+
+        response = await client.post("/requests/claim-next", json=claim)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["id"] == high_sooner
+        assert body["status"] == "IN_PROGRESS"
+        assert [assignment["staff_id"] for assignment in body["assignments"]] == [building["staff"]]
+        response = await client.post("/requests/claim-next", json=claim)
+        assert response.json()["id"] == high_later
+
+        responses = await asyncio.gather(*[
+            client.post("/requests/claim-next", json=claim) for _ in range(CLAIMERS)
+        ])
+        claimed = [response.json()["id"] for response in responses if response.status_code == 200]
+        assert len(claimed) == len(set(claimed)) == REQUESTS - 2
+        assert low in claimed
+        assert sum(response.status_code == 204 for response in responses) == CLAIMERS - len(claimed)
+
+    async with engine.connect() as conn:
+        result = await conn.execute(text("""
+            SELECT count(*), count(DISTINCT a.request_id)
+            FROM request_assignments a JOIN requests r ON r.id = a.request_id
+            WHERE r.building_id = :building
+        """), building)
+        assert tuple(result.one()) == (REQUESTS, REQUESTS)
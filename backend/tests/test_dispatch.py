@@ -0,0 +1,123 @@
+"""Automatic dispatch, in memory and against a live PostgreSQL server."""
+import pytest
+from pydantic import ValidationError
+from httpx import AsyncClient, ASGITransport
+
+from app.database import AsyncSessionLocal, get_db
+from app.dispatch import DispatchIndex, dispatcher
+from app.main import app
+from app.config import settings
+from app.models import DispatchBacklog, IssueType, Priority
+
+
+def test_index_picks_least_loaded_specialist():
+    """Test that work goes to the least loaded specialist, to anyone without one, and stops at max_load."""
+    index = DispatchIndex(
+        {"ann": ["Plumbing", "HVAC"], "bob": ["plumbing"], "cat": ["Electrical"]},
+        {"ann": 2, "bob": 3, "cat": 0},
+        max_load=4
+    )
+    assert index.assign(IssueType.PLUMBING, Priority.LOW) == "ann"
+    # ann now holds 3 like bob; ties go to the lower id
+    assert index.assign(IssueType.PLUMBING, Priority.LOW) == "ann"
+    assert index.assign(IssueType.PLUMBING, Priority.LOW) == "bob"
+    # Both plumbers are full; only emergencies still get one
+    assert index.assign(IssueType.PLUMBING, Priority.HIGH) is None
+    assert index.assign(IssueType.PLUMBING, Priority.EMERGENCY) == "ann"
+    # Nobody specializes in pest control
+    assert index.assign(IssueType.PEST_CONTROL, Priority.LOW) == "cat"
+
+    index.add_load("bob", -2)
+    assert index.choose(IssueType.PLUMBING, Priority.LOW) == "bob"
+    assert index.loads == {"ann": 5, "bob": 2, "cat": 1}
+
+    # Choosing for a batch spreads it over the plumbers without counting it
+    assert index.choose_all([("r1", IssueType.PLUMBING, Priority.LOW), ("r2", IssueType.PLUMBING, Priority.LOW)]) == {
+        "r1": "bob", "r2": "bob"
+    }
+    assert index.loads == {"ann": 5, "bob": 2, "cat": 1}
+
+
+def test_backlog_limit_must_be_positive_and_bounded():
+    """Test that a dispatch limit of zero, below zero or above bulk_max_items is rejected."""
+    assert DispatchBacklog().limit is None
+    assert DispatchBacklog(limit=settings.bulk_max_items).limit == settings.bulk_max_items
+    for limit in (0, -1, settings.bulk_max_items + 1):
+        with pytest.raises(ValidationError):
+            DispatchBacklog(limit=limit)
+
+
+@pytest.mark.asyncio
+async def test_dispatch_request_and_backlog(building):
+    """Test that single and batch dispatch assign the idle specialist and skip assigned requests."""
+    payload = {
+        "tenant_id": building["tenant"],
+        "unit_id": building["unit"],
+        "building_id": building["building"],
+        "issue_type": "Pest Control",
+        "priority": "Medium",
+        "description": "Mice in the kitchen"
+    }
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        # The fixture staff member has no open work, so is the least loaded pest specialist
+        response = await client.put(f"/staff/{building['staff']}", json={"specialties": ["Pest Control"]})
+        assert response.status_code == 200
+
+        response = await client.post("/requests/", json=payload)
+        request_id = response.json()["id"]
+        response = await client.post(f"/requests/{request_id}/dispatch")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "IN_PROGRESS"
+        assert [assignment["staff_id"] for assignment in body["assignments"]] == [building["staff"]]
+
+        response = await client.post(f"/requests/{request_id}/dispatch")
+        assert response.status_code == 400
+
+        response = await client.post("/requests/bulk", json=[
+            {**payload, "priority": "Low"}, {**payload, "priority": "Emergency"}
+        ])
+        low, emergency = [result["id"] for result in response.json()["results"]]
+        response = await client.post("/requests/dispatch", json={"filter": {"building_id": building["building"]}})
+        assert response.status_code == 200
+        body = response.json()
+        assert [item["request_id"] for item in body["assigned"]] == [emergency, low]
+        assert {item["staff_id"] for item in body["assigned"]} == {building["staff"]}
+        assert body["unassigned"] == []
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_assignments_leave_loads_alone(building):
+    """Test that a staff member's load only changes once their assignment is committed."""
+    async def rolled_back_db():
+        async with AsyncSessionLocal() as session:
+            yield session
+            await session.rollback()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/requests/", json={
+            "tenant_id": building["tenant"],
+            "unit_id": building["unit"],
+            "building_id": building["building"],
+            "issue_type": "Appliances",
+            "priority": "Low",
+            "description": "Dishwasher will not drain"
+        })
+        request_id = response.json()["id"]
+        async with AsyncSessionLocal() as db:
+            await dispatcher.load(db)
+        load = dispatcher.index.loads[building["staff"]]
+
+        app.dependency_overrides[get_db] = rolled_back_db
+        try:
+            response = await client.post(f"/requests/{request_id}/assign", json={"staff_id": building["staff"]})
+            assert response.status_code == 200
+            response = await client.post("/requests/dispatch", json={"filter": {"building_id": building["building"]}})
+            assert len(response.json()["assigned"]) == 1
+        finally:
+            app.dependency_overrides.pop(get_db)
+        assert dispatcher.index.loads[building["staff"]] == load
+
+        response = await client.post(f"/requests/{request_id}/assign", json={"staff_id": building["staff"]})
+        assert response.status_code == 200
+        assert dispatcher.index.loads[building["staff"]] == load + 1
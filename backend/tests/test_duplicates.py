@@ -0,0 +1,55 @@
+"""Duplicate detection at intake against a live PostgreSQL server."""
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.duplicates import similarity
+from app.main import app
+
+
+def test_similarity_ignores_case_and_punctuation():
+    """Test that trigram similarity is symmetric and insensitive to case and punctuation."""
+    assert similarity("No heat!", "no HEAT") == 1.0
+    assert similarity("No heat in apartment", "Apartment has no heat") == similarity(
+        "Apartment has no heat", "No heat in apartment"
+    )
+    assert similarity("No heat in apartment", "Water leak under sink") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_create_reports_and_links_duplicates(building):
+    """Test that similar open requests are reported, and linked to on request."""
+    base = {
+        "tenant_id": building["tenant"],
+        "unit_id": building["unit"],
+        "building_id": building["building"],
+        "issue_type": "HVAC",
+        "priority": "High"
+    }
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/requests/", json={**base, "description": "No heat in the apartment"})
+        assert response.status_code == 201
+        assert response.json()["possible_duplicates"] == []
+        original = response.json()["id"]
+
+        response = await client.post("/requests/", json={**base, "description": "No heat in apartment!"})
+        assert response.status_code == 201
+        duplicates = response.json()["possible_duplicates"]
+        assert [duplicate["id"] for duplicate in duplicates] == [original]
+        assert duplicates[0]["similarity"] >= 0.6
+
+        # Another issue type is not a duplicate
+        response = await client.post(
+            "/requests/", json={**base, "issue_type": "Plumbing", "description": "No heat in the apartment"}
+        )
+        assert response.json()["possible_duplicates"] == []
+
+        response = await client.post(
+            "/requests/", params={"on_duplicate": "link"}, json={**base, "description": "no heat in the apartment"}
+        )
+        assert response.status_code == 200
+        linked = response.json()
+        assert linked["linked"] is True
+        assert linked["id"] == original
+
+        response = await client.get(f"/requests/{original}/notes")
+        assert [note["body"] for note in response.json()] == ["no heat in the apartment"]
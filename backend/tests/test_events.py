@@ -0,0 +1,83 @@
+"""Request change events against a live PostgreSQL server."""
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+
+from app.database import AsyncSessionLocal, engine
+from app.events import EventBroker, event_broker, matches_filter, request_event, stream_events
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_writes_publish_events_after_commit(building):
+    """Test that creating and assigning a request reaches subscribers with its building and staff."""
+    queue = event_broker.subscribe()
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/requests/", json={
+                "tenant_id": building["tenant"],
+                "unit_id": building["unit"],
+                "building_id": building["building"],
+                "issue_type": "Plumbing",
+                "priority": "High",
+                "description": "Event check"
+            })
+            request_id = response.json()["id"]
+            await client.post(f"/requests/{request_id}/assign", json={"staff_id": building["staff"]})
+            # Rejected writes roll back and publish nothing
+            await client.post(f"/requests/{request_id}/assign", json={"staff_id": building["staff"]})
+
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+    finally:
+        event_broker.unsubscribe(queue)
+
+    events = [event for event in events if event["request_id"] == request_id]
+    assert [event["type"] for event in events] == ["created", "assigned"]
+    assert events[1]["status"] == "IN_PROGRESS"
+    assert matches_filter(events[1], building["building"], building["staff"])
+    assert not matches_filter(events[0], None, building["staff"])
+    assert not matches_filter(events[0], "another-building", None)
+
+
+@pytest.mark.asyncio
+async def test_lost_listener_reconnects():
+    """Test that a terminated LISTEN connection is reported as degraded and reconnected."""
+    broker = EventBroker("postgres", reconnect_seconds=0.05, reconnect_max_seconds=0.2)
+    await broker.start()
+    try:
+        assert broker.listening
+        async with engine.connect() as conn:
+            pid = broker.listener_driver.get_server_pid()
+            await conn.execute(text("SELECT pg_terminate_backend(:pid)"), {"pid": pid})
+        for _ in range(100):
+            if broker.reconnects:
+                break
+            if not broker.listening:
+                assert broker.stats()["degraded"]
+            await asyncio.sleep(0.05)
+        assert broker.reconnects == 1 and not broker.stats()["degraded"]
+
+        queue = broker.subscribe()
+        async with AsyncSessionLocal() as db:
+            await broker.publish(db, [request_event("updated", "reconnect-check", "building")])
+            await db.commit()
+        event = await asyncio.wait_for(queue.get(), timeout=5)
+        assert event["request_id"] == "reconnect-check"
+    finally:
+        await broker.stop()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_stream_subscribes_only_while_streaming():
+    """Test that a stream holds a subscription only between its first chunk and its close."""
+    before = len(event_broker.subscribers)
+    stream = stream_events(None, None)
+    assert len(event_broker.subscribers) == before
+
+    assert await stream.__anext__() == "retry: 5000\n\n"
+    assert len(event_broker.subscribers) == before + 1
+    await stream.aclose()
+    assert len(event_broker.subscribers) == before
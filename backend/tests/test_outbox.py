@@ -0,0 +1,188 @@
+"""Notification outbox delivery against a live PostgreSQL server and local webhook and SMTP stand-ins."""
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+
+from app.database import engine
+from app.events import CHANNEL
+from app.main import app
+from app.outbox import OutboxWorker, SmtpSink, WebhookSink
+
+
+class WebhookStandIn:
+    """Records POSTed notifications, answering 503 to the first `failures` of them."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.received = []
+
+    async def handle(self, reader, writer):
+        headers = {}
+        await reader.readline()
+        while (line := (await reader.readline()).decode().strip()):
+            name, _, value = line.partition(":")
+            headers[name.lower()] = value.strip()
+        body = json.loads(await reader.readexactly(int(headers["content-length"])))
+        self.received.append((headers["idempotency-key"], body))
+        status = "503 Service Unavailable" if len(self.received) <= self.failures else "200 OK"
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        writer.close()
+
+
+class SmtpStandIn:
+    """Accepts every message and records its raw text."""
+
+    def __init__(self):
+        self.received = []
+
+    async def handle(self, reader, writer):
+        writer.write(b"220 stand-in ESMTP\r\n")
+        while (line := (await reader.readline()).decode()):
+            command = line[:4].upper()
+            if command == "DATA":
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                data = await reader.readuntil(b"\r\n.\r\n")
+                self.received.append(data.decode())
+                writer.write(b"250 OK\r\n")
+            elif command == "QUIT":
+                writer.write(b"221 Bye\r\n")
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        await writer.drain()
+        writer.close()
+
+
+async def serve(stand_in):
+    server = await asyncio.start_server(stand_in.handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+async def drain(worker: OutboxWorker, passes: int = 5) -> None:
+    for _ in range(passes):
+        if not await worker.drain_once():
+            return
+
+
+@pytest.mark.asyncio
+async def test_notifications_are_delivered_with_retries(building):
+    """Test that created, assigned and completed requests are notified once committed, retrying failures under the same key."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/requests/", json={
+            "tenant_id": building["tenant"],
+            "unit_id": building["unit"],
+            "building_id": building["building"],
+            "issue_type": "Electrical",
+            "priority": "High",
+            "description": "Kitchen outlet sparks"
+        })
+        request_id = response.json()["id"]
+        await client.post(f"/requests/{request_id}/assign", json={"staff_id": building["staff"]})
+        await client.post(f"/requests/{request_id}/complete", params={"staff_id": building["staff"]})
+
+    async with engine.connect() as conn:
+        result = await conn.execute(text(
+            "SELECT event_type FROM notification_outbox WHERE request_id = :id ORDER BY created_at"
+        ), {"id": request_id})
+        assert result.scalars().all() == ["created", "assigned", "completed"]
+
+    webhook, smtp = WebhookStandIn(failures=1), SmtpStandIn()
+    webhook_server, webhook_port = await serve(webhook)
+    smtp_server, smtp_port = await serve(smtp)
+    sinks = [
+        WebhookSink(f"http://127.0.0.1:{webhook_port}/notify"),
+        SmtpSink("127.0.0.1", smtp_port, "maintenance@example.com")
+    ]
+    worker = OutboxWorker(sinks, backoff_seconds=0)
+    try:
+        await drain(worker)
+    finally:
+        await worker.close()
+        webhook_server.close()
+        smtp_server.close()
+
+    ours = [(key, body) for key, body in webhook.received if body["request_id"] == request_id]
+    # Tenant on every event, and the staff member on the assignment
+    delivered = {(body["event_type"], body["recipient_type"]) for key, body in ours}
+    assert delivered == {("created", "tenant"), ("assigned", "tenant"), ("assigned", "staff"), ("completed", "tenant")}
+    # Four notifications, and the one first rejected was retried under the same key
+    keys = [key for key, body in ours]
+    assert len(set(keys)) == 4
+    rejected = webhook.received[0][0]
+    assert rejected not in keys or keys.count(rejected) == 2
+    assert sum(f"tenant-{building['tenant'][12:]}@example.com" in message for message in smtp.received) >= 3
+    assert worker.retried >= 1
+
+    async with engine.connect() as conn:
+        result = await conn.execute(text("""
+            SELECT count(*) FILTER (WHERE delivered_at IS NOT NULL), max(attempts)
+            FROM notification_outbox WHERE request_id = :id
+        """), {"id": request_id})
+        delivered_count, attempts = result.one()
+        assert delivered_count == 3
+        assert attempts <= 2
+
+
+@pytest.mark.asyncio
+async def test_failing_messages_are_given_up(building):
+    """Test that a message is no longer retried once its attempts run out."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/requests/", json={
+            "tenant_id": building["tenant"],
+            "unit_id": building["unit"],
+            "building_id": building["building"],
+            "issue_type": "Security",
+            "priority": "Medium",
+            "description": "Lobby door lock sticks"
+        })
+        request_id = response.json()["id"]
+
+    webhook = WebhookStandIn(failures=1000)
+    server, port = await serve(webhook)
+    worker = OutboxWorker([WebhookSink(f"http://127.0.0.1:{port}/notify")], max_attempts=2, backoff_seconds=0)
+    try:
+        await drain(worker)
+    finally:
+        await worker.close()
+        server.close()
+
+    assert sum(body["request_id"] == request_id for key, body in webhook.received) == 2
+    async with engine.connect() as conn:
+        result = await conn.execute(text("""
+            SELECT attempts, delivered_at, failed_at, last_error FROM notification_outbox WHERE request_id = :id
+        """), {"id": request_id})
+        attempts, delivered_at, failed_at, last_error = result.one()
+    assert attempts == 2 and delivered_at is None and failed_at is not None
+    assert "503" in last_error
+
+
+@pytest.mark.asyncio
+async def test_lost_listener_is_restored():
+    """Test that the worker re-listens once its LISTEN connection is terminated."""
+    worker = OutboxWorker([], reconnect_seconds=0.05, reconnect_max_seconds=0.2)
+    assert await worker.listen()
+    try:
+        async with engine.connect() as conn:
+            pid = worker.listener_driver.get_server_pid()
+            await conn.execute(text("SELECT pg_terminate_backend(:pid)"), {"pid": pid})
+        await asyncio.wait_for(worker.wakeup.wait(), timeout=5)
+        assert not worker.stats()["listening"]
+
+        for _ in range(100):
+            await worker.relisten()
+            if worker.reconnects:
+                break
+            await asyncio.sleep(0.05)
+        assert worker.stats()["listening"] and worker.reconnects == 1
+
+        worker.wakeup.clear()
+        async with engine.begin() as conn:
+            await conn.execute(text("SELECT pg_notify(:channel, '[]')"), {"channel": CHANNEL})
+        await asyncio.wait_for(worker.wakeup.wait(), timeout=5)
+    finally:
+        await worker.close()
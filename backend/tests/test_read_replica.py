@@ -0,0 +1,106 @@
+"""
+Read replica routing against a live PostgreSQL server.
+A second database, <PG_DATABASE>_replica, on the same server stands in for
+the replica, so a row inserted only there shows which side served a read.
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import database
+from app.config import settings
+from app.database import Base, ReadRouter, AsyncSessionLocal, engine, engine_options
+from app.main import app
+
+REPLICA_DATABASE = f"{settings.pg_database}_replica"
+
+
+@pytest.fixture
+async def replica_engine():
+    """Engine for the stand-in replica database, created on first use."""
+    admin = create_async_engine(settings.database_url, isolation_level="AUTOCOMMIT")
+    async with admin.connect() as conn:
+        exists = await conn.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": REPLICA_DATABASE}
+        )
+        if not exists.first():
+            await conn.execute(text(f'CREATE DATABASE "{REPLICA_DATABASE}"'))
+    await admin.dispose()
+
+    replica_url = settings.database_url.replace(f"/{settings.pg_database}?", f"/{REPLICA_DATABASE}?")
+    replica = create_async_engine(replica_url, **engine_options())
+    async with replica.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield replica
+
+    await replica.dispose()
+    await engine.dispose()
+
+
+@pytest.fixture
+async def replica_only_building(replica_engine):
+    """A building that exists in the replica database but not on the primary."""
+    building_id = f"replica-test-{uuid.uuid4()}"
+    async with replica_engine.begin() as conn:
+        await conn.execute(
+            text("""
+                INSERT INTO buildings (id, name, address, city, state, created_at, updated_at)
+                VALUES (:id, 'Replica Only', '1 Replica Way', 'Boston', 'MA', :now, :now)
+            """),
+            {"id": building_id, "now": datetime.utcnow()}
+        )
+
+    yield building_id
+
+    async with replica_engine.begin() as conn:
+        await conn.execute(text("DELETE FROM buildings WHERE id = :id"), {"id": building_id})
+
+
+async def get_building(building_id):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get(f"/buildings/{building_id}")
+
+
+@pytest.mark.asyncio
+async def test_reads_are_served_by_healthy_replica(monkeypatch, replica_engine, replica_only_building):
+    """Test that GET routes read from the replica when it is within the lag limit."""
+    router = ReadRouter(AsyncSessionLocal, replica_engine, max_lag_seconds=5, check_interval=60)
+    monkeypatch.setattr(database, "read_router", router)
+
+    response = await get_building(replica_only_building)
+    assert response.status_code == 200
+    assert response.json()["name"] == "Replica Only"
+    assert router.replica_reads == 1
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_falls_back_to_primary(monkeypatch, replica_engine, replica_only_building):
+    """Test that reads go to the primary when the replica is too far behind."""
+    router = ReadRouter(AsyncSessionLocal, replica_engine, max_lag_seconds=5, check_interval=60)
+    monkeypatch.setattr(database, "REPLICA_LAG_QUERY", text("SELECT 120.0"))
+    monkeypatch.setattr(database, "read_router", router)
+
+    response = await get_building(replica_only_building)
+    assert response.status_code == 404
+    assert router.primary_reads == 1
+    assert router.lag_seconds == 120.0
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_falls_back_to_primary(monkeypatch, replica_engine):
+    """Test that reads go to the primary when the replica cannot be reached."""
+    missing_url = settings.database_url.replace(f"/{settings.pg_database}?", "/no_such_replica_database?")
+    missing = create_async_engine(missing_url, **engine_options())
+    router = ReadRouter(AsyncSessionLocal, missing, max_lag_seconds=5, check_interval=60)
+    monkeypatch.setattr(database, "read_router", router)
+
+    response = await get_building("no-such-building")
+    assert response.status_code == 404
+    assert router.primary_reads == 1
+    assert router.stats()["routing_to"] == "primary"
+    await missing.dispose()
@@ -0,0 +1,149 @@
+"""Request read endpoints (export, sparse fields) against a live PostgreSQL server."""
+import csv
+import io
+import json
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+
+from app.database import engine
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_export_applies_filters_in_both_formats(building):
+    """Test that CSV and NDJSON exports contain exactly the filtered requests."""
+    items = [
+        {
+            "tenant_id": building["tenant"],
+            "unit_id": building["unit"],
+            "building_id": building["building"],
+            "issue_type": issue_type,
+            "priority": "Low",
+            "description": "Export, with a comma"
+        }
+        for issue_type in ["Plumbing", "HVAC", "Plumbing"]
+    ]
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.post("/requests/bulk", json=items)
+        params = {"building_id": building["building"], "issue_type": "PLUMBING"}
+
+        response = await client.get("/requests/export", params={**params, "format": "ndjson"})
+        assert response.status_code == 200
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["issue_type"] for row in rows] == ["Plumbing", "Plumbing"]
+
+        response = await client.get("/requests/export", params={**params, "format": "csv"})
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 2
+        assert rows[0]["description"] == "Export, with a comma"
+
+
+@pytest.mark.asyncio
+async def test_fields_and_include_narrow_request_reads(building):
+    """Test that fields= and include= decide exactly which keys are returned."""
+    item = {
+        "tenant_id": building["tenant"],
+        "unit_id": building["unit"],
+        "building_id": building["building"],
+        "issue_type": "Plumbing",
+        "priority": "Low",
+        "description": "Dripping shower",
+        "location_details": {"neighborhood": "Fenway"}
+    }
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/requests/", json=item)
+        request_id = response.json()["id"]
+
+        response = await client.get("/requests/", params={
+            "building_id": building["building"], "fields": "status,description"
+        })
+        assert response.json() == [{"id": request_id, "description": "Dripping shower", "status": "OPEN"}]
+
+        response = await client.get(f"/requests/{request_id}", params={"include": "assignments,notes"})
+        body = response.json()
+        assert body["location_details"] == {"neighborhood": "Fenway", "latitude": None, "longitude": None}
+        assert body["assignments"] == [] and body["notes"] == []
+
+        response = await client.get(f"/requests/{request_id}", params={"fields": "status,notes"})
+        assert response.status_code == 400
+
+        # Write responses leave notes out, as reads without include=notes do
+        response = await client.post(f"/requests/{request_id}/notes", json={
+            "author_type": "tenant", "author_id": building["tenant"], "author_name": "Test Tenant", "body": "Still dripping"
+        })
+        assert response.status_code == 200
+        assert "notes" not in response.json()
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_until_request_changes(building):
+    """Test that a matching If-None-Match gets 304 until the request is written to."""
+    item = {
+        "tenant_id": building["tenant"],
+        "unit_id": building["unit"],
+        "building_id": building["building"],
+        "issue_type": "HVAC",
+        "priority": "Medium",
+        "description": "No heat"
+    }
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/requests/", json=item)
+        url = f"/requests/{response.json()['id']}"
+
+        response = await client.get(url)
+        etag = response.headers["etag"]
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        await client.put(url, json={"description": "No heat at all"})
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+        # Rows written with plain SQL may lack updated_at and are still served
+        async with engine.begin() as conn:
+            await conn.execute(text("UPDATE requests SET updated_at = NULL WHERE tenant_id = :tenant"), building)
+        response = await client.get(url, params={"fields": "status"})
+        assert response.status_code == 200 and "etag" in response.headers
+        response = await client.get("/requests/", params={"tenant_id": building["tenant"]})
+        assert response.status_code == 200 and len(response.json()) == 1
+
+
+@pytest.mark.asyncio
+async def test_search_matches_descriptions_and_notes(building):
+    """Test that search ranks description hits first, finds note text and follows edits."""
+    base = {
+        "tenant_id": building["tenant"],
+        "unit_id": building["unit"],
+        "building_id": building["building"],
+        "issue_type": "Plumbing",
+        "priority": "Low"
+    }
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/requests/bulk", json=[
+            {**base, "description": "Radiator leaking in the hallway"},
+            {**base, "description": "Radiator is cold"}
+        ])
+        leaking, cold = [item["id"] for item in response.json()["results"]]
+        await client.post(f"/requests/{cold}/notes", json={
+            "author_type": "staff", "author_id": building["staff"], "author_name": "Test", "body": "Valve leaks"
+        })
+
+        params = {"q": "leak", "building_id": building["building"], "fields": "description"}
+        response = await client.get("/requests/search", params=params)
+        assert response.status_code == 200
+        results = response.json()
+        assert [result["id"] for result in results] == [leaking, cold]
+        assert results[0]["rank"] > results[1]["rank"]
+        assert set(results[0]) == {"id", "description", "rank"}
+
+        response = await client.get("/requests/search", params={**params, "q": "radiator -hallway"})
+        assert [result["id"] for result in response.json()] == [cold]
+
+        await client.put(f"/requests/{leaking}", json={"description": "Radiator fixed"})
+        response = await client.get("/requests/search", params=params)
+        assert [result["id"] for result in response.json()] == [cold]
@@ -0,0 +1,82 @@
+"""SLA escalation against a live PostgreSQL server."""
+import time
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+
+from app.database import engine
+from app.main import app
+from app.sla import SlaScheduler
+
+
+@pytest.mark.asyncio
+async def test_overdue_request_is_escalated_once(building):
+    """Test that a passed deadline raises the priority, adds a note and notifies hooks exactly once."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/requests/", json={
+            "tenant_id": building["tenant"],
+            "unit_id": building["unit"],
+            "building_id": building["building"],
+            "issue_type": "Cleaning",
+            "priority": "Low",
+            "description": "Hallway carpet stained",
+            "target_sla_hours": 2
+        })
+        request = response.json()
+        assert request["sla_due_at"] is not None and request["sla_escalated_at"] is None
+
+        # Move the request three hours into the past, so its deadline passed an hour ago
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "UPDATE requests SET created_at = created_at - interval '3 hours' WHERE id = :id"
+            ), {"id": request["id"]})
+
+        escalations = []
+
+        async def hook(batch):
+            escalations.extend(batch)
+
+        scheduler = SlaScheduler(enabled=True, window=10, refresh_seconds=60)
+        scheduler.add_hook(hook)
+        # Only this request is scheduled, so other rows in the database are left alone
+        scheduler.refreshed_at = time.monotonic()
+        async with engine.connect() as conn:
+            due_at = (await conn.execute(text("SELECT sla_due_at FROM requests WHERE id = :id"), request)).scalar()
+        scheduler.track(request["id"], due_at)
+        scheduler.track(request["id"], due_at)
+
+        wait = await scheduler.run_once()
+        assert wait > 0
+        assert [e["request_id"] for e in escalations] == [request["id"]]
+        assert escalations[0]["priority"] == "Medium"
+        assert scheduler.escalated == 1 and scheduler.heap == []
+
+        response = await client.get(f"/requests/{request['id']}", params={"include": "notes"})
+        body = response.json()
+        assert body["priority"] == "Medium"
+        assert body["sla_escalated_at"] is not None
+        assert [note["author_type"] for note in body["notes"]] == ["system"]
+
+        # Tracking the same deadline again does not escalate it a second time
+        scheduler.track(request["id"], due_at)
+        await scheduler.run_once()
+        assert len(escalations) == 1
+
+        # A new SLA target is a new deadline
+        response = await client.put(f"/requests/{request['id']}", json={"target_sla_hours": 48})
+        assert response.json()["sla_escalated_at"] is None
+
+        # Once that deadline passes too, the request is escalated again with a second note
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "UPDATE requests SET created_at = created_at - interval '48 hours' WHERE id = :id"
+            ), {"id": request["id"]})
+            due_at = (await conn.execute(text("SELECT sla_due_at FROM requests WHERE id = :id"), request)).scalar()
+        scheduler.track(request["id"], due_at)
+        await scheduler.run_once()
+        assert [e["request_id"] for e in escalations] == [request["id"], request["id"]]
+        assert escalations[1]["priority"] == "High"
+
+        response = await client.get(f"/requests/{request['id']}", params={"include": "notes"})
+        assert [note["author_type"] for note in response.json()["notes"]] == ["system", "system"]
@@ -19,6 +19,7 @@ export default function CreateRequest() {
     description: '',
     target_sla_hours: 72
   });
+  const [linkDuplicates, setLinkDuplicates] = useState(false);
 
   // Show all units when building is selected (don't filter strictly)
   // This allows for more flexibility in case relationships aren't perfect
@@ -70,9 +71,16 @@ export default function CreateRequest() {
       console.log('Selected unit ID:', formData.unit_id);
       console.log('Selected building ID:', formData.building_id);
       
-      const response = await requestsAPI.create(requestData);
+      const response = await requestsAPI.create(requestData, {
+        on_duplicate: linkDuplicates ? 'link' : 'create'
+      });
       console.log('Request created successfully:', response.data);
-      navigate('/requests');
+      if (response.data.linked) {
+        alert('This issue was already reported, so your description was added to the existing request.');
+        navigate(`/requests/${response.data.id}`);
+      } else {
+        navigate('/requests');
+      }
     } catch (error) {
       console.error('Error creating request:', error);
       console.error('Error response:', error.response?.data);
@@ -237,6 +245,15 @@ export default function CreateRequest() {
             />
           </div>
 
+          <label className="flex items-center space-x-2 text-sm text-gray-700">
+            <input
+              type="checkbox"
+              checked={linkDuplicates}
+              onChange={(e) => setLinkDuplicates(e.target.checked)}
+            />
+            <span>Add to an existing open request if this issue was already reported</span>
+          </label>
+
           <div className="flex space-x-4">
             <button
               type="submit"
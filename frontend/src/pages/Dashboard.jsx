@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { BarChart, Bar, PieChart, Pie, LineChart, Line, Cell, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 import { FileText, CheckCircle, Clock, AlertTriangle, TrendingUp, Users } from 'lucide-react';
-import { metricsAPI } from '../services';
+import { metricsAPI, requestsAPI } from '../services';
 
 const COLORS = ['#0ea5e9', '#8b5cf6', '#f59e0b', '#10b981', '#ef4444'];
 
@@ -15,6 +15,21 @@ export default function Dashboard() {
 
   useEffect(() => {
     loadDashboardData();
+
+    // Refresh on request changes, at most once per second during bursts
+    let timer = null;
+    const unsubscribe = requestsAPI.subscribe(() => {
+      if (!timer) {
+        timer = setTimeout(() => {
+          timer = null;
+          loadDashboardData();
+        }, 1000);
+      }
+    });
+    return () => {
+      clearTimeout(timer);
+      unsubscribe();
+    };
   }, []);
 
   const loadDashboardData = async () => {
@@ -103,6 +103,19 @@ export default function RequestDetails() {
     }
   };
 
+  const handleDispatch = async () => {
+    setSubmitting(true);
+    try {
+      await requestsAPI.dispatch(id);
+      await loadRequest();
+    } catch (error) {
+      console.error('Error dispatching request:', error);
+      alert('Failed to auto-assign: ' + (error.response?.data?.detail || error.message));
+    } finally {
+      setSubmitting(false);
+    }
+  };
+
   const handleAddNote = async (e) => {
     e.preventDefault();
     setSubmitting(true);
@@ -309,6 +322,16 @@ export default function RequestDetails() {
                   {request.target_sla_hours}h
                 </p>
                 <p className="text-sm text-gray-600 mt-1">Expected resolution time</p>
+                {request.sla_due_at && (
+                  <p className="text-sm text-gray-600 mt-1">
+                    Due: {new Date(request.sla_due_at).toLocaleString()}
+                  </p>
+                )}
+                {request.sla_escalated_at && (
+                  <p className="text-sm font-medium text-red-600 mt-1">
+                    Escalated: {new Date(request.sla_escalated_at).toLocaleString()}
+                  </p>
+                )}
               </div>
             </div>
           </div>
@@ -347,6 +370,13 @@ export default function RequestDetails() {
               >
                 Assign Staff
               </button>
+              <button 
+                onClick={handleDispatch}
+                disabled={submitting}
+                className="w-full btn-secondary text-left px-4 py-2"
+              >
+                Auto-assign
+              </button>
               <button 
                 onClick={() => setShowNoteModal(true)}
                 className="w-full btn-secondary text-left px-4 py-2"
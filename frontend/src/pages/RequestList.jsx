@@ -10,19 +10,24 @@ export default function RequestList() {
   const [filters, setFilters] = useState({
     status: '',
     priority: '',
-    issue_type: ''
+    issue_type: '',
+    include_archived: false
   });
+  const [query, setQuery] = useState('');
+  const [search, setSearch] = useState('');
 
   useEffect(() => {
     loadRequests();
-  }, [filters]);
+  }, [filters, search]);
 
   const loadRequests = async () => {
     try {
       setLoading(true);
       setError(null);
       console.log('Loading requests with filters:', filters);
-      const response = await requestsAPI.getAll(filters);
+      const response = search
+        ? await requestsAPI.search(search, filters)
+        : await requestsAPI.getAll(filters);
       console.log('Requests loaded:', response.data);
       setRequests(response.data);
     } catch (error) {
@@ -72,7 +77,26 @@ export default function RequestList() {
       </div>
 
       {/* Filters */}
-      <div className="card">
+      <div className="card space-y-4">
+        <form
+          onSubmit={(e) => {
+            e.preventDefault();
+            setSearch(query.trim());
+          }}
+          className="relative"
+        >
+          <Search className="h-5 w-5 text-gray-400 absolute left-3 top-1/2 -translate-y-1/2" />
+          <input
+            type="search"
+            value={query}
+            onChange={(e) => {
+              setQuery(e.target.value);
+              if (!e.target.value) setSearch('');
+            }}
+            placeholder="Search descriptions and notes, e.g. leak -heater"
+            className="input-field pl-10"
+          />
+        </form>
         <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
           <div>
             <label className="block text-sm font-medium text-gray-700 mb-1">Status</label>
@@ -123,6 +147,14 @@ export default function RequestList() {
             </select>
           </div>
         </div>
+        <label className="inline-flex items-center gap-2 text-sm text-gray-700">
+          <input
+            type="checkbox"
+            checked={filters.include_archived}
+            onChange={(e) => setFilters({ ...filters, include_archived: e.target.checked })}
+          />
+          Include archived closed requests
+        </label>
       </div>
 
       {/* Request List */}
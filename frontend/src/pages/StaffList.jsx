@@ -1,10 +1,13 @@
 import { useState, useEffect } from 'react';
+import { useNavigate } from 'react-router-dom';
 import { UserCog, Mail, Phone, Briefcase, CheckCircle, XCircle } from 'lucide-react';
-import { staffAPI } from '../services';
+import { staffAPI, requestsAPI } from '../services';
 
 export default function StaffList() {
   const [staff, setStaff] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [claiming, setClaiming] = useState(null);
+  const navigate = useNavigate();
 
   useEffect(() => {
     loadStaff();
@@ -21,6 +24,23 @@ export default function StaffList() {
     }
   };
 
+  const handleClaimNext = async (staffId) => {
+    setClaiming(staffId);
+    try {
+      const response = await requestsAPI.claimNext(staffId);
+      if (response.status === 204) {
+        alert('No open requests to claim');
+      } else {
+        navigate(`/requests/${response.data.id}`);
+      }
+    } catch (error) {
+      console.error('Error claiming request:', error);
+      alert('Failed to claim a request: ' + (error.response?.data?.detail || error.message));
+    } finally {
+      setClaiming(null);
+    }
+  };
+
   return (
     <div className="space-y-6">
       <div>
@@ -78,6 +98,15 @@ export default function StaffList() {
                     </div>
                   )}
                 </div>
+                {member.active && (
+                  <button
+                    onClick={() => handleClaimNext(member.id)}
+                    disabled={claiming === member.id}
+                    className="w-full btn-secondary mt-4 px-4 py-2"
+                  >
+                    {claiming === member.id ? 'Claiming...' : 'Claim next request'}
+                  </button>
+                )}
               </div>
             ))}
           </div>
@@ -19,13 +19,33 @@ export const requestsAPI = {
     );
     return apiClient.get('/requests/', { params: filteredParams });
   },
-  getById: (id) => apiClient.get(`/requests/${id}`),
-  create: (data) => apiClient.post('/requests/', data),
+  search: (q, params = {}) => {
+    const filteredParams = Object.fromEntries(
+      Object.entries(params).filter(([_, value]) => value !== '' && value !== null && value !== undefined)
+    );
+    return apiClient.get('/requests/search', { params: { ...filteredParams, q } });
+  },
+  getById: (id) => apiClient.get(`/requests/${id}`, { params: { include: 'assignments,notes' } }),
+  getNotes: (id, params = {}) => apiClient.get(`/requests/${id}/notes`, { params }),
+  create: (data, params = {}) => apiClient.post('/requests/', data, { params }),
   update: (id, data) => apiClient.put(`/requests/${id}`, data),
   delete: (id) => apiClient.delete(`/requests/${id}`),
   assign: (id, staffData) => apiClient.post(`/requests/${id}/assign`, staffData),
+  dispatch: (id) => apiClient.post(`/requests/${id}/dispatch`),
+  claimNext: (staffId, params = {}) => apiClient.post('/requests/claim-next', { staff_id: staffId, ...params }),
   addNote: (id, noteData) => apiClient.post(`/requests/${id}/notes`, noteData),
   complete: (id, staffId) => apiClient.post(`/requests/${id}/complete?staff_id=${staffId}`),
+  // Server-sent change events; returns a function that closes the stream
+  subscribe: (onEvent, params = {}) => {
+    const query = new URLSearchParams(
+      Object.entries(params).filter(([_, value]) => value !== '' && value !== null && value !== undefined)
+    );
+    const source = new EventSource(`${apiClient.defaults.baseURL}/requests/stream?${query}`);
+    ['created', 'updated', 'assigned', 'completed', 'note_added', 'deleted', 'sla_breached'].forEach((type) =>
+      source.addEventListener(type, (event) => onEvent(JSON.parse(event.data)))
+    );
+    return () => source.close();
+  },
 };
 
 // Buildings API